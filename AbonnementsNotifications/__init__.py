@@ -0,0 +1,56 @@
+from typing import Dict, Iterable, List, Optional
+
+from Membre import Membre
+
+# Sujets auxquels un membre peut s'abonner. « mes_taches » : seulement les événements qui
+# concernent les tâches dont il est responsable (création, risque qui les touche, changement de
+# statut, réassignation, l'ancien responsable étant aussi prévenu).
+SUJET_TACHES = "taches"
+SUJET_MES_TACHES = "mes_taches"
+SUJET_RISQUES = "risques"
+SUJET_BUDGET = "budget"
+SUJET_JALONS = "jalons"
+SUJET_EQUIPE = "equipe"
+SUJET_CHANGEMENTS = "changements"
+SUJETS = (SUJET_TACHES, SUJET_MES_TACHES, SUJET_RISQUES, SUJET_BUDGET, SUJET_JALONS, SUJET_EQUIPE,
+          SUJET_CHANGEMENTS)
+
+
+class AbonnementsNotifications:
+    # Index sujet -> abonnés (ensembles ordonnés) tenu à jour à chaque abonnement : le routage
+    # d'un message coûte le nombre de destinataires intéressés, pas la taille de l'équipe
+    def __init__(self):
+        self._par_sujet: Dict[str, Dict[Membre, None]] = {sujet: {} for sujet in SUJETS}
+
+    def abonner(self, membre: Membre, *sujets: str):
+        # O(s) pour s sujets
+        for sujet in sujets:
+            self._abonnes(sujet)[membre] = None
+
+    def desabonner(self, membre: Membre, *sujets: str):
+        # O(s) ; sans sujet, le membre est retiré de tous les sujets
+        for sujet in sujets or SUJETS:
+            self._abonnes(sujet).pop(membre, None)
+
+    def abonnes(self, sujet: str) -> List[Membre]:
+        return list(self._abonnes(sujet))
+
+    def sujets(self, membre: Membre) -> List[str]:
+        return [sujet for sujet in SUJETS if membre in self._par_sujet[sujet]]
+
+    def destinataires(self, sujet: Optional[str], concernes: Iterable[Membre] = ()) -> List[Membre]:
+        # O(k + c) : k abonnés du sujet, c membres concernés (responsables des tâches en cause),
+        # retenus s'ils suivent leurs propres tâches. Un message sans sujet ne va qu'à ces derniers.
+        abonnes = self._par_sujet.get(sujet, {}) if sujet is not None else {}
+        proprietaires = self._par_sujet[SUJET_MES_TACHES]
+        supplementaires = [membre for membre in concernes
+                           if membre in proprietaires and membre not in abonnes] if proprietaires else ()
+        if not supplementaires:
+            return list(abonnes)
+        return list(abonnes) + list(dict.fromkeys(supplementaires))
+
+    def _abonnes(self, sujet: str) -> Dict[Membre, None]:
+        abonnes = self._par_sujet.get(sujet)
+        if abonnes is None:
+            raise ValueError(f"Sujet de notification inconnu: {sujet}")
+        return abonnes
@@ -0,0 +1,200 @@
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime, timedelta
+from typing import Callable, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from InstantaneProjet import ordre_membres
+from Jalon import Jalon
+from Membre import Membre
+from MoteurCheminCritique import CycleDependancesError, ordonner_taches
+from OrdonnanceurLot import GrapheCSR
+from Projet import Projet
+from Risque import Risque
+from Tache import Tache
+
+_EPOQUE = datetime(1970, 1, 1)
+_MICRO = timedelta(microseconds=1)
+_MICRO_PAR_JOUR = 86_400_000_000
+
+# Résultat d'un projet renvoyé par un processus : tableau (5, n) des jours ES, EF, LS, LF et
+# marge libre depuis le début du projet (None si le projet est vide), puis le rapport éventuel
+Resultat = Tuple[Optional[np.ndarray], Optional[str]]
+
+
+def _micro(date: datetime) -> int:
+    return (date - _EPOQUE) // _MICRO
+
+
+def _compacter(projet: Projet) -> tuple:
+    # Forme compacte d'un projet : chaînes en listes, dates en microsecondes (int64), dépendances
+    # en CSR. Seul ce qui sert au chemin critique et au rapport est transmis.
+    taches = projet.taches
+    rangs = {tache: i for i, tache in enumerate(taches)}
+    membres = ordre_membres(projet)
+    indices_membres = {membre: i for i, membre in enumerate(membres)}
+    n = len(taches)
+    pred_ptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.fromiter((len(tache.dependances) for tache in taches), np.int64, n), out=pred_ptr[1:])
+    try:
+        pred_idx = np.fromiter((rangs[dep] for tache in taches for dep in tache.dependances), np.int64,
+                               int(pred_ptr[-1]))
+    except KeyError:
+        ordonner_taches(taches)  # lève l'erreur détaillée (dépendance hors projet)
+        raise
+    return (projet.nom, projet.description, projet.date_debut, projet.date_fin, projet.budget, projet.version,
+            [(membre.nom, membre.role) for membre in membres], len(projet.equipe.obtenir_membres()),
+            [tache.nom for tache in taches], [tache.statut for tache in taches],
+            np.fromiter((indices_membres.get(tache.responsable, -1) for tache in taches), np.int32, n),
+            np.fromiter((_micro(tache.date_debut) for tache in taches), np.int64, n),
+            np.fromiter((_micro(tache.date_fin) for tache in taches), np.int64, n),
+            pred_ptr, pred_idx,
+            [(jalon.nom, jalon.date) for jalon in projet.jalons],
+            [(risque.description, risque.probabilite, risque.impact) for risque in projet.risques])
+
+
+def _reconstruire(compact: tuple) -> Projet:
+    # Projet jetable (côté processus) qui ne sert qu'à produire le rapport : les tâches sont
+    # posées directement, sans index ni notifications
+    (nom, description, date_debut, date_fin, budget, version, membres, nb_equipe, noms, statuts, responsables,
+     debuts, fins, pred_ptr, pred_idx, jalons, risques) = compact
+    projet = Projet(nom, description, date_debut, date_fin, budget)
+    projet.version = version
+    membres = [Membre(nom, role) for nom, role in membres] + [None]
+    projet.equipe.ajouter_membres(membres[:nb_equipe])
+    debuts = debuts.view("datetime64[us]").astype(object).tolist()
+    fins = fins.view("datetime64[us]").astype(object).tolist()
+    projet.taches.extend(Tache(*champs) for champs in zip(
+        noms, [""] * len(noms), debuts, fins, [membres[i] for i in responsables.tolist()], statuts))
+    projet.jalons.extend(Jalon(nom, date) for nom, date in jalons)
+    projet.risques.extend(Risque(description, probabilite, impact) for description, probabilite, impact in risques)
+    return projet
+
+
+def _traiter_lot(compacts: List[tuple], rapports: bool) -> List[Resultat]:
+    # Exécuté dans un processus : les projets du lot sont mis bout à bout dans un seul graphe
+    # CSR et leurs chemins critiques calculés ensemble, de façon vectorisée
+    tailles = [len(compact[8]) for compact in compacts]
+    non_vides = [p for p, taille in enumerate(tailles) if taille]
+    resultats: List[Resultat] = [(None, None)] * len(compacts)
+    if non_vides:
+        premieres = np.cumsum([0] + [tailles[p] for p in non_vides[:-1]])
+        decalages_aretes = np.cumsum([0] + [len(compacts[p][14]) for p in non_vides[:-1]])
+        pred_ptr = np.concatenate([[0]] + [compacts[p][13][1:] + decalage
+                                          for p, decalage in zip(non_vides, decalages_aretes)])
+        pred_idx = np.concatenate([compacts[p][14] + premiere for p, premiere in zip(non_vides, premieres)])
+        csr = GrapheCSR(premieres, pred_ptr, pred_idx)
+        if sum(map(len, csr.niveaux)) != len(csr):
+            for p in non_vides:
+                ordonner_taches(_lier(_reconstruire(compacts[p]), compacts[p]))  # lève l'erreur de cycle
+        durees = np.concatenate([(compacts[p][12] - compacts[p][11]) // _MICRO_PAR_JOUR for p in non_vides])
+        tableau = np.stack(csr.calculer(durees))
+        bornes = premieres.tolist() + [len(csr)]
+        for k, p in enumerate(non_vides):
+            resultats[p] = (tableau[:, bornes[k]:bornes[k + 1]], None)
+    if rapports:
+        for p, compact in enumerate(compacts):
+            tableau = resultats[p][0]
+            projet = _reconstruire(compact)
+            if tableau is not None:
+                projet.chemin_critique = [projet.taches[i] for i in np.flatnonzero(tableau[3] == tableau[1]).tolist()]
+            resultats[p] = (tableau, projet.generer_rapport_performance())
+    return resultats
+
+
+def _lier(projet: Projet, compact: tuple) -> List[Tache]:
+    taches = projet.taches
+    pred_ptr, pred_idx = compact[13].tolist(), compact[14].tolist()
+    for i, tache in enumerate(taches):
+        tache.dependances = [taches[j] for j in pred_idx[pred_ptr[i]:pred_ptr[i + 1]]]
+    return taches
+
+
+def _fusionner(projet: Projet, tableau: Optional[np.ndarray]):
+    # Reporte sur les tâches d'origine les dates calculées par un processus ; le moteur
+    # incrémental en cache est abandonné (il sera reconstruit au prochain calcul)
+    projet._moteur = None
+    if tableau is None:
+        projet.chemin_critique = []
+        projet._publier("chemin_critique", projet.chemin_critique)
+        return
+    origine = np.datetime64(projet.date_debut, "us")
+
+    def en_dates(jours):
+        return (origine + jours.astype("timedelta64[D]")).astype(object).tolist()
+
+    es, ef, ls, lf, marge_libre = tableau
+    resultats = zip(projet.taches, en_dates(es), en_dates(ef), en_dates(ls), en_dates(lf), (ls - es).tolist(),
+                    marge_libre.tolist())
+    for tache, t_es, t_ef, t_ls, t_lf, marge_totale, t_marge_libre in resultats:
+        tache.ES = t_es
+        tache.EF = t_ef
+        tache.LS = t_ls
+        tache.LF = t_lf
+        tache.marge_totale = marge_totale
+        tache.marge_libre = t_marge_libre
+    projet.chemin_critique = [projet.taches[i] for i in np.flatnonzero(lf == ef).tolist()]
+    projet.noeuds_recalcules = len(projet.taches)
+    projet._publier("chemin_critique", projet.chemin_critique)
+
+
+def calculer_en_parallele(projets: Iterable[Projet], processus: Optional[int] = None,
+                          taille_lot: Optional[int] = None,
+                          progression: Optional[Callable[[int, int], None]] = None,
+                          rapports: bool = True) -> List[Optional[str]]:
+    # Calcule le chemin critique (et le rapport) de projets indépendants dans un pool de processus.
+    # Les projets voyagent sous forme compacte (tableaux et listes de chaînes) ; les résultats sont
+    # reportés sur les objets d'origine au fil des lots terminés, `progression(termines, total)`
+    # étant appelée après chacun. Renvoie les rapports dans l'ordre des projets.
+    projets = list(projets)
+    processus = processus or os.cpu_count() or 1
+    if taille_lot is None:
+        # Quelques lots par processus pour équilibrer la charge
+        taille_lot = max(1, -(-len(projets) // (4 * processus)))
+    lots = [range(debut, min(debut + taille_lot, len(projets))) for debut in range(0, len(projets), taille_lot)]
+    sortie: List[Optional[str]] = [None] * len(projets)
+    termines = 0
+
+    def resultats_du_lot(lot: range, calculer: Callable[[], List[Resultat]]) -> List[Resultat]:
+        try:
+            return calculer()
+        except CycleDependancesError:
+            # Le processus n'a vu que des copies : l'erreur est relevée sur les tâches d'origine
+            for i in lot:
+                ordonner_taches(projets[i].taches)
+            raise
+
+    def recevoir(lot: range, resultats: List[Resultat]):
+        nonlocal termines
+        for i, (tableau, rapport) in zip(lot, resultats):
+            _fusionner(projets[i], tableau)
+            sortie[i] = rapport
+        termines += len(lot)
+        if progression is not None:
+            progression(termines, len(projets))
+
+    if processus == 1:
+        for lot in lots:
+            compacts = [_compacter(projets[i]) for i in lot]
+            recevoir(lot, resultats_du_lot(lot, lambda: _traiter_lot(compacts, rapports)))
+        return sortie
+    # Au plus deux lots en attente par processus : la mise en forme des lots suivants
+    # se fait pendant que les processus travaillent
+    a_soumettre = iter(lots)
+    en_cours = {}
+    with ProcessPoolExecutor(processus) as executeur:
+        def soumettre():
+            lot = next(a_soumettre, None)
+            if lot is not None:
+                en_cours[executeur.submit(_traiter_lot, [_compacter(projets[i]) for i in lot], rapports)] = lot
+
+        for _ in range(2 * processus):
+            soumettre()
+        while en_cours:
+            faits, _ = wait(en_cours, return_when=FIRST_COMPLETED)
+            for future in faits:
+                lot = en_cours.pop(future)
+                soumettre()
+                recevoir(lot, resultats_du_lot(lot, future.result))
+    return sortie
@@ -2,7 +2,9 @@ from datetime import datetime
 
 
 class Changement:
+    __slots__ = ("description", "version", "date")
+
     def __init__(self, description: str, version: int, date: datetime):
         self.description = description
         self.version = version
-        self.date = date
\ No newline at end of file
+        self.date = date
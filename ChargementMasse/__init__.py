@@ -0,0 +1,135 @@
+import gc
+from contextlib import contextmanager
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Union
+
+from Jalon import Jalon
+from Membre import Membre
+from Risque import Risque
+from Tache import ListeDependances, Tache
+
+if TYPE_CHECKING:
+    from Projet import Projet
+
+# Un élément à charger : l'objet lui-même, un tuple d'arguments du constructeur ou un dict
+Element = Union[Any, tuple, Dict[str, Any]]
+
+
+@contextmanager
+def sans_ramasse_miettes():
+    # Un lot crée des centaines de milliers d'objets qui survivent tous : le ramasse-miettes
+    # cyclique, déclenché par les allocations, reparcourt sans fin des objets vivants. Il est
+    # suspendu le temps du chargement (s'il était actif) puis rétabli.
+    actif = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if actif:
+            gc.enable()
+
+
+def _construire(classe, element: Element):
+    if isinstance(element, dict):
+        return classe(**element)
+    if isinstance(element, (tuple, list)):
+        return classe(*element)
+    return element
+
+
+def preparer_membres(elements: Iterable[Element]) -> List[Membre]:
+    return [_construire(Membre, element) for element in elements]
+
+
+def preparer_jalons(elements: Iterable[Element]) -> List[Jalon]:
+    jalons = [_construire(Jalon, element) for element in elements]
+    for jalon in jalons:
+        if not isinstance(jalon.date, datetime):
+            raise ValueError(f"Date invalide pour le jalon '{jalon.nom}'")
+    return jalons
+
+
+def preparer_risques(elements: Iterable[Element]) -> List[Risque]:
+    risques = [_construire(Risque, element) for element in elements]
+    for risque in risques:
+        if not 0 <= risque.probabilite <= 1:
+            raise ValueError(f"Probabilité hors de [0, 1] pour le risque '{risque.description}'")
+    return risques
+
+
+def preparer_taches(projet: "Projet", elements: Iterable[Element]) -> List[Tache]:
+    # Construit et valide un lot de tâches en une passe. Les dépendances et les responsables
+    # peuvent être donnés par leur nom ; une dépendance peut désigner une tâche du projet ou
+    # du lot lui-même, même placée plus loin dans le lot. Tout est résolu et validé avant de
+    # toucher aux tâches : un lot refusé ne laisse ni dépendance ni responsable posés.
+    taches: List[Tache] = []
+    references: List[tuple] = []
+    responsables: List[tuple] = []
+    trouver = projet.equipe.trouver
+    for element in elements:
+        # _construire dépliée : un appel de fonction de moins par tâche
+        dependances = ()
+        if isinstance(element, (tuple, list)):
+            if len(element) == 7:
+                dependances = element[6]
+                tache = Tache(*element[:6])
+            else:
+                tache = Tache(*element)
+        elif isinstance(element, dict):
+            if "dependances" in element:
+                element = dict(element)
+                dependances = element.pop("dependances")
+            tache = Tache(**element)
+        else:
+            tache = element
+        if isinstance(tache.responsable, str):
+            membre = trouver(tache.responsable)
+            if membre is None:
+                raise ValueError(f"Responsable inconnu pour la tâche '{tache.nom}': {tache.responsable}")
+            responsables.append((tache, membre))
+        if not isinstance(tache.date_debut, datetime) or not isinstance(tache.date_fin, datetime):
+            raise ValueError(f"Dates invalides pour la tâche '{tache.nom}'")
+        if tache.date_debut > tache.date_fin:
+            raise ValueError(f"La tâche '{tache.nom}' se termine avant de commencer")
+        taches.append(tache)
+        if dependances:
+            references.append((tache, dependances))
+
+    # Une dépendance donnée par son nom est prise parmi les tâches du projet et du lot : seules
+    # celles données comme objets sont à vérifier
+    par_nom: Dict[str, Tache] = {}
+    if any(isinstance(dep, str) for _, deps in references for dep in deps):
+        for liste in (projet.taches, taches):
+            for tache in liste:
+                par_nom[tache.nom] = tache if tache.nom not in par_nom else None
+    resolues: List[tuple] = []
+    a_verifier: List[tuple] = [(tache, tache._dependances) for tache in taches if tache._dependances]
+    for tache, dependances in references:
+        deps = []
+        for dep in dependances:
+            if isinstance(dep, str):
+                nom, dep = dep, par_nom.get(dep)
+                if dep is None:
+                    raise ValueError(f"Dépendance '{nom}' de '{tache.nom}' introuvable ou ambiguë")
+            else:
+                a_verifier.append((tache, (dep,)))
+            deps.append(dep)
+        resolues.append((tache, deps))
+    if a_verifier:
+        connues = set(projet.taches)
+        connues.update(taches)
+        for tache, deps in a_verifier:
+            for dep in deps:
+                if dep not in connues:
+                    raise ValueError(f"La dépendance '{dep.nom}' de '{tache.nom}' n'appartient pas au projet")
+
+    for tache, membre in responsables:
+        tache.responsable = membre
+    for tache, deps in resolues:
+        if tache._dependances is None and tache._projets is None:
+            # Tâche construite par ce lot : la liste est posée d'un coup, sans projet à prévenir
+            tache._dependances = ListeDependances(tache, deps)
+        else:
+            for dep in deps:
+                tache.ajouter_dependance(dep)
+    return taches
@@ -0,0 +1,195 @@
+import asyncio
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from Instrumentation import Instrumentation, instrumentation_courante
+from Membre import Membre
+from NotificationContext import NotificationContext
+from NotificationStrategy import NotificationStrategy
+
+
+class DispatcheurNotifications:
+    # Envoi asynchrone des notifications : une boucle asyncio tourne dans un thread dédié,
+    # les appelants déposent les envois et reprennent la main aussitôt. Chaque stratégie a sa
+    # propre file bornée (l'appelant n'attend que si celle de la stratégie est pleine) et son propre
+    # consommateur, limité à un nombre d'envois simultanés : une stratégie saturée ne retarde pas
+    # les autres. Un envoi en échec est retenté avec un délai croissant.
+    def __init__(self, taille_file: int = 1000, concurrence: int = 8, tentatives: int = 3,
+                 delai_initial: float = 0.1, facteur_delai: float = 2.0):
+        self.taille_file = taille_file
+        self.concurrence = concurrence
+        self.tentatives = tentatives
+        self.delai_initial = delai_initial
+        self.facteur_delai = facteur_delai
+        # Envois abandonnés après toutes les tentatives
+        self.echecs: List[Tuple[str, Membre, Exception]] = []
+        self.envois_reussis = 0
+        self._boucle: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        # File et consommateur de chaque stratégie, créés sur la boucle au premier envoi
+        self._files: Dict[NotificationStrategy, asyncio.Queue] = {}
+        self._consommateurs: Dict[NotificationStrategy, asyncio.Task] = {}
+        self._en_cours: set = set()
+        self._limites: Dict[NotificationStrategy, int] = {}
+
+    def limiter(self, strategy: NotificationStrategy, concurrence: int):
+        # Limite propre à une stratégie (sinon `concurrence` s'applique), prise en compte à la
+        # création de sa file
+        self._limites[strategy] = concurrence
+
+    def demarrer(self):
+        if self._thread is not None:
+            return
+        self._boucle = asyncio.new_event_loop()
+        pret = threading.Event()
+        self._thread = threading.Thread(target=self._executer, args=(pret,),
+                                        name="dispatcheur-notifications", daemon=True)
+        self._thread.start()
+        pret.wait()
+
+    def _executer(self, pret: threading.Event):
+        asyncio.set_event_loop(self._boucle)
+        self._boucle.call_soon(pret.set)
+        self._boucle.run_forever()
+        self._boucle.close()
+
+    def soumettre(self, strategy: NotificationStrategy, message: str, destinataire: Membre):
+        if self._thread is None:
+            raise RuntimeError("Le dispatcheur n'est pas démarré")
+        # L'instrumentation active chez l'appelant suit l'envoi : la boucle tourne dans un autre contexte
+        envoi = (message, destinataire, instrumentation_courante())
+        if threading.current_thread() is self._thread:
+            self._file(strategy).put_nowait(envoi)
+        else:
+            asyncio.run_coroutine_threadsafe(self._deposer(strategy, envoi), self._boucle).result()
+
+    async def _deposer(self, strategy: NotificationStrategy, envoi: tuple):
+        await self._file(strategy).put(envoi)
+
+    def _file(self, strategy: NotificationStrategy) -> asyncio.Queue:
+        # Appelée sur la boucle du dispatcheur
+        file = self._files.get(strategy)
+        if file is None:
+            file = self._files[strategy] = asyncio.Queue(self.taille_file)
+            self._consommateurs[strategy] = self._boucle.create_task(self._consommer(strategy, file))
+        return file
+
+    async def _consommer(self, strategy: NotificationStrategy, file: asyncio.Queue):
+        semaphore = asyncio.Semaphore(self._limites.get(strategy, self.concurrence))
+        while True:
+            message, destinataire, instrumentation = await file.get()
+            await semaphore.acquire()
+            tache = asyncio.create_task(self._envoyer(strategy, message, destinataire, instrumentation))
+            self._en_cours.add(tache)
+            tache.add_done_callback(lambda t: self._terminer(t, semaphore, file))
+
+    def _terminer(self, tache: asyncio.Task, semaphore: asyncio.Semaphore, file: asyncio.Queue):
+        self._en_cours.discard(tache)
+        semaphore.release()
+        file.task_done()
+
+    async def _envoyer(self, strategy: NotificationStrategy, message: str, destinataire: Membre,
+                       instrumentation: Optional[Instrumentation] = None):
+        delai = self.delai_initial
+        for tentative in range(self.tentatives):
+            debut = time.perf_counter()
+            try:
+                envoyer_async = getattr(strategy, "envoyer_async", None)
+                if envoyer_async is not None:
+                    await envoyer_async(message, destinataire)
+                else:
+                    await asyncio.to_thread(strategy.envoyer, message, destinataire)
+                self.envois_reussis += 1
+                self._mesurer(instrumentation, strategy, debut, "reussi")
+                return
+            except Exception as erreur:  # l'envoi est retenté quelle que soit l'erreur du transport
+                self._mesurer(instrumentation, strategy, debut, "echec")
+                if tentative == self.tentatives - 1:
+                    self.echecs.append((message, destinataire, erreur))
+                    return
+                await asyncio.sleep(delai)
+                delai *= self.facteur_delai
+
+    @staticmethod
+    def _mesurer(instrumentation: Optional[Instrumentation], strategy: NotificationStrategy, debut: float,
+                 resultat: str):
+        if instrumentation is not None:
+            instrumentation.mesurer("notification_envoi", time.perf_counter() - debut,
+                                    strategie=type(strategy).__name__, resultat=resultat)
+
+    def vider(self, timeout: Optional[float] = None):
+        # Attendre que tous les envois déjà déposés soient terminés
+        if self._thread is not None:
+            asyncio.run_coroutine_threadsafe(self._joindre(), self._boucle).result(timeout)
+
+    async def _joindre(self):
+        # Une file peut être créée pendant l'attente des autres : on recommence alors
+        while True:
+            files = list(self._files.values())
+            await asyncio.gather(*(file.join() for file in files))
+            if len(self._files) == len(files):
+                return
+
+    async def _fermer(self):
+        consommateurs = list(self._consommateurs.values())
+        for consommateur in consommateurs:
+            consommateur.cancel()
+        await asyncio.gather(*consommateurs, return_exceptions=True)
+        # Files et sémaphores appartiennent à cette boucle : un redémarrage en crée de nouveaux
+        self._files.clear()
+        self._consommateurs.clear()
+
+    def arreter(self, timeout: Optional[float] = None):
+        # Arrêt propre : les files sont vidées avant l'arrêt de la boucle
+        if self._thread is None:
+            return
+        self.vider(timeout)
+        asyncio.run_coroutine_threadsafe(self._fermer(), self._boucle).result(timeout)
+        self._boucle.call_soon_threadsafe(self._boucle.stop)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def __enter__(self):
+        self.demarrer()
+        return self
+
+    def __exit__(self, *exc):
+        self.arreter()
+
+
+class NotificationContextAsynchrone(NotificationContext):
+    # Contexte de notification qui dépose les envois dans un dispatcheur au lieu d'appeler
+    # la stratégie directement : les mutations de Projet ne bloquent plus sur le réseau
+    def __init__(self, strategy: NotificationStrategy, dispatcheur: DispatcheurNotifications):
+        super().__init__(strategy)
+        self.dispatcheur = dispatcheur
+
+    def notifier(self, message: str, destinataires: List[Membre]):
+        for strategy, destinataire in self.envois(destinataires):
+            self.dispatcheur.soumettre(strategy, message, destinataire)
+
+
+class TransportFactice(NotificationStrategy):
+    # Transport local pour les tests : simule une latence et des échecs, garde les envois
+    def __init__(self, latence: float = 0.0, echecs: int = 0):
+        self.latence = latence
+        self.echecs_restants = echecs
+        self.envoyes: List[Tuple[str, Membre]] = []
+        self.simultanes = 0
+        self.simultanes_max = 0
+
+    def envoyer(self, message: str, destinataire: Membre):
+        self.envoyes.append((message, destinataire))
+
+    async def envoyer_async(self, message: str, destinataire: Membre):
+        self.simultanes += 1
+        self.simultanes_max = max(self.simultanes_max, self.simultanes)
+        try:
+            await asyncio.sleep(self.latence)
+            if self.echecs_restants > 0:
+                self.echecs_restants -= 1
+                raise ConnectionError("Échec simulé du transport")
+            self.envoyes.append((message, destinataire))
+        finally:
+            self.simultanes -= 1
@@ -1,8 +1,8 @@
 from Membre import Membre
-from NotificationStrategy.__init__ import NotificationStrategy
+from TransportsNotifications import StrategieTransport
 
 
-class EmailNotificationStrategy(NotificationStrategy):
-    # Envoyer des notifications par email
-    def envoyer(self, message: str, destinataire: Membre):
+class EmailNotificationStrategy(StrategieTransport):
+    # Envoyer des notifications par email (TransportSMTP)
+    def afficher(self, message: str, destinataire: Membre):
         print(f"Notification envoyée à {destinataire.nom} par email: {message}")
\ No newline at end of file
@@ -1,13 +1,203 @@
-from typing import List
+from typing import Dict, Iterable, List, Optional
 from Membre import Membre
 
 
+class ListeMembres(list):
+    # Vue ordonnée des membres d'une équipe, gardée par l'équipe tant que sa version ne change pas.
+    # Elle reste modifiable comme l'ancienne liste `membres` : toute modification en place passe
+    # par l'équipe, qui tient ses index à jour (un membre déjà présent n'est pas ajouté deux fois).
+    __slots__ = ("_equipe",)
+
+    def __init__(self, equipe: "Equipe", membres: Iterable[Membre] = ()):
+        super().__init__(membres)
+        self._equipe = equipe
+
+    def _synchroniser(self):
+        # Vue périmée (l'équipe a changé depuis) : la modification s'applique à l'équipe actuelle
+        if self._equipe._vue is not self:
+            list.__setitem__(self, slice(None), self._equipe._membres)
+
+    def _modifiee(self):
+        # Remplacement quelconque : l'équipe reconstruit ses index, en O(n)
+        self._equipe._remplacer(self)
+
+    def append(self, membre: Membre):
+        # O(1)
+        self._synchroniser()
+        if self._equipe.ajouter_membre(membre):
+            super().append(membre)
+            self._equipe._vue = self
+
+    def remove(self, membre: Membre):
+        # O(n) pour la liste, O(1) pour les index
+        self._synchroniser()
+        super().remove(membre)
+        self._equipe.retirer_membre(membre)
+        self._equipe._vue = self
+
+    def extend(self, membres: Iterable[Membre]):
+        self._synchroniser()
+        super().extend(membres)
+        self._modifiee()
+
+    def __iadd__(self, membres: Iterable[Membre]):
+        self.extend(membres)
+        return self
+
+    def insert(self, position: int, membre: Membre):
+        self._synchroniser()
+        super().insert(position, membre)
+        self._modifiee()
+
+    def pop(self, position: int = -1) -> Membre:
+        self._synchroniser()
+        membre = super().pop(position)
+        self._modifiee()
+        return membre
+
+    def clear(self):
+        self._synchroniser()
+        super().clear()
+        self._modifiee()
+
+    def sort(self, *args, **kwargs):
+        self._synchroniser()
+        super().sort(*args, **kwargs)
+        self._modifiee()
+
+    def reverse(self):
+        self._synchroniser()
+        super().reverse()
+        self._modifiee()
+
+    def __setitem__(self, position, valeur):
+        self._synchroniser()
+        super().__setitem__(position, valeur)
+        self._modifiee()
+
+    def __delitem__(self, position):
+        self._synchroniser()
+        super().__delitem__(position)
+        self._modifiee()
+
+    def __copy__(self) -> List[Membre]:
+        # Une copie n'est plus liée à l'équipe
+        return list(self)
+
+    def __reduce__(self):
+        return ListeMembres, (self._equipe, list(self))
+
+
 class Equipe:
+    # Membres dans l'ordre d'arrivée, indexés par identité (dict ordonné), par nom et par rôle.
+    # Un même membre n'est présent qu'une fois ; deux membres distincts peuvent être homonymes.
     def __init__(self):
-        self.membres: List[Membre] = []
+        self._membres: Dict[Membre, None] = {}
+        self._par_nom: Dict[str, Dict[Membre, None]] = {}
+        self._par_role: Dict[str, Dict[Membre, None]] = {}
+        # Vue renvoyée par `membres` et obtenir_membres, reconstruite après une modification
+        self._vue: Optional[ListeMembres] = None
+        # Incrémentée à chaque modification (signature pour les caches)
+        self.version = 0
+
+    def __len__(self) -> int:
+        return len(self._membres)
+
+    def __contains__(self, membre: Membre) -> bool:
+        # O(1)
+        return membre in self._membres
+
+    def __iter__(self):
+        return iter(self._membres)
+
+    @property
+    def membres(self) -> ListeMembres:
+        # O(1) tant que l'équipe ne change pas ; O(n) à la première lecture après une modification
+        if self._vue is None:
+            self._vue = ListeMembres(self, self._membres)
+        return self._vue
+
+    @membres.setter
+    def membres(self, membres: Iterable[Membre]):
+        self._remplacer(list(membres))
+
+    def ajouter_membre(self, membre: Membre) -> bool:
+        # O(1) ; renvoie False si le membre fait déjà partie de l'équipe
+        if membre in self._membres:
+            return False
+        self._membres[membre] = None
+        self._par_nom.setdefault(membre.nom, {})[membre] = None
+        self._par_role.setdefault(membre.role, {})[membre] = None
+        self._modifiee()
+        return True
+
+    def ajouter_membres(self, membres: Iterable[Membre]) -> List[Membre]:
+        # O(k) ; renvoie les membres effectivement ajoutés (sans doublons)
+        return [membre for membre in membres if self.ajouter_membre(membre)]
+
+    def retirer_membre(self, membre: Membre):
+        # O(1) ; KeyError si le membre ne fait pas partie de l'équipe
+        del self._membres[membre]
+        self._desindexer(self._par_nom, membre.nom, membre)
+        self._desindexer(self._par_role, membre.role, membre)
+        self._modifiee()
+
+    def modifier_membre(self, membre: Membre, nom: Optional[str] = None, role: Optional[str] = None):
+        # O(1) ; le membre est modifié sur place, les tâches qui le désignent suivent donc d'elles-mêmes
+        if membre not in self._membres:
+            raise KeyError(membre)
+        if nom is not None and nom != membre.nom:
+            self._desindexer(self._par_nom, membre.nom, membre)
+            membre.nom = nom
+            self._par_nom.setdefault(nom, {})[membre] = None
+        if role is not None and role != membre.role:
+            self._desindexer(self._par_role, membre.role, membre)
+            membre.role = role
+            self._par_role.setdefault(role, {})[membre] = None
+        self._modifiee()
+
+    def trouver(self, nom: str) -> Optional[Membre]:
+        # O(1) ; premier membre arrivé portant ce nom
+        homonymes = self._par_nom.get(nom)
+        return next(iter(homonymes)) if homonymes else None
+
+    def homonymes(self, nom: str) -> List[Membre]:
+        # O(k), k membres portant ce nom
+        return list(self._par_nom.get(nom, ()))
+
+    def membres_par_role(self, role: str) -> List[Membre]:
+        # O(k), k membres ayant ce rôle, dans l'ordre d'arrivée
+        return list(self._par_role.get(role, ()))
+
+    def roles(self) -> Dict[str, List[Membre]]:
+        # O(n) ; membres regroupés par rôle
+        return {role: list(membres) for role, membres in self._par_role.items()}
+
+    def obtenir_membres(self) -> ListeMembres:
+        # Même vue que `membres` : pas de copie à chaque diffusion d'une notification
+        return self.membres
+
+    def _modifiee(self):
+        self._vue = None
+        self.version += 1
 
-    def ajouter_membre(self, membre: Membre):
-        self.membres.append(membre)
+    def _remplacer(self, membres: List[Membre]):
+        # O(n) : l'équipe devient `membres`, sans doublons ; une ListeMembres reste la vue courante
+        self._membres = dict.fromkeys(membres)
+        self._par_nom = {}
+        self._par_role = {}
+        for membre in self._membres:
+            self._par_nom.setdefault(membre.nom, {})[membre] = None
+            self._par_role.setdefault(membre.role, {})[membre] = None
+        self._modifiee()
+        if isinstance(membres, ListeMembres) and membres._equipe is self:
+            if len(membres) != len(self._membres):
+                list.__setitem__(membres, slice(None), self._membres)
+            self._vue = membres
 
-    def obtenir_membres(self) -> List[Membre]:
-        return self.membres
\ No newline at end of file
+    @staticmethod
+    def _desindexer(index: Dict[str, Dict[Membre, None]], cle: str, membre: Membre):
+        membres = index[cle]
+        del membres[membre]
+        if not membres:
+            del index[cle]
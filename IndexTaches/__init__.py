@@ -0,0 +1,187 @@
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from Membre import Membre
+from Tache import Tache
+
+
+class _Noeud:
+    # Noeud d'un arbre d'intervalles centré : intervalles contenant `centre`,
+    # triés par début croissant et par fin décroissante. Les dates sont figées à la
+    # construction : une tâche modifiée depuis ne fausse pas le parcours des autres.
+    __slots__ = ("centre", "par_debut", "par_fin", "gauche", "droite")
+
+    def __init__(self, entrees: List[Tuple[datetime, datetime, Tache]]):
+        debuts = sorted(entree[0] for entree in entrees)
+        self.centre = debuts[len(debuts) // 2]
+        gauche, droite, ici = [], [], []
+        for entree in entrees:
+            if entree[1] < self.centre:
+                gauche.append(entree)
+            elif entree[0] > self.centre:
+                droite.append(entree)
+            else:
+                ici.append(entree)
+        self.par_debut = sorted(ici, key=lambda entree: entree[0])
+        self.par_fin = sorted(ici, key=lambda entree: entree[1], reverse=True)
+        self.gauche = _Noeud(gauche) if gauche else None
+        self.droite = _Noeud(droite) if droite else None
+
+
+class ArbreIntervalles:
+    # Arbre d'intervalles statique sur [date_debut, date_fin] : recherche des tâches
+    # chevauchant une période en O(log n + k), construction en O(n log n)
+    def __init__(self, taches: Iterable[Tache]):
+        self.taches = list(taches)
+        self.taille = len(self.taches)
+        entrees = [(tache.date_debut, tache.date_fin, tache) for tache in self.taches]
+        self.racine = _Noeud(entrees) if entrees else None
+
+    def chevauchant(self, debut: datetime, fin: datetime) -> List[Tache]:
+        resultat: List[Tache] = []
+        a_visiter = [self.racine] if self.racine else []
+        while a_visiter:
+            noeud = a_visiter.pop()
+            if fin < noeud.centre:
+                for date_debut, _, tache in noeud.par_debut:
+                    if date_debut > fin:
+                        break
+                    resultat.append(tache)
+                if noeud.gauche:
+                    a_visiter.append(noeud.gauche)
+            elif debut > noeud.centre:
+                for _, date_fin, tache in noeud.par_fin:
+                    if date_fin < debut:
+                        break
+                    resultat.append(tache)
+                if noeud.droite:
+                    a_visiter.append(noeud.droite)
+            else:
+                resultat.extend(entree[2] for entree in noeud.par_debut)
+                if noeud.gauche:
+                    a_visiter.append(noeud.gauche)
+                if noeud.droite:
+                    a_visiter.append(noeud.droite)
+        return resultat
+
+
+class IndexTaches:
+    # Index secondaires sur les tâches d'un projet :
+    # - statut et responsable : tables de hachage vers des ensembles ordonnés (dict) ;
+    # - dates : suite d'arbres d'intervalles de tailles décroissantes (au plus log n arbres).
+    #   Les tâches ajoutées ou dont les dates ont changé sont insérées à la recherche suivante,
+    #   dans un nouvel arbre fusionné avec les derniers tant qu'ils ne sont pas plus grands ;
+    #   chaque tâche est ainsi reconstruite O(log n) fois. L'ancienne entrée d'une tâche déplacée
+    #   reste dans son arbre, ignorée, jusqu'à la prochaine fusion de celui-ci.
+    def __init__(self):
+        self.par_statut: Dict[str, Dict[Tache, None]] = {}
+        self.par_responsable: Dict[Membre, Dict[Tache, None]] = {}
+        self._taches: Dict[Tache, None] = {}
+        self._arbres: List[ArbreIntervalles] = []
+        # Arbre qui porte l'entrée à jour de chaque tâche (None : en attente d'insertion)
+        self._arbre_de: Dict[Tache, Optional[ArbreIntervalles]] = {}
+        self._a_inserer: Dict[Tache, None] = {}
+        self._perimees = 0
+
+    def __len__(self) -> int:
+        return len(self._taches)
+
+    def ajouter(self, tache: Tache):
+        self._taches[tache] = None
+        self.par_statut.setdefault(tache.statut, {})[tache] = None
+        self.par_responsable.setdefault(tache.responsable, {})[tache] = None
+        self._a_inserer[tache] = None
+
+    def ajouter_lot(self, taches: List[Tache]):
+        # Comme ajouter pour chaque tâche, sans dictionnaire vide alloué à chaque setdefault
+        nouvelles = dict.fromkeys(taches)
+        self._taches.update(nouvelles)
+        self._a_inserer.update(nouvelles)
+        for index, attribut in ((self.par_statut, "statut"), (self.par_responsable, "responsable")):
+            for tache in taches:
+                cle = getattr(tache, attribut)
+                ensemble = index.get(cle)
+                if ensemble is None:
+                    ensemble = index[cle] = {}
+                ensemble[tache] = None
+
+    def changer_statut(self, tache: Tache, ancien_statut: str):
+        self._deplacer(self.par_statut, tache, ancien_statut, tache.statut)
+
+    def changer_responsable(self, tache: Tache, ancien_responsable: Optional[Membre]):
+        self._deplacer(self.par_responsable, tache, ancien_responsable, tache.responsable)
+
+    def changer_dates(self, tache: Tache):
+        self._a_inserer[tache] = None
+
+    @staticmethod
+    def _deplacer(index: Dict, tache: Tache, ancienne_cle, nouvelle_cle):
+        ensemble = index.get(ancienne_cle)
+        if ensemble is not None:
+            ensemble.pop(tache, None)
+            if not ensemble:
+                del index[ancienne_cle]
+        index.setdefault(nouvelle_cle, {})[tache] = None
+
+    def _inserer(self):
+        taches = list(self._a_inserer)
+        self._a_inserer = {}
+        for tache in taches:
+            if self._arbre_de.get(tache) is not None:
+                self._perimees += 1
+            self._arbre_de[tache] = None
+        if self._perimees > len(self._taches):
+            # Trop d'entrées périmées : tout est reconstruit en un seul arbre
+            self._arbres = []
+            self._perimees = 0
+            taches = list(self._taches)
+        while self._arbres and self._arbres[-1].taille <= len(taches):
+            arbre = self._arbres.pop()
+            vivantes = [tache for tache in arbre.taches if self._arbre_de[tache] is arbre]
+            self._perimees -= arbre.taille - len(vivantes)
+            taches.extend(vivantes)
+        arbre = ArbreIntervalles(taches)
+        self._arbres.append(arbre)
+        for tache in taches:
+            self._arbre_de[tache] = arbre
+
+    def chevauchant(self, debut: Optional[datetime], fin: Optional[datetime]) -> List[Tache]:
+        # Tâches dont la période [date_debut, date_fin] chevauche [debut, fin] (bornes incluses)
+        if self._a_inserer:
+            self._inserer()
+        debut = debut if debut is not None else datetime.min
+        fin = fin if fin is not None else datetime.max
+        resultat = []
+        for arbre in self._arbres:
+            if self._perimees:
+                resultat.extend(tache for tache in arbre.chevauchant(debut, fin) if self._arbre_de[tache] is arbre)
+            else:
+                resultat.extend(arbre.chevauchant(debut, fin))
+        return resultat
+
+    def rechercher(self, statut: Optional[str] = None, responsable: Optional[Membre] = None,
+                   debut: Optional[datetime] = None, fin: Optional[datetime] = None) -> List[Tache]:
+        # Part du plus petit ensemble candidat puis filtre sur les autres critères
+        candidats = []
+        if statut is not None:
+            candidats.append(self.par_statut.get(statut, {}))
+        if responsable is not None:
+            candidats.append(self.par_responsable.get(responsable, {}))
+        if not candidats:
+            if debut is None and fin is None:
+                return list(self._taches)
+            return self.chevauchant(debut, fin)
+
+        plus_petit = min(candidats, key=len)
+        resultat = []
+        for tache in plus_petit:
+            if statut is not None and tache.statut != statut:
+                continue
+            if responsable is not None and tache.responsable is not responsable:
+                continue
+            if debut is not None and tache.date_fin < debut:
+                continue
+            if fin is not None and tache.date_debut > fin:
+                continue
+            resultat.append(tache)
+        return resultat
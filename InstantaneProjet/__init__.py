@@ -0,0 +1,382 @@
+import mmap
+import struct
+from datetime import datetime, timedelta
+from typing import BinaryIO, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from Changement import Changement
+from Jalon import Jalon
+from Membre import Membre
+from Projet import Projet
+from Risque import Risque
+from Tache import Tache
+
+# Format d'instantané (petit-boutiste, sans alignement) :
+#   en-tête | tâches | dépendances (CSR) | membres | risques | tâches des risques | jalons
+#   | changements | tas de chaînes UTF-8
+# Les chaînes sont désignées par (position dans le tas, longueur) ; les dates par un nombre
+# de microsecondes depuis l'époque Unix, _ABSENT valant None.
+MAGIQUE = b"MPQLSNP2"
+_ABSENT = -(2 ** 63)
+_EPOQUE = datetime(1970, 1, 1)
+_MICRO = timedelta(microseconds=1)
+
+_ENTETE = struct.Struct("<8s" + "Q" * 8 + "QI" * 2 + "qqdBq" + "Q" * 9)
+_TACHE = struct.Struct("<QIQIqqiQIqqqqqqB")
+_MEMBRE = struct.Struct("<QIQI")
+_RISQUE = struct.Struct("<QIdBdQIQI")
+_JALON = struct.Struct("<QIq")
+_CHANGEMENT = struct.Struct("<QIqq")
+
+# Vue NumPy (sans copie) de la table des tâches
+DTYPE_TACHE = np.dtype([
+    ("nom", "<u8"), ("nom_longueur", "<u4"), ("description", "<u8"), ("description_longueur", "<u4"),
+    ("date_debut", "<i8"), ("date_fin", "<i8"), ("responsable", "<i4"),
+    ("statut", "<u8"), ("statut_longueur", "<u4"),
+    ("ES", "<i8"), ("EF", "<i8"), ("LS", "<i8"), ("LF", "<i8"),
+    ("marge_totale", "<i8"), ("marge_libre", "<i8"), ("critique", "u1"),
+])
+assert DTYPE_TACHE.itemsize == _TACHE.size
+
+
+def _micro(date: Optional[datetime]) -> int:
+    return _ABSENT if date is None else (date - _EPOQUE) // _MICRO
+
+
+def _date(micro: int) -> Optional[datetime]:
+    return None if micro == _ABSENT else _EPOQUE + timedelta(microseconds=micro)
+
+
+def _entier(valeur: Optional[int]) -> int:
+    return _ABSENT if valeur is None else valeur
+
+
+def _ou_none(valeur: int) -> Optional[int]:
+    return None if valeur == _ABSENT else valeur
+
+
+class _Chaines:
+    # Tas de chaînes dédupliquées
+    def __init__(self):
+        self.morceaux: List[bytes] = []
+        self.taille = 0
+        self.references: Dict[str, tuple] = {}
+
+    def __call__(self, texte: str) -> tuple:
+        reference = self.references.get(texte)
+        if reference is None:
+            donnees = texte.encode("utf-8")
+            reference = self.references[texte] = (self.taille, len(donnees))
+            self.morceaux.append(donnees)
+            self.taille += len(donnees)
+        return reference
+
+
+def ordre_membres(projet: Projet) -> List[Membre]:
+    # Ordre des membres dans l'instantané : l'équipe, puis les responsables hors équipe
+    membres = list(projet.equipe.obtenir_membres())
+    connus = set(membres)
+    for tache in projet.taches:
+        if tache.responsable is not None and tache.responsable not in connus:
+            connus.add(tache.responsable)
+            membres.append(tache.responsable)
+    return membres
+
+
+def sauvegarder_instantane(projet: Projet, destination: Union[str, BinaryIO]):
+    # Écrit l'instantané complet du projet, dates calculées du chemin critique comprises
+    chaines = _Chaines()
+    taches = projet.taches
+    membres = ordre_membres(projet)
+    indices_membres = {membre: i for i, membre in enumerate(membres)}
+    lignes = {tache: i for i, tache in enumerate(taches)}
+    critiques = set(projet.chemin_critique)
+
+    # Table des tâches remplie colonne par colonne
+    n = len(taches)
+    table_taches = np.zeros(n, dtype=DTYPE_TACHE)
+    for champ in ("nom", "description", "statut"):
+        references = [chaines(getattr(tache, champ)) for tache in taches]
+        table_taches[champ] = np.fromiter((position for position, _ in references), dtype="<u8", count=n)
+        table_taches[champ + "_longueur"] = np.fromiter((longueur for _, longueur in references),
+                                                        dtype="<u4", count=n)
+    for champ in ("date_debut", "date_fin", "ES", "EF", "LS", "LF"):
+        table_taches[champ] = np.fromiter((_micro(getattr(tache, champ)) for tache in taches), "<i8", n)
+    table_taches["marge_totale"] = np.fromiter((_entier(tache.marge_totale) for tache in taches), "<i8", n)
+    table_taches["marge_libre"] = np.fromiter((_entier(tache.marge_libre) for tache in taches), "<i8", n)
+    table_taches["responsable"] = np.fromiter((indices_membres.get(tache.responsable, -1) for tache in taches),
+                                              "<i4", n)
+    table_taches["critique"] = np.fromiter((tache in critiques for tache in taches), "u1", n)
+    pointeurs = [0]
+    aretes: List[int] = []
+    for tache in taches:
+        aretes.extend(lignes[dep] for dep in tache.dependances)
+        pointeurs.append(len(aretes))
+
+    table_membres = b"".join(_MEMBRE.pack(*chaines(membre.nom), *chaines(membre.role)) for membre in membres)
+    taches_risques: List[int] = []
+    morceaux_risques = []
+    for risque in projet.risques:
+        numerique = not isinstance(risque.impact, str)
+        impact = chaines("") if numerique else chaines(risque.impact)
+        morceaux_risques.append(_RISQUE.pack(*chaines(risque.description), risque.probabilite, numerique,
+                                             float(risque.impact) if numerique else 0.0,
+                                             len(taches_risques), len(risque.taches), *impact))
+        taches_risques.extend(lignes[tache] for tache in risque.taches)
+    table_jalons = b"".join(_JALON.pack(*chaines(jalon.nom), _micro(jalon.date)) for jalon in projet.jalons)
+    table_changements = b"".join(_CHANGEMENT.pack(*chaines(changement.description), changement.version,
+                                                  _micro(changement.date))
+                                 for changement in projet.changements)
+
+    reference_nom = chaines(projet.nom)
+    reference_description = chaines(projet.description)
+    sections = [
+        table_taches.tobytes(),
+        np.array(pointeurs, dtype="<u8").tobytes(),
+        np.array(aretes, dtype="<u4").tobytes(),
+        table_membres,
+        b"".join(morceaux_risques),
+        np.array(taches_risques, dtype="<u4").tobytes(),
+        table_jalons,
+        table_changements,
+        b"".join(chaines.morceaux),
+    ]
+    positions = []
+    position = _ENTETE.size
+    for section in sections:
+        positions.append(position)
+        position += len(section)
+    entete = _ENTETE.pack(MAGIQUE, len(taches), len(aretes), len(membres), len(projet.risques),
+                          len(taches_risques), len(projet.jalons), len(projet.changements),
+                          len(projet.equipe.obtenir_membres()),
+                          *reference_nom, *reference_description,
+                          _micro(projet.date_debut), _micro(projet.date_fin), float(projet.budget),
+                          isinstance(projet.budget, int), projet.version,
+                          *positions)
+
+    if isinstance(destination, str):
+        with open(destination, "wb") as fichier:
+            fichier.write(entete)
+            fichier.writelines(sections)
+    else:
+        destination.write(entete)
+        destination.writelines(sections)
+
+
+class TachesInstantane(Sequence):
+    # Séquence paresseuse des tâches : une Tache n'est construite qu'au premier accès,
+    # avec ses ascendants (nécessaires à Tache.dependances), puis gardée en cache
+    def __init__(self, instantane: "Instantane"):
+        self._instantane = instantane
+        self._cache: Dict[int, Tache] = {}
+
+    def __len__(self) -> int:
+        return self._instantane.nb_taches
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return [self[i] for i in range(*indice.indices(len(self)))]
+        if indice < 0:
+            indice += len(self)
+        if not 0 <= indice < len(self):
+            raise IndexError(indice)
+        tache = self._cache.get(indice)
+        if tache is None:
+            tache = self._materialiser(indice)
+        return tache
+
+    def tout_materialiser(self) -> List[Tache]:
+        # Toutes les tâches d'un coup, colonne par colonne : objets d'abord, dépendances ensuite
+        instantane = self._instantane
+        table = instantane.table_taches
+        chaines = instantane.tas_chaines()
+        membres = instantane.membres + [None]
+
+        def textes(champ):
+            return [chaines[p:p + n].decode("utf-8")
+                    for p, n in zip(table[champ].tolist(), table[champ + "_longueur"].tolist())]
+
+        def dates(champ):
+            # NaT (datetime64) a la même valeur que _ABSENT et devient None
+            return table[champ].view("datetime64[us]").astype(object).tolist()
+
+        def entiers(champ):
+            return [None if valeur == _ABSENT else valeur for valeur in table[champ].tolist()]
+
+        colonnes = zip(range(len(self)), textes("nom"), textes("description"), dates("date_debut"),
+                       dates("date_fin"), table["responsable"].tolist(), textes("statut"), dates("ES"),
+                       dates("EF"), dates("LS"), dates("LF"), entiers("marge_totale"), entiers("marge_libre"))
+        nouvelles = []
+        for i, nom, description, debut, fin, responsable, statut, es, ef, ls, lf, marge_totale, marge_libre \
+                in colonnes:
+            if i in self._cache:
+                continue
+            tache = Tache(nom, description, debut, fin, membres[responsable], statut)
+            tache.ES, tache.EF, tache.LS, tache.LF = es, ef, ls, lf
+            tache.marge_totale = marge_totale
+            tache.marge_libre = marge_libre
+            self._cache[i] = tache
+            nouvelles.append(i)
+        pointeurs = instantane.pointeurs.tolist()
+        aretes = instantane.aretes.tolist()
+        taches = [self._cache[i] for i in range(len(self))]
+        for i in nouvelles:
+            if pointeurs[i] != pointeurs[i + 1]:
+                taches[i].dependances = [taches[dep] for dep in aretes[pointeurs[i]:pointeurs[i + 1]]]
+        return taches
+
+    def _materialiser(self, indice: int) -> Tache:
+        # Parcours itératif en profondeur : une tâche n'est complétée qu'après ses dépendances
+        instantane = self._instantane
+        pile = [indice]
+        while pile:
+            courant = pile[-1]
+            if courant in self._cache:
+                pile.pop()
+                continue
+            manquantes = [dep for dep in instantane.dependances(courant) if dep not in self._cache]
+            if manquantes:
+                pile.extend(manquantes)
+                continue
+            pile.pop()
+            tache = instantane.lire_tache(courant)
+            for dep in instantane.dependances(courant):
+                tache.ajouter_dependance(self._cache[dep])
+            self._cache[courant] = tache
+        return self._cache[indice]
+
+
+class Instantane:
+    # Lecture d'un instantané sans copie : seul l'en-tête est décodé à l'ouverture, les tables
+    # sont lues à la demande dans le tampon (mmap en lecture seule, partageable entre processus)
+    def __init__(self, tampon, fichier=None):
+        self._tampon = tampon
+        self._fichier = fichier
+        champs = _ENTETE.unpack_from(tampon, 0)
+        if champs[0] != MAGIQUE:
+            raise ValueError("Ce fichier n'est pas un instantané de projet")
+        (self.nb_taches, self.nb_aretes, self.nb_membres, self.nb_risques, self._nb_taches_risques,
+         self.nb_jalons, self.nb_changements, self.nb_equipe) = champs[1:9]
+        self._nom = champs[9:11]
+        self._description = champs[11:13]
+        self.date_debut = _date(champs[13])
+        self.date_fin = _date(champs[14])
+        self.budget = int(champs[15]) if champs[16] else champs[15]
+        self.version = champs[17]
+        (self._pos_taches, self._pos_pointeurs, self._pos_aretes, self._pos_membres, self._pos_risques,
+         self._pos_taches_risques, self._pos_jalons, self._pos_changements, self._pos_chaines) = champs[18:27]
+        self.pointeurs = np.frombuffer(tampon, dtype="<u8", count=self.nb_taches + 1, offset=self._pos_pointeurs)
+        self.aretes = np.frombuffer(tampon, dtype="<u4", count=self.nb_aretes, offset=self._pos_aretes)
+        self.table_taches = np.frombuffer(tampon, dtype=DTYPE_TACHE, count=self.nb_taches, offset=self._pos_taches)
+        self.taches = TachesInstantane(self)
+        self._membres: Optional[List[Membre]] = None
+
+    @classmethod
+    def ouvrir(cls, chemin: str) -> "Instantane":
+        fichier = open(chemin, "rb")
+        return cls(mmap.mmap(fichier.fileno(), 0, access=mmap.ACCESS_READ), fichier)
+
+    @classmethod
+    def depuis_octets(cls, donnees: bytes) -> "Instantane":
+        return cls(memoryview(donnees))
+
+    def fermer(self):
+        # Les vues NumPy doivent être relâchées avant de fermer le mmap
+        self.pointeurs = self.aretes = self.table_taches = None
+        if self._fichier is not None:
+            self._tampon.close()
+            self._fichier.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fermer()
+
+    def tas_chaines(self) -> bytes:
+        return bytes(self._tampon[self._pos_chaines:])
+
+    def chaine(self, position: int, longueur: int) -> str:
+        debut = self._pos_chaines + position
+        return bytes(self._tampon[debut:debut + longueur]).decode("utf-8")
+
+    @property
+    def nom(self) -> str:
+        return self.chaine(*self._nom)
+
+    @property
+    def description(self) -> str:
+        return self.chaine(*self._description)
+
+    @property
+    def membres(self) -> List[Membre]:
+        if self._membres is None:
+            self._membres = []
+            for i in range(self.nb_membres):
+                nom, nom_longueur, role, role_longueur = _MEMBRE.unpack_from(
+                    self._tampon, self._pos_membres + i * _MEMBRE.size)
+                self._membres.append(Membre(self.chaine(nom, nom_longueur), self.chaine(role, role_longueur)))
+        return self._membres
+
+    def dependances(self, indice: int) -> List[int]:
+        return self.aretes[self.pointeurs[indice]:self.pointeurs[indice + 1]].tolist()
+
+    def lire_tache(self, indice: int) -> Tache:
+        # Construit une Tache sans ses dépendances
+        (nom, nom_longueur, description, description_longueur, debut, fin, responsable, statut,
+         statut_longueur, es, ef, ls, lf, marge_totale, marge_libre, _) = _TACHE.unpack_from(
+            self._tampon, self._pos_taches + indice * _TACHE.size)
+        tache = Tache(self.chaine(nom, nom_longueur), self.chaine(description, description_longueur),
+                      _date(debut), _date(fin), self.membres[responsable] if responsable >= 0 else None,
+                      self.chaine(statut, statut_longueur))
+        tache.ES, tache.EF, tache.LS, tache.LF = _date(es), _date(ef), _date(ls), _date(lf)
+        tache.marge_totale = _ou_none(marge_totale)
+        tache.marge_libre = _ou_none(marge_libre)
+        return tache
+
+    def risques(self) -> List[Risque]:
+        taches_risques = np.frombuffer(self._tampon, dtype="<u4", count=self._nb_taches_risques,
+                                       offset=self._pos_taches_risques)
+        risques = []
+        for i in range(self.nb_risques):
+            (description, description_longueur, probabilite, numerique, valeur, premiere, nombre,
+             impact, impact_longueur) = _RISQUE.unpack_from(self._tampon, self._pos_risques + i * _RISQUE.size)
+            taches = [self.taches[int(j)] for j in taches_risques[premiere:premiere + nombre]]
+            risques.append(Risque(self.chaine(description, description_longueur), probabilite,
+                                  valeur if numerique else self.chaine(impact, impact_longueur), taches))
+        return risques
+
+    def jalons(self) -> List[Jalon]:
+        jalons = []
+        for i in range(self.nb_jalons):
+            nom, longueur, date = _JALON.unpack_from(self._tampon, self._pos_jalons + i * _JALON.size)
+            jalons.append(Jalon(self.chaine(nom, longueur), _date(date)))
+        return jalons
+
+    def changements(self) -> List[Changement]:
+        changements = []
+        for i in range(self.nb_changements):
+            description, longueur, version, date = _CHANGEMENT.unpack_from(
+                self._tampon, self._pos_changements + i * _CHANGEMENT.size)
+            changements.append(Changement(self.chaine(description, longueur), version, _date(date)))
+        return changements
+
+    def projet(self) -> Projet:
+        # Matérialise tout l'instantané en un Projet complet (sans notification)
+        projet = Projet(self.nom, self.description, self.date_debut, self.date_fin, self.budget)
+        # Les premiers membres forment l'équipe, les suivants ne sont que responsables de tâches
+        for membre in self.membres[:self.nb_equipe]:
+            projet.equipe.ajouter_membre(membre)
+        projet.ajouter_taches(self.taches.tout_materialiser())
+        projet.risques.extend(self.risques())
+        projet.jalons.extend(self.jalons())
+        projet.changements.extend(self.changements())
+        projet.version = self.version
+        critiques = np.flatnonzero(self.table_taches["critique"]).tolist()
+        projet.chemin_critique = [self.taches[i] for i in critiques]
+        return projet
+
+
+def charger_instantane(chemin: str) -> Instantane:
+    return Instantane.ouvrir(chemin)
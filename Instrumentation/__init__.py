@@ -0,0 +1,243 @@
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from functools import wraps
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+QUANTILES = (0.5, 0.99)
+# Histogramme à seaux logarithmiques : 8 seaux par puissance de deux (erreur relative < 9 %)
+_SEAUX_PAR_OCTAVE = 8
+
+Etiquettes = Tuple[Tuple[str, str], ...]
+
+
+class Mesure:
+    __slots__ = ("nom", "valeur", "etiquettes", "nature", "instant")
+
+    def __init__(self, nom: str, valeur: float, etiquettes: Etiquettes, nature: str):
+        self.nom = nom
+        self.valeur = valeur
+        self.etiquettes = etiquettes
+        # "duree" (secondes) ou "compteur"
+        self.nature = nature
+        self.instant = time.time()
+
+
+class Histogramme:
+    # Distribution des valeurs d'une série : nombre, somme, extrêmes et seaux logarithmiques
+    __slots__ = ("nombre", "somme", "minimum", "maximum", "seaux")
+
+    def __init__(self):
+        self.nombre = 0
+        self.somme = 0.0
+        self.minimum = math.inf
+        self.maximum = 0.0
+        self.seaux: Dict[int, int] = {}
+
+    def ajouter(self, valeur: float):
+        self.nombre += 1
+        self.somme += valeur
+        if valeur < self.minimum:
+            self.minimum = valeur
+        if valeur > self.maximum:
+            self.maximum = valeur
+        seau = math.floor(math.log2(valeur) * _SEAUX_PAR_OCTAVE) if valeur > 0 else -10 ** 6
+        seaux = self.seaux
+        seaux[seau] = seaux.get(seau, 0) + 1
+
+    def quantile(self, q: float) -> float:
+        if not self.nombre:
+            return math.nan
+        rang = q * (self.nombre - 1)
+        cumul = 0
+        for seau in sorted(self.seaux):
+            cumul += self.seaux[seau]
+            if cumul > rang:
+                if seau == -10 ** 6:
+                    return 0.0
+                # Milieu géométrique du seau, borné par les extrêmes observés
+                valeur = 2 ** ((seau + 0.5) / _SEAUX_PAR_OCTAVE)
+                return min(max(valeur, self.minimum), self.maximum)
+        return self.maximum
+
+
+class HistogrammeMemoire:
+    # Puits agrégeant les mesures en mémoire : histogrammes des durées, totaux des compteurs
+    def __init__(self):
+        self.histogrammes: Dict[Tuple[str, Etiquettes], Histogramme] = {}
+        self.compteurs: Dict[Tuple[str, Etiquettes], float] = {}
+        self._verrou = threading.Lock()
+
+    def recevoir(self, mesure: Mesure):
+        cle = (mesure.nom, mesure.etiquettes)
+        with self._verrou:
+            if mesure.nature == "compteur":
+                self.compteurs[cle] = self.compteurs.get(cle, 0) + mesure.valeur
+            else:
+                histogramme = self.histogrammes.get(cle)
+                if histogramme is None:
+                    histogramme = self.histogrammes[cle] = Histogramme()
+                histogramme.ajouter(mesure.valeur)
+
+    def resume(self, nom: str, **etiquettes: str) -> Dict[str, float]:
+        # Nombre, somme, p50 et p99 d'une série de durées
+        histogramme = self.histogrammes.get((nom, _etiquettes(etiquettes)), Histogramme())
+        return {"nombre": histogramme.nombre, "somme": histogramme.somme,
+                "p50": histogramme.quantile(0.5), "p99": histogramme.quantile(0.99)}
+
+    def compteur(self, nom: str, **etiquettes: str) -> float:
+        return self.compteurs.get((nom, _etiquettes(etiquettes)), 0)
+
+    def resumes(self) -> List[Dict]:
+        with self._verrou:
+            return [dict(self.resume(nom, **dict(etiquettes)), nom=nom, etiquettes=dict(etiquettes))
+                    for nom, etiquettes in sorted(self.histogrammes)]
+
+    def texte_prometheus(self, prefixe: str = "mpql_") -> str:
+        # Format d'exposition texte de Prometheus : durées en résumés (p50, p99), compteurs en totaux
+        lignes = []
+        with self._verrou:
+            series = sorted(self.histogrammes.items())
+            compteurs = sorted(self.compteurs.items())
+        for nom in sorted({nom for (nom, _), _ in series}):
+            lignes.append(f"# TYPE {prefixe}{nom}_secondes summary")
+            for (autre, etiquettes), histogramme in series:
+                if autre != nom:
+                    continue
+                for q in QUANTILES:
+                    lignes.append(f"{prefixe}{nom}_secondes{_format(etiquettes + (('quantile', str(q)),))} "
+                                  f"{histogramme.quantile(q):.9g}")
+                lignes.append(f"{prefixe}{nom}_secondes_sum{_format(etiquettes)} {histogramme.somme:.9g}")
+                lignes.append(f"{prefixe}{nom}_secondes_count{_format(etiquettes)} {histogramme.nombre}")
+        for nom in sorted({nom for (nom, _), _ in compteurs}):
+            lignes.append(f"# TYPE {prefixe}{nom}_total counter")
+            for (autre, etiquettes), valeur in compteurs:
+                if autre == nom:
+                    lignes.append(f"{prefixe}{nom}_total{_format(etiquettes)} {valeur:.9g}")
+        return "".join(ligne + "\n" for ligne in lignes)
+
+
+class FichierPrometheus(HistogrammeMemoire):
+    # Puits qui réécrit un fichier texte Prometheus (collecteur « textfile ») au plus toutes les
+    # `intervalle` secondes ; l'écriture passe par un fichier temporaire renommé
+    def __init__(self, chemin: str, intervalle: float = 10.0, prefixe: str = "mpql_"):
+        super().__init__()
+        self.chemin = chemin
+        self.intervalle = intervalle
+        self.prefixe = prefixe
+        self._derniere_ecriture = -math.inf
+
+    def recevoir(self, mesure: Mesure):
+        super().recevoir(mesure)
+        if time.monotonic() - self._derniere_ecriture >= self.intervalle:
+            self.ecrire()
+
+    def ecrire(self):
+        self._derniere_ecriture = time.monotonic()
+        temporaire = f"{self.chemin}.{os.getpid()}.tmp"
+        with open(temporaire, "w", encoding="utf-8") as fichier:
+            fichier.write(self.texte_prometheus(self.prefixe))
+        os.replace(temporaire, self.chemin)
+
+
+class JournalJSON:
+    # Puits écrivant chaque mesure sur une ligne JSON
+    def __init__(self, flux: TextIO):
+        self.flux = flux
+        self._verrou = threading.Lock()
+
+    def recevoir(self, mesure: Mesure):
+        ligne = json.dumps({"instant": mesure.instant, "nom": mesure.nom, "nature": mesure.nature,
+                            "valeur": mesure.valeur, **dict(mesure.etiquettes)}, ensure_ascii=False)
+        with self._verrou:
+            self.flux.write(ligne + "\n")
+
+
+def _etiquettes(etiquettes: Dict[str, str]) -> Etiquettes:
+    return tuple(sorted((cle, str(valeur)) for cle, valeur in etiquettes.items()))
+
+
+def _format(etiquettes: Etiquettes) -> str:
+    if not etiquettes:
+        return ""
+    return "{" + ",".join(f'{cle}="{valeur}"' for cle, valeur in etiquettes) + "}"
+
+
+# Instrumentation active dans le contexte courant (thread, tâche asyncio) : l'activer dans un
+# thread ou un test ne mesure pas ce qui s'exécute ailleurs
+_courante: ContextVar[Optional["Instrumentation"]] = ContextVar("instrumentation", default=None)
+
+
+def instrumentation_courante() -> Optional["Instrumentation"]:
+    # None tant qu'aucune instrumentation n'est active : c'est le seul test fait sur les chemins chauds
+    return _courante.get()
+
+
+def mutation(operation: str):
+    # Posé sur les mutations de Projet : durée mesurée sous « projet_mutation » quand une
+    # instrumentation est active dans le contexte de l'appel, un seul test sinon
+    def decorer(methode):
+        @wraps(methode)
+        def enveloppe(*args, **kwargs):
+            instrumentation = _courante.get()
+            if instrumentation is None:
+                return methode(*args, **kwargs)
+            debut = time.perf_counter()
+            try:
+                return methode(*args, **kwargs)
+            finally:
+                instrumentation.mesurer("projet_mutation", time.perf_counter() - debut, operation=operation)
+        return enveloppe
+    return decorer
+
+
+class Instrumentation:
+    # Mesures de performance, à activer explicitement ; chaque mesure est transmise à tous les puits
+    def __init__(self, puits: Iterable = ()):
+        self.puits = list(puits) or [HistogrammeMemoire()]
+        self._jetons: List[Token] = []
+
+    def mesurer(self, nom: str, secondes: float, **etiquettes: str):
+        mesure = Mesure(nom, secondes, _etiquettes(etiquettes), "duree")
+        for puits in self.puits:
+            puits.recevoir(mesure)
+
+    def compter(self, nom: str, valeur: float = 1, **etiquettes: str):
+        mesure = Mesure(nom, valeur, _etiquettes(etiquettes), "compteur")
+        for puits in self.puits:
+            puits.recevoir(mesure)
+
+    @contextmanager
+    def chronometre(self, nom: str, **etiquettes: str) -> Iterator[None]:
+        debut = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.mesurer(nom, time.perf_counter() - debut, **etiquettes)
+
+    def activer(self) -> "Instrumentation":
+        # Active pour le contexte courant seulement ; une activation imbriquée masque la précédente
+        # jusqu'à sa désactivation
+        self._jetons.append(_courante.set(self))
+        return self
+
+    def desactiver(self):
+        if not self._jetons:
+            return
+        jeton = self._jetons.pop()
+        try:
+            _courante.reset(jeton)
+        except ValueError:
+            # Désactivée depuis un autre contexte que celui de l'activation
+            if _courante.get() is self:
+                _courante.set(None)
+
+    def __enter__(self) -> "Instrumentation":
+        return self.activer()
+
+    def __exit__(self, *exc):
+        self.desactiver()
@@ -2,6 +2,8 @@ from datetime import datetime
 
 
 class Jalon:
+    __slots__ = ("nom", "date")
+
     def __init__(self, nom: str, date: datetime):
         self.nom = nom
-        self.date = date
\ No newline at end of file
+        self.date = date
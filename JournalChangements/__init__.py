@@ -0,0 +1,321 @@
+import glob
+import io
+import json
+import os
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from Changement import Changement
+from InstantaneProjet import Instantane, ordre_membres, sauvegarder_instantane
+from Jalon import Jalon
+from Membre import Membre
+from Projet import Projet
+from Risque import Risque
+from Tache import Tache
+
+# Format du journal : une ligne d'en-tête puis une opération JSON par ligne, en ajout seul.
+# Les tâches et les membres y sont désignés par leur rang ; les rangs sont renumérotés à chaque
+# point de reprise dans l'ordre de l'instantané pris à ce moment-là. Un membre est déclaré (nom, rôle)
+# à sa première apparition, puis désigné par son rang.
+ENTETE = "journal-mpql"
+
+
+def _iso(date: Optional[datetime]) -> Optional[str]:
+    return None if date is None else date.isoformat()
+
+
+def _date(texte: Optional[str]) -> Optional[datetime]:
+    return None if texte is None else datetime.fromisoformat(texte)
+
+
+class JournalChangements:
+    # Journal des opérations d'un projet. Toutes les `intervalle_points` opérations, un point de
+    # reprise (instantané binaire) est écrit : reconstruire une version ne rejoue que les opérations
+    # qui la séparent du point précédent, quelle que soit la longueur de l'historique.
+    # Le point de reprise est écrit de façon synchrone, pendant la mutation qui atteint l'intervalle :
+    # celle-ci paie un instantané complet du projet (O(n), plusieurs dizaines de millisecondes pour 10 000 tâches),
+    # les autres seulement une ligne JSON. Un intervalle plus grand espace ces pics au prix de
+    # reconstructions plus longues.
+    def __init__(self, chemin: Optional[str] = None, intervalle_points: int = 1000):
+        if intervalle_points < 1:
+            raise ValueError("L'intervalle entre points de reprise doit être positif")
+        self.chemin = chemin
+        self.intervalle_points = intervalle_points
+        self.nb_operations = 0
+        self.version_initiale: Optional[int] = None
+        # Rang de l'opération « changement » qui clôt chaque version depuis version_initiale
+        self._fins_versions: List[int] = []
+        # Points de reprise : nombre d'opérations -> position de l'opération suivante dans le flux
+        self._points: Dict[int, int] = {}
+        self._instantanes: Dict[int, bytes] = {}
+        # Rangs courants (depuis le dernier point de reprise) et dépendances en attente
+        self._taches: Dict[Tache, int] = {}
+        self._membres: Dict[Membre, int] = {}
+        self._en_attente: Dict[Tache, List[Tache]] = {}
+        # Point de reprise dû mais reporté à la fin d'une mutation composée
+        self._point_du = False
+        # Nombre d'opérations rejouées par la dernière reconstruction
+        self.operations_rejouees = 0
+        if chemin is None:
+            self._flux = io.BytesIO()
+        else:
+            self._flux = open(chemin, "a+b")
+            self._relire()
+
+    @property
+    def version_courante(self) -> Optional[int]:
+        if self.version_initiale is None:
+            return None
+        return self.version_initiale + len(self._fins_versions)
+
+    def fermer(self):
+        self._flux.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fermer()
+
+    def attacher(self, projet: Projet):
+        if self.version_initiale is not None:
+            raise ValueError("Ce journal contient déjà l'historique d'un projet")
+        self.version_initiale = projet.version
+        self._ecrire({"op": ENTETE, "version": projet.version, "intervalle": self.intervalle_points})
+        self._point_de_reprise(projet)
+        projet.observer(self._observer(projet))
+
+    def _observer(self, projet: Projet):
+        def enregistrer(nature: str, objet, detail):
+            self.enregistrer(projet, nature, objet, detail)
+        return enregistrer
+
+    # --- Écriture ---
+
+    def enregistrer(self, projet: Projet, nature: str, objet, detail=None):
+        if nature == "taches":
+            operation = self._operation_taches(objet)
+        elif nature == "membres":
+            # Un membre déjà connu (responsable hors équipe) garde son rang : pas de doublon au rejeu
+            lignes = []
+            for membre in objet:
+                if membre in self._membres:
+                    lignes.append(self._membres[membre])
+                else:
+                    self._membres[membre] = len(self._membres)
+                    lignes.append([membre.nom, membre.role])
+            operation = {"op": "membres", "membres": lignes}
+        elif nature == "budget":
+            operation = {"op": "budget", "valeur": objet}
+        elif nature == "risques":
+            operation = {"op": "risques", "risques": [
+                [r.description, r.probabilite, r.impact, [self._taches[t] for t in r.taches if t in self._taches]]
+                for r in objet]}
+        elif nature == "jalons":
+            operation = {"op": "jalons", "jalons": [[j.nom, _iso(j.date)] for j in objet]}
+        elif nature == "changement":
+            self._fins_versions.append(self.nb_operations)
+            operation = {"op": "changement", "description": objet.description, "version": objet.version,
+                         "date": _iso(objet.date)}
+        elif nature == "statut":
+            operation = {"op": "statut", "tache": self._taches[objet], "valeur": objet.statut}
+        elif nature == "dates":
+            operation = {"op": "dates", "tache": self._taches[objet], "debut": _iso(objet.date_debut),
+                         "fin": _iso(objet.date_fin)}
+        elif nature == "dependances" and detail is None:
+            # Liste remplacée ou modifiée en place : consignée en entier
+            for dependance in objet.dependances:
+                if dependance not in self._taches:
+                    self._en_attente.setdefault(dependance, []).append(objet)
+            operation = {"op": "liens", "liens": [[self._taches[objet], [self._taches[d] for d in objet.dependances
+                                                                          if d in self._taches]]]}
+        elif nature == "dependances":
+            if detail not in self._taches:
+                # Dépendance vers une tâche pas encore ajoutée au projet
+                self._en_attente.setdefault(detail, []).append(objet)
+                return
+            operation = {"op": "dependance", "tache": self._taches[objet], "dependance": self._taches[detail]}
+        elif nature == "responsable":
+            operation = {"op": "responsable", "tache": self._taches[objet]}
+            operation["membre"] = self._rang_membre(objet.responsable, operation)
+        elif nature == "membre_retire":
+            operation = {"op": "retrait_membre", "membre": self._membres[objet]}
+            operation["remplacant"] = self._rang_membre(detail, operation)
+        elif nature == "membre_modifie":
+            operation = {"op": "modification_membre", "membre": self._membres[objet], "nom": objet.nom,
+                         "role": objet.role}
+        else:
+            return
+        self._ecrire(operation)
+        self.nb_operations += 1
+        if self.nb_operations % self.intervalle_points == 0:
+            self._point_du = True
+        if self._point_du and not projet._composees:
+            # Jamais au milieu d'une mutation composée (retrait d'un membre et réassignation de ses
+            # tâches) : l'instantané et les rangs renumérotés ne correspondraient à aucun état rejouable
+            self._point_du = False
+            self._point_de_reprise(projet)
+
+    def _rang_membre(self, membre: Optional[Membre], operation: dict) -> Optional[int]:
+        # Rang d'un membre ; un membre encore inconnu du journal est déclaré dans l'opération
+        if membre is None:
+            return None
+        if membre not in self._membres:
+            self._membres[membre] = len(self._membres)
+            operation.setdefault("membres", []).append([membre.nom, membre.role])
+        return self._membres[membre]
+
+    def _operation_taches(self, taches: List[Tache]) -> dict:
+        nouveaux_membres = []
+        for tache in taches:
+            self._taches[tache] = len(self._taches)
+            if tache.responsable is not None and tache.responsable not in self._membres:
+                self._membres[tache.responsable] = len(self._membres)
+                nouveaux_membres.append([tache.responsable.nom, tache.responsable.role])
+        lignes = []
+        completees = []
+        for tache in taches:
+            connues = []
+            for dependance in tache.dependances:
+                if dependance in self._taches:
+                    connues.append(self._taches[dependance])
+                else:
+                    self._en_attente.setdefault(dependance, []).append(tache)
+            lignes.append([tache.nom, tache.description, _iso(tache.date_debut), _iso(tache.date_fin),
+                           self._membres.get(tache.responsable), tache.statut, connues])
+            completees.extend(self._en_attente.pop(tache, ()))
+        operation = {"op": "taches", "taches": lignes}
+        if nouveaux_membres:
+            operation["membres"] = nouveaux_membres
+        if completees:
+            # Tâches dont les dépendances manquantes viennent d'arriver : liste complète
+            operation["liens"] = [[self._taches[t], [self._taches[d] for d in t.dependances if d in self._taches]]
+                                  for t in dict.fromkeys(completees) if t in self._taches]
+        return operation
+
+    def _ecrire(self, operation: dict):
+        self._flux.write(json.dumps(operation, ensure_ascii=False).encode("utf-8") + b"\n")
+
+    def _point_de_reprise(self, projet: Projet):
+        self._flux.flush()
+        self._points[self.nb_operations] = self._flux.tell()
+        if self.chemin is None:
+            tampon = io.BytesIO()
+            sauvegarder_instantane(projet, tampon)
+            self._instantanes[self.nb_operations] = tampon.getvalue()
+        else:
+            sauvegarder_instantane(projet, self._chemin_point(self.nb_operations))
+        self._taches = {tache: i for i, tache in enumerate(projet.taches)}
+        self._membres = {membre: i for i, membre in enumerate(ordre_membres(projet))}
+
+    def _chemin_point(self, nb_operations: int) -> str:
+        return f"{self.chemin}.{nb_operations:012d}.instantane"
+
+    def _relire(self):
+        # Journal existant : reconstitue les versions et les points de reprise (lecture seule)
+        self._flux.seek(0)
+        ligne = self._flux.readline()
+        if not ligne:
+            return
+        entete = json.loads(ligne)
+        if entete.get("op") != ENTETE:
+            raise ValueError("Ce fichier n'est pas un journal de changements")
+        self.version_initiale = entete["version"]
+        self.intervalle_points = entete["intervalle"]
+        points = {int(chemin.rsplit(".", 2)[1]) for chemin in glob.glob(glob.escape(self.chemin) + ".*.instantane")}
+        while True:
+            if self.nb_operations in points:
+                self._points[self.nb_operations] = self._flux.tell()
+            ligne = self._flux.readline()
+            if not ligne.endswith(b"\n"):
+                break
+            if json.loads(ligne)["op"] == "changement":
+                self._fins_versions.append(self.nb_operations)
+            self.nb_operations += 1
+
+    # --- Lecture ---
+
+    def a_la_version(self, version: int) -> Projet:
+        courante = self.version_courante
+        if courante is None or not self.version_initiale <= version <= courante:
+            raise ValueError(f"Version {version} absente du journal")
+        fin = self.nb_operations if version == courante else self._fins_versions[version - self.version_initiale]
+        # Point de reprise le plus proche avant la version demandée
+        point = fin - fin % self.intervalle_points
+        if point not in self._points:
+            point = max(n for n in self._points if n <= fin)
+        projet = self._restaurer(point)
+        membres = list(ordre_membres(projet))
+        taches = list(projet.taches)
+        self.operations_rejouees = fin - point
+        self._flux.flush()
+        self._flux.seek(self._points[point])
+        try:
+            for _ in range(fin - point):
+                self._appliquer(projet, membres, taches, json.loads(self._flux.readline()))
+        finally:
+            self._flux.seek(0, os.SEEK_END)
+        return projet
+
+    def _restaurer(self, point: int) -> Projet:
+        if self.chemin is None:
+            return Instantane.depuis_octets(self._instantanes[point]).projet()
+        with Instantane.ouvrir(self._chemin_point(point)) as instantane:
+            return instantane.projet()
+
+    @staticmethod
+    def _appliquer(projet: Projet, membres: List[Membre], taches: List[Tache], operation: dict):
+        nature = operation["op"]
+        if nature == "taches":
+            membres.extend(Membre(nom, role) for nom, role in operation.get("membres", ()))
+            premiere = len(taches)
+            for nom, description, debut, fin, responsable, statut, _ in operation["taches"]:
+                taches.append(Tache(nom, description, _date(debut), _date(fin),
+                                    membres[responsable] if responsable is not None else None, statut))
+            for tache, ligne in zip(taches[premiere:], operation["taches"]):
+                if ligne[6]:
+                    tache.dependances = [taches[i] for i in ligne[6]]
+            for i, dependances in operation.get("liens", ()):
+                taches[i].dependances = [taches[j] for j in dependances]
+            for tache in taches[premiere:]:
+                projet.ajouter_tache(tache)
+        elif nature == "liens":
+            for i, dependances in operation["liens"]:
+                taches[i].dependances = [taches[j] for j in dependances]
+        elif nature == "membres":
+            for ligne in operation["membres"]:
+                if isinstance(ligne, int):
+                    membre = membres[ligne]
+                else:
+                    membre = Membre(*ligne)
+                    membres.append(membre)
+                projet.ajouter_membre_equipe(membre)
+        elif nature == "budget":
+            projet.definir_budget(operation["valeur"])
+        elif nature == "risques":
+            for description, probabilite, impact, indices in operation["risques"]:
+                projet.ajouter_risque(Risque(description, probabilite, impact, [taches[i] for i in indices]))
+        elif nature == "jalons":
+            for nom, date in operation["jalons"]:
+                projet.ajouter_jalon(Jalon(nom, _date(date)))
+        elif nature == "changement":
+            projet.changements.append(Changement(operation["description"], operation["version"],
+                                                 _date(operation["date"])))
+            projet.version = operation["version"] + 1
+        elif nature == "statut":
+            taches[operation["tache"]].mettre_a_jour_statut(operation["valeur"])
+        elif nature == "dates":
+            taches[operation["tache"]].modifier_dates(_date(operation["debut"]), _date(operation["fin"]))
+        elif nature == "dependance":
+            taches[operation["tache"]].ajouter_dependance(taches[operation["dependance"]])
+        elif nature in ("responsable", "retrait_membre"):
+            membres.extend(Membre(nom, role) for nom, role in operation.get("membres", ()))
+            if nature == "responsable":
+                membre = operation["membre"]
+                taches[operation["tache"]].changer_responsable(membres[membre] if membre is not None else None)
+            else:
+                remplacant = operation["remplacant"]
+                projet.retirer_membre_equipe(membres[operation["membre"]],
+                                             membres[remplacant] if remplacant is not None else None)
+        elif nature == "modification_membre":
+            projet.modifier_membre_equipe(membres[operation["membre"]], operation["nom"], operation["role"])
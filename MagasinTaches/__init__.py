@@ -0,0 +1,372 @@
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from Equipe import Equipe
+from Membre import Membre
+from MoteurCheminCritique import ordonner_taches
+from OrdonnanceurLot import GrapheCSR
+from Tache import Tache
+
+if TYPE_CHECKING:
+    from Projet import Projet
+
+# Valeur des colonnes ES/EF/LS/LF tant que le chemin critique n'est pas calculé
+_ABSENT = np.iinfo(np.int64).min
+_UN_JOUR = timedelta(days=1)
+# Attributs d'une tâche rangée lus et écrits dans les colonnes du magasin
+ATTRIBUTS_EN_COLONNES = ("date_debut", "date_fin", "responsable", "statut", "ES", "EF", "LS", "LF",
+                         "marge_totale", "marge_libre")
+_RESULTATS_CPM = ("ES", "EF", "LS", "LF", "marge_totale", "marge_libre")
+# Emplacements (__slots__) de Tache masqués par les propriétés de TacheEnLigne
+_EMPLACEMENTS = {nom: Tache.__dict__[nom] for nom in ATTRIBUTS_EN_COLONNES}
+
+
+def _colonne_date(colonne: str) -> property:
+    def lire(tache):
+        return tache._magasin.date(getattr(tache._magasin, colonne)[tache._ligne])
+
+    def ecrire(tache, date):
+        getattr(tache._magasin, colonne)[tache._ligne] = _ABSENT if date is None else tache._magasin.jours(date)
+    return property(lire, ecrire)
+
+
+def _colonne_entier(colonne: str) -> property:
+    def lire(tache):
+        valeur = getattr(tache._magasin, colonne)[tache._ligne]
+        return None if valeur == _ABSENT else int(valeur)
+
+    def ecrire(tache, valeur):
+        getattr(tache._magasin, colonne)[tache._ligne] = _ABSENT if valeur is None else valeur
+    return property(lire, ecrire)
+
+
+class TacheEnLigne(Tache):
+    # Tâche rangée dans un magasin (voir MagasinTaches.adopter) : c'est le même objet, avec les mêmes
+    # méthodes, mais ses dates, son statut, son responsable et les résultats du chemin critique sont
+    # lus et écrits dans sa ligne. Nom, description et dépendances restent portés par la tâche.
+    __slots__ = ()
+
+    date_debut = _colonne_date("debut")
+    date_fin = _colonne_date("fin")
+    ES = _colonne_date("es")
+    EF = _colonne_date("ef")
+    LS = _colonne_date("ls")
+    LF = _colonne_date("lf")
+    marge_totale = _colonne_entier("marge_totale")
+    marge_libre = _colonne_entier("marge_libre")
+
+    @property
+    def statut(self) -> str:
+        return self._magasin.statuts[self._magasin.statut[self._ligne]]
+
+    @statut.setter
+    def statut(self, statut: str):
+        self._magasin.statut[self._ligne] = self._magasin.code_statut(statut)
+
+    @property
+    def responsable(self) -> Optional[Membre]:
+        indice = self._magasin.responsable[self._ligne]
+        return self._magasin.membres[indice] if indice >= 0 else None
+
+    @responsable.setter
+    def responsable(self, membre: Optional[Membre]):
+        self._magasin.responsable[self._ligne] = self._magasin.indice_membre(membre)
+
+    def duree(self) -> int:
+        return int(self._magasin.fin[self._ligne] - self._magasin.debut[self._ligne])
+
+
+class VueTache:
+    # Vue légère sur une ligne du magasin : mêmes attributs qu'une Tache, lus dans les colonnes
+    __slots__ = ("_magasin", "_ligne")
+
+    def __init__(self, magasin: "MagasinTaches", ligne: int):
+        self._magasin = magasin
+        self._ligne = ligne
+
+    def __eq__(self, autre):
+        return isinstance(autre, VueTache) and autre._magasin is self._magasin and autre._ligne == self._ligne
+
+    def __hash__(self):
+        return hash((id(self._magasin), self._ligne))
+
+    @property
+    def nom(self) -> str:
+        return self._magasin.noms[self._ligne]
+
+    @property
+    def description(self) -> str:
+        return self._magasin.descriptions[self._ligne]
+
+    @property
+    def date_debut(self) -> datetime:
+        return self._magasin.date(self._magasin.debut[self._ligne])
+
+    @property
+    def date_fin(self) -> datetime:
+        return self._magasin.date(self._magasin.fin[self._ligne])
+
+    @property
+    def responsable(self) -> Optional[Membre]:
+        indice = self._magasin.responsable[self._ligne]
+        return self._magasin.membres[indice] if indice >= 0 else None
+
+    @property
+    def statut(self) -> str:
+        return self._magasin.statuts[self._magasin.statut[self._ligne]]
+
+    @property
+    def dependances(self) -> List["VueTache"]:
+        return [VueTache(self._magasin, int(ligne)) for ligne in self._magasin.predecesseurs(self._ligne)]
+
+    @property
+    def ES(self) -> Optional[datetime]:
+        return self._magasin.date(self._magasin.es[self._ligne])
+
+    @property
+    def EF(self) -> Optional[datetime]:
+        return self._magasin.date(self._magasin.ef[self._ligne])
+
+    @property
+    def LS(self) -> Optional[datetime]:
+        return self._magasin.date(self._magasin.ls[self._ligne])
+
+    @property
+    def LF(self) -> Optional[datetime]:
+        return self._magasin.date(self._magasin.lf[self._ligne])
+
+    def mettre_a_jour_statut(self, statut: str):
+        self._magasin.statut[self._ligne] = self._magasin.code_statut(statut)
+
+    def duree(self) -> int:
+        return int(self._magasin.fin[self._ligne] - self._magasin.debut[self._ligne])
+
+
+class MagasinTaches:
+    # Stockage en colonnes des tâches : dates en jours depuis `origine` (int64), statuts codés,
+    # responsables donnés par leur indice dans l'équipe, dépendances au format CSR.
+    # Les parcours (filtres, chemin critique) travaillent sur des tableaux contigus.
+    # Deux usages :
+    # - magasin de Projet (Projet.stocker_en_colonnes) : les tâches du projet sont adoptées et
+    #   deviennent des vues sur leur ligne (TacheEnLigne). Toute modification passe par les colonnes,
+    #   le chemin critique du projet y est calculé et écrit. Le CSR des dépendances est reconstruit
+    #   au calcul suivant quand un lien change. Dates au jour près.
+    # - copie détachée (depuis_projet) : remplie une fois dans l'ordre topologique, une ligne ne
+    #   dépendant que de lignes antérieures ; les modifications du projet ne s'y reportent pas et
+    #   VueTache.mettre_a_jour_statut ne modifie que la copie.
+    def __init__(self, equipe: Equipe, origine: datetime, capacite: int = 1024):
+        self.origine = origine
+        self.membres: List[Membre] = list(equipe.obtenir_membres())
+        self._indices_membres: Dict[Membre, int] = {membre: i for i, membre in enumerate(self.membres)}
+        self.statuts: List[str] = []
+        self._codes_statuts: Dict[str, int] = {}
+        self.noms: List[str] = []
+        self.descriptions: List[str] = []
+        self.taille = 0
+        self._colonnes = ("debut", "fin", "statut", "responsable", "es", "ef", "ls", "lf", "marge_totale",
+                          "marge_libre")
+        self.debut = np.empty(capacite, dtype=np.int64)
+        self.fin = np.empty(capacite, dtype=np.int64)
+        self.statut = np.empty(capacite, dtype=np.int32)
+        self.responsable = np.empty(capacite, dtype=np.int32)
+        self.es = np.empty(capacite, dtype=np.int64)
+        self.ef = np.empty(capacite, dtype=np.int64)
+        self.ls = np.empty(capacite, dtype=np.int64)
+        self.lf = np.empty(capacite, dtype=np.int64)
+        self.marge_totale = np.empty(capacite, dtype=np.int64)
+        self.marge_libre = np.empty(capacite, dtype=np.int64)
+        # Les lignes sont ajoutées dans l'ordre : leurs prédécesseurs s'ajoutent en fin de CSR
+        self.pred_ptr = [0]
+        self.pred_idx: List[int] = []
+        # Tâche de chaque ligne pour un magasin de projet (None pour une copie détachée), et CSR à
+        # reconstruire depuis leurs dépendances
+        self.taches: Optional[List[Tache]] = None
+        self._liens_perimes = False
+
+    @classmethod
+    def pour_projet(cls, projet: "Projet") -> "MagasinTaches":
+        # Magasin qui adopte les tâches du projet (voir Projet.stocker_en_colonnes)
+        magasin = cls(projet.equipe, projet.date_debut, capacite=max(len(projet.taches), 1024))
+        magasin.taches = []
+        magasin.adopter(projet.taches)
+        return magasin
+
+    @classmethod
+    def depuis_projet(cls, projet: "Projet") -> "MagasinTaches":
+        # Les lignes suivent l'ordre topologique : chaque dépendance précède sa dépendante
+        magasin = cls(projet.equipe, projet.date_debut, capacite=max(len(projet.taches), 1))
+        lignes: Dict[Tache, int] = {}
+        for tache in projet.ordre_topologique():
+            lignes[tache] = magasin.ajouter(tache, [lignes[dep] for dep in tache.dependances])
+        return magasin
+
+    def __len__(self) -> int:
+        return self.taille
+
+    def __iter__(self) -> Iterator[VueTache]:
+        return (VueTache(self, ligne) for ligne in range(self.taille))
+
+    def vue(self, ligne: int) -> VueTache:
+        if not 0 <= ligne < self.taille:
+            raise IndexError(ligne)
+        return VueTache(self, ligne)
+
+    def jours(self, date: datetime) -> int:
+        ecart = date - self.origine
+        if ecart % _UN_JOUR:
+            raise ValueError(f"Le magasin de tâches travaille au jour près: {date}")
+        return ecart.days
+
+    def date(self, jours) -> Optional[datetime]:
+        return None if jours == _ABSENT else self.origine + timedelta(days=int(jours))
+
+    def code_statut(self, statut: str) -> int:
+        code = self._codes_statuts.get(statut)
+        if code is None:
+            code = self._codes_statuts[statut] = len(self.statuts)
+            self.statuts.append(statut)
+        return code
+
+    def indice_membre(self, membre: Optional[Membre]) -> int:
+        if membre is None:
+            return -1
+        indice = self._indices_membres.get(membre)
+        if indice is None:
+            indice = self._indices_membres[membre] = len(self.membres)
+            self.membres.append(membre)
+        return indice
+
+    def ajouter(self, tache: Tache, predecesseurs: List[int] = ()) -> int:
+        # Ajoute une ligne à une copie détachée ; les prédécesseurs sont des lignes déjà présentes
+        for pred in predecesseurs:
+            if not 0 <= pred < self.taille:
+                raise ValueError(f"Prédécesseur {pred} absent du magasin")
+        self.noms.append(tache.nom)
+        self.descriptions.append(tache.description)
+        ligne = self._nouvelle_ligne(tache)
+        self.pred_idx.extend(predecesseurs)
+        self.pred_ptr.append(len(self.pred_idx))
+        return ligne
+
+    def _nouvelle_ligne(self, tache: Tache) -> int:
+        if self.taille == len(self.debut):
+            self._agrandir()
+        ligne = self.taille
+        self.debut[ligne] = self.jours(tache.date_debut)
+        self.fin[ligne] = self.jours(tache.date_fin)
+        self.statut[ligne] = self.code_statut(tache.statut)
+        self.responsable[ligne] = self.indice_membre(tache.responsable)
+        for colonne in (self.es, self.ef, self.ls, self.lf, self.marge_totale, self.marge_libre):
+            colonne[ligne] = _ABSENT
+        self.taille += 1
+        return ligne
+
+    def adopter(self, taches: Iterable[Tache]):
+        # Range les tâches dans de nouvelles lignes, chacune devenant une vue sur la sienne (même
+        # objet). Tout est vérifié avant de toucher aux tâches : ValueError si une date n'est pas au
+        # jour près ou si une tâche est déjà rangée dans un autre magasin.
+        taches = list(taches)
+        for tache in taches:
+            if type(tache) is TacheEnLigne:
+                if tache._magasin is not self:
+                    raise ValueError(f"La tâche '{tache.nom}' est déjà rangée dans un autre magasin")
+                continue
+            if type(tache) is not Tache:
+                raise TypeError(f"Seules les Tache peuvent être rangées dans un magasin: {type(tache).__name__}")
+            for date in (tache.date_debut, tache.date_fin, tache.ES, tache.EF, tache.LS, tache.LF):
+                if date is not None:
+                    self.jours(date)
+        for tache in taches:
+            if type(tache) is TacheEnLigne:
+                continue
+            calcules = [getattr(tache, nom) for nom in _RESULTATS_CPM]
+            tache._ligne = self._nouvelle_ligne(tache)
+            tache._magasin = self
+            for nom in ATTRIBUTS_EN_COLONNES:
+                # Les objets portés par la tâche sont libérés : les valeurs vivent dans les colonnes
+                _EMPLACEMENTS[nom].__delete__(tache)
+            tache.__class__ = TacheEnLigne
+            for nom, valeur in zip(_RESULTATS_CPM, calcules):
+                setattr(tache, nom, valeur)
+            self.taches.append(tache)
+        self._liens_perimes = True
+
+    def liens_modifies(self):
+        # Une liste de dépendances a changé : CSR reconstruit au prochain calcul
+        self._liens_perimes = True
+
+    def _relier(self):
+        # CSR depuis les dépendances des tâches rangées, dans un ordre de lignes quelconque
+        pred_ptr, pred_idx = [0], []
+        for tache in self.taches:
+            for dep in tache._dependances or ():
+                if type(dep) is not TacheEnLigne or dep._magasin is not self:
+                    ordonner_taches(self.taches)  # lève l'erreur détaillée (dépendance hors projet)
+                    raise ValueError(f"La dépendance '{dep.nom}' de '{tache.nom}' n'appartient pas au projet")
+                pred_idx.append(dep._ligne)
+            pred_ptr.append(len(pred_idx))
+        self.pred_ptr, self.pred_idx = pred_ptr, pred_idx
+        self._liens_perimes = False
+
+    def _agrandir(self):
+        # Capacité doublée : ajout en O(1) amorti
+        for nom in self._colonnes:
+            ancienne = getattr(self, nom)
+            nouvelle = np.empty(max(2 * len(ancienne), 1), dtype=ancienne.dtype)
+            nouvelle[:len(ancienne)] = ancienne
+            setattr(self, nom, nouvelle)
+
+    def predecesseurs(self, ligne: int) -> List[int]:
+        return self.pred_idx[self.pred_ptr[ligne]:self.pred_ptr[ligne + 1]]
+
+    def _vues(self, lignes: np.ndarray) -> List[VueTache]:
+        # Les tâches elles-mêmes pour un magasin de projet, des vues pour une copie détachée
+        if self.taches is not None:
+            return [self.taches[ligne] for ligne in lignes.tolist()]
+        return [VueTache(self, ligne) for ligne in lignes.tolist()]
+
+    def taches_par_statut(self, statut: str) -> List[VueTache]:
+        code = self._codes_statuts.get(statut)
+        if code is None:
+            return []
+        return self._vues(np.flatnonzero(self.statut[:self.taille] == code))
+
+    def taches_de(self, membre: Membre) -> List[VueTache]:
+        indice = self._indices_membres.get(membre)
+        if indice is None:
+            return []
+        return self._vues(np.flatnonzero(self.responsable[:self.taille] == indice))
+
+    def taches_en_retard(self, membre: Membre, date_reference: datetime,
+                         statut_termine: str = "Terminée") -> List[VueTache]:
+        # Tâches du membre dont la date de fin est passée et qui ne sont pas terminées
+        indice = self._indices_membres.get(membre)
+        if indice is None:
+            return []
+        n = self.taille
+        # Date de référence ramenée au jour (datetime.now() convient) : en retard si fini avant ce jour
+        jour = (date_reference - self.origine) // _UN_JOUR
+        masque = (self.responsable[:n] == indice) & (self.fin[:n] < jour)
+        code = self._codes_statuts.get(statut_termine)
+        if code is not None:
+            masque &= self.statut[:n] != code
+        return self._vues(np.flatnonzero(masque))
+
+    def calculer_chemin_critique(self) -> List[VueTache]:
+        # CPM vectorisé directement sur les colonnes ; dates et marges écrites dans les colonnes
+        n = self.taille
+        if n == 0:
+            return []
+        if self._liens_perimes:
+            self._relier()
+        graphe = GrapheCSR(np.zeros(1, dtype=np.int64), np.array(self.pred_ptr, dtype=np.int64),
+                           np.array(self.pred_idx, dtype=np.int64))
+        if sum(map(len, graphe.niveaux)) != n:
+            ordonner_taches(self.taches)  # lève l'erreur de cycle
+        es, ef, ls, lf, marge_libre = graphe.calculer(self.fin[:n] - self.debut[:n])
+        self.es[:n], self.ef[:n], self.ls[:n], self.lf[:n] = es, ef, ls, lf
+        self.marge_totale[:n] = ls - es
+        self.marge_libre[:n] = marge_libre
+        return self._vues(np.flatnonzero(lf == ef))
@@ -1,4 +1,7 @@
 class Membre:
+    # __weakref__ : les membres restent utilisables comme clés de WeakKeyDictionary
+    __slots__ = ("nom", "role", "__weakref__")
+
     def __init__(self, nom: str, role: str):
         self.nom = nom
-        self.role = role
\ No newline at end of file
+        self.role = role
@@ -0,0 +1,269 @@
+import heapq
+from bisect import bisect_left
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from Instrumentation import instrumentation_courante
+from Tache import Tache
+
+
+class CycleDependancesError(ValueError):
+    # Levée quand les dépendances forment un cycle ; `cycle` liste les tâches concernées et `noms`
+    # leurs noms. Seuls les noms traversent pickle (erreur levée dans un processus de calcul) :
+    # `cycle` est alors vide.
+    def __init__(self, cycle: List[Tache]):
+        self.cycle = cycle
+        self.noms = [tache.nom for tache in cycle]
+        super().__init__(f"Cycle de dépendances détecté: {' -> '.join(self.noms + self.noms[:1])}")
+
+    def __reduce__(self):
+        return _cycle_depuis_noms, (self.noms,)
+
+
+def _cycle_depuis_noms(noms: List[str]) -> CycleDependancesError:
+    erreur = CycleDependancesError([])
+    erreur.noms = noms
+    erreur.args = (f"Cycle de dépendances détecté: {' -> '.join(noms + noms[:1])}",)
+    return erreur
+
+
+def ordonner_taches(taches: List[Tache]) -> List[Tache]:
+    # Tri topologique de Kahn : chaque tâche apparaît après toutes ses dépendances
+    degres: Dict[Tache, int] = {tache: 0 for tache in taches}
+    successeurs: Dict[Tache, List[Tache]] = {tache: [] for tache in taches}
+    for tache in taches:
+        for dep in tache.dependances:
+            if dep not in successeurs:
+                raise ValueError(f"La dépendance '{dep.nom}' de '{tache.nom}' n'appartient pas au projet")
+            successeurs[dep].append(tache)
+            degres[tache] += 1
+
+    file = deque(tache for tache in taches if degres[tache] == 0)
+    ordre: List[Tache] = []
+    while file:
+        tache = file.popleft()
+        ordre.append(tache)
+        for succ in successeurs[tache]:
+            degres[succ] -= 1
+            if degres[succ] == 0:
+                file.append(succ)
+
+    if len(ordre) != len(degres):
+        raise CycleDependancesError(_trouver_cycle(degres))
+    return ordre
+
+
+def _trouver_cycle(degres: Dict[Tache, int]) -> List[Tache]:
+    # Les tâches restantes ont toutes au moins une dépendance restante :
+    # en remontant les dépendances on finit forcément par boucler
+    tache = next(tache for tache, degre in degres.items() if degre > 0)
+    vues: Dict[Tache, int] = {}
+    chemin: List[Tache] = []
+    while tache not in vues:
+        vues[tache] = len(chemin)
+        chemin.append(tache)
+        tache = next(dep for dep in tache.dependances if degres[dep] > 0)
+    # Remettre le cycle dans le sens d'exécution (dépendance avant dépendante)
+    cycle = chemin[vues[tache]:]
+    return cycle[:1] + cycle[:0:-1]
+
+
+class MoteurCheminCritique:
+    # Moteur CPM en O(V+E) : l'ordre topologique et l'index des successeurs sont
+    # construits une seule fois, puis chaque passe ne parcourt chaque arc qu'une fois.
+    # Après un premier calcul, mettre_a_jour ne repropage que le cône touché par une modification.
+    def __init__(self, taches: List[Tache], date_debut: datetime, ordre: Optional[List[Tache]] = None):
+        self.taches = taches
+        self.date_debut = date_debut
+        self.ordre = ordre if ordre is not None else ordonner_taches(taches)
+        self.positions: Dict[Tache, int] = {tache: i for i, tache in enumerate(self.ordre)}
+        self.rangs: Dict[Tache, int] = {tache: i for i, tache in enumerate(taches)}
+        self.successeurs: Dict[Tache, List[Tache]] = {tache: [] for tache in taches}
+        for tache in taches:
+            for dep in tache.dependances:
+                self.successeurs[dep].append(tache)
+        self.durees: Dict[Tache, timedelta] = {}
+        self.fin_projet = None
+        self.chemin_critique: List[Tache] = []
+        self._rangs_critiques: List[int] = []
+        # Nombre de tâches recalculées par la dernière opération
+        self.noeuds_visites = 0
+
+    def passe_avant(self):
+        # Calculer les temps au plus tôt (ES, EF)
+        for tache in self.ordre:
+            if tache.dependances:
+                tache.ES = max(dep.EF for dep in tache.dependances)
+            else:
+                tache.ES = self.date_debut
+            tache.EF = tache.ES + self.durees[tache]
+        self.fin_projet = max(tache.EF for tache in self.taches)
+
+    def passe_arriere(self):
+        # Calculer les temps au plus tard (LS, LF) en partant de la fin du projet
+        for tache in reversed(self.ordre):
+            successeurs = self.successeurs[tache]
+            if successeurs:
+                tache.LF = min(succ.LS for succ in successeurs)
+            else:
+                tache.LF = self.fin_projet
+            tache.LS = tache.LF - self.durees[tache]
+
+    def calculer_marges(self, taches=None):
+        # Marge totale : LS - ES ; marge libre : plus petit ES des successeurs - EF
+        for tache in self.taches if taches is None else taches:
+            successeurs = self.successeurs[tache]
+            tache.marge_totale = (tache.LS - tache.ES).days
+            if successeurs:
+                tache.marge_libre = (min(succ.ES for succ in successeurs) - tache.EF).days
+            else:
+                tache.marge_libre = (self.fin_projet - tache.EF).days
+
+    def calculer(self) -> List[Tache]:
+        if not self.taches:
+            return self.chemin_critique
+        # Les durées sont relues à chaque calcul, les dates pouvant avoir changé
+        self.durees = {tache: timedelta(days=tache.duree()) for tache in self.taches}
+        instrumentation = instrumentation_courante()
+        if instrumentation is None:
+            self.passe_avant()
+            self.passe_arriere()
+            self.calculer_marges()
+            return self._classer_tout()
+        with instrumentation.chronometre("cpm_passe_avant"):
+            self.passe_avant()
+        with instrumentation.chronometre("cpm_passe_arriere"):
+            self.passe_arriere()
+        with instrumentation.chronometre("cpm_marges"):
+            self.calculer_marges()
+        chemin_critique = self._classer_tout()
+        instrumentation.compter("cpm_noeuds_visites", self.noeuds_visites)
+        return chemin_critique
+
+    def adopter(self, fin_projet: datetime) -> List[Tache]:
+        # Reprendre les dates écrites sur les tâches par un autre calcul (ordonnancement par lot)
+        # pour que les mises à jour incrémentales puissent repartir de cet état
+        # (les durées ne seront relues qu'à la première mise à jour incrémentale)
+        self.durees = {}
+        self.fin_projet = fin_projet
+        return self._classer_tout()
+
+    def _classer_tout(self) -> List[Tache]:
+        # Déterminer le chemin critique (les tâches où LF - EF = 0), dans l'ordre du projet
+        self._rangs_critiques[:] = [i for i, tache in enumerate(self.taches) if (tache.LF - tache.EF).days == 0]
+        self.chemin_critique[:] = [self.taches[i] for i in self._rangs_critiques]
+        self.noeuds_visites = len(self.taches)
+        return self.chemin_critique
+
+    def est_calcule(self) -> bool:
+        return self.fin_projet is not None
+
+    def accepte_dependance(self, tache: Tache, dependance: Tache) -> bool:
+        # Le nouvel arc respecte-t-il l'ordre topologique courant ?
+        return dependance in self.positions and self.positions[dependance] < self.positions[tache]
+
+    def ajouter_arc(self, tache: Tache, dependance: Tache) -> int:
+        # L'arc doit respecter l'ordre courant (voir accepte_dependance)
+        self.successeurs[dependance].append(tache)
+        if not self.est_calcule():
+            return 0
+        self._relire_durees()
+        return self._propager(tache, [tache, dependance])
+
+    def mettre_a_jour(self, tache: Tache) -> int:
+        # Les dates de la tâche ont changé : seule sa durée intervient dans le calcul
+        if not self.est_calcule():
+            return 0
+        self._relire_durees()
+        self.durees[tache] = timedelta(days=tache.duree())
+        return self._propager(tache, [tache])
+
+    def _relire_durees(self):
+        if not self.durees:
+            self.durees = {tache: timedelta(days=tache.duree()) for tache in self.taches}
+
+    def _propager(self, source: Tache, sources_arriere: List[Tache]) -> int:
+        visitees = set()
+
+        # Passe avant limitée aux descendants dont ES/EF changent, dans l'ordre topologique
+        modifiees_avant = []
+        anciens_ef = []
+        tas = [(self.positions[source], source)]
+        en_attente = {source}
+        while tas:
+            _, tache = heapq.heappop(tas)
+            visitees.add(tache)
+            if tache.dependances:
+                es = max(dep.EF for dep in tache.dependances)
+            else:
+                es = self.date_debut
+            ef = es + self.durees[tache]
+            if es == tache.ES and ef == tache.EF:
+                continue
+            anciens_ef.append(tache.EF)
+            tache.ES, tache.EF = es, ef
+            modifiees_avant.append(tache)
+            for succ in self.successeurs[tache]:
+                if succ not in en_attente:
+                    en_attente.add(succ)
+                    heapq.heappush(tas, (self.positions[succ], succ))
+
+        if self._fin_projet_modifiee(modifiees_avant, anciens_ef):
+            # La fin du projet bouge : toutes les dates au plus tard changent
+            self.calculer()
+            return self.noeuds_visites
+
+        # Passe arrière limitée aux ascendants dont LS/LF changent, dans l'ordre inverse
+        tas = [(-self.positions[tache], tache) for tache in sources_arriere]
+        heapq.heapify(tas)
+        en_attente = set(sources_arriere)
+        while tas:
+            _, tache = heapq.heappop(tas)
+            visitees.add(tache)
+            successeurs = self.successeurs[tache]
+            lf = min(succ.LS for succ in successeurs) if successeurs else self.fin_projet
+            ls = lf - self.durees[tache]
+            if lf == tache.LF and ls == tache.LS:
+                continue
+            tache.LF, tache.LS = lf, ls
+            for dep in tache.dependances:
+                if dep not in en_attente:
+                    en_attente.add(dep)
+                    heapq.heappush(tas, (-self.positions[dep], dep))
+
+        # La marge libre d'une tâche dépend aussi de l'ES de ses successeurs
+        for tache in modifiees_avant:
+            visitees.update(tache.dependances)
+        self.calculer_marges(visitees)
+        for tache in visitees:
+            self._classer(tache)
+        self.noeuds_visites = len(visitees)
+        return self.noeuds_visites
+
+    def _fin_projet_modifiee(self, modifiees: List[Tache], anciens_ef: List[datetime]) -> bool:
+        # La fin du projet ne peut bouger que si l'EF d'une tâche sans successeur a changé
+        fin_projet = self.fin_projet
+        for tache, ancien_ef in zip(modifiees, anciens_ef):
+            if self.successeurs[tache]:
+                continue
+            if tache.EF > fin_projet:
+                fin_projet = tache.EF
+            elif ancien_ef == self.fin_projet:
+                # La tâche qui fixait la fin a raccourci : il faut rechercher le maximum
+                fin_projet = max(t.EF for t in self.taches if not self.successeurs[t])
+                break
+        return fin_projet != self.fin_projet
+
+    def _classer(self, tache: Tache):
+        # Mettre à jour sur place l'appartenance de la tâche au chemin critique
+        rang = self.rangs[tache]
+        i = bisect_left(self._rangs_critiques, rang)
+        present = i < len(self._rangs_critiques) and self._rangs_critiques[i] == rang
+        critique = (tache.LF - tache.EF).days == 0
+        if critique and not present:
+            self._rangs_critiques.insert(i, rang)
+            self.chemin_critique.insert(i, tache)
+        elif present and not critique:
+            del self._rangs_critiques[i]
+            del self.chemin_critique[i]
@@ -1,16 +1,79 @@
-from typing import List
+import time
+from collections import deque
+from typing import Deque, Dict, List, Tuple
 
+from Instrumentation import instrumentation_courante
 from Membre import Membre
-from NotificationStrategy.__init__ import NotificationStrategy
+from NotificationStrategy import ErreurTransport, NotificationStrategy
 
 
 class NotificationContext:
-    def __init__(self, strategy: NotificationStrategy):
+    def __init__(self, strategy: NotificationStrategy, echecs_max: int = 1000):
         self._strategy = strategy
+        # Stratégies choisies par certains membres (email, SMS, push...) à la place de la stratégie par défaut
+        self._preferences: Dict[Membre, Tuple[NotificationStrategy, ...]] = {}
+        # Derniers lots dont l'envoi a échoué (message, destinataires non servis, erreur), au plus
+        # `echecs_max` : une erreur du canal (ErreurTransport, OSError) ne fait jamais échouer la
+        # modification du projet qui l'a déclenchée ; toute autre erreur d'une stratégie remonte
+        self.echecs: Deque[Tuple[str, List[Membre], Exception]] = deque(maxlen=echecs_max)
 
     def set_strategy(self, strategy: NotificationStrategy):
         self._strategy = strategy
 
+    def preferer(self, membre: Membre, *strategies: NotificationStrategy):
+        # Sans stratégie, le membre revient à la stratégie par défaut
+        if strategies:
+            self._preferences[membre] = strategies
+        else:
+            self._preferences.pop(membre, None)
+
+    def strategies(self, destinataire: Membre) -> Tuple[NotificationStrategy, ...]:
+        return self._preferences.get(destinataire) or (self._strategy,)
+
+    def envois(self, destinataires: List[Membre]) -> List[Tuple[NotificationStrategy, Membre]]:
+        if not self._preferences:
+            return [(self._strategy, destinataire) for destinataire in destinataires]
+        return [(strategy, destinataire) for destinataire in destinataires
+                for strategy in self.strategies(destinataire)]
+
+    def lots(self, destinataires: List[Membre]) -> List[Tuple[NotificationStrategy, List[Membre]]]:
+        # Destinataires regroupés par stratégie, dans l'ordre de première apparition
+        if not self._preferences:
+            return [(self._strategy, destinataires)] if destinataires else []
+        lots: Dict[NotificationStrategy, List[Membre]] = {}
+        for strategy, destinataire in self.envois(destinataires):
+            lots.setdefault(strategy, []).append(destinataire)
+        return list(lots.items())
+
     def notifier(self, message: str, destinataires: List[Membre]):
-        for destinataire in destinataires:
-            self._strategy.envoyer(message, destinataire)
\ No newline at end of file
+        # Un lot par stratégie : un transport réel envoie le message en une fois à tous ses destinataires.
+        # Un lot en échec est consigné dans `echecs` et n'empêche pas les suivants.
+        instrumentation = instrumentation_courante()
+        if instrumentation is None:
+            for strategy, membres in self.lots(destinataires):
+                try:
+                    strategy.envoyer_lot(message, membres)
+                except (ErreurTransport, OSError) as erreur:
+                    self.echecs.append((message, self._non_envoyes(membres, erreur), erreur))
+            return
+        # Latence de chaque envoi (le lot entier pour une stratégie qui envoie par lot, chaque message
+        # sinon, mesuré par NotificationStrategy.envoyer_lot), de chaque lot, et nombre de messages,
+        # par stratégie
+        for strategy, membres in self.lots(destinataires):
+            nom = type(strategy).__name__
+            debut_lot = time.perf_counter()
+            try:
+                strategy.envoyer_lot(message, membres)
+                if strategy.par_lot:
+                    instrumentation.mesurer("notification_envoi", time.perf_counter() - debut_lot, strategie=nom)
+            except (ErreurTransport, OSError) as erreur:
+                self.echecs.append((message, self._non_envoyes(membres, erreur), erreur))
+                instrumentation.compter("notification_echecs", 1, strategie=nom)
+            instrumentation.mesurer("notification_lot", time.perf_counter() - debut_lot, strategie=nom)
+            instrumentation.compter("notification_messages", len(membres), strategie=nom)
+
+    @staticmethod
+    def _non_envoyes(membres: List[Membre], erreur: Exception) -> List[Membre]:
+        # Un lot interrompu en cours de route : seuls les destinataires non servis sont consignés
+        positions = getattr(erreur, "non_envoyes", None)
+        return membres if positions is None else [membres[position] for position in positions]
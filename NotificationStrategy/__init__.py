@@ -1,7 +1,37 @@
+import time
+from typing import List, Optional
+
+from Instrumentation import instrumentation_courante
 from Membre import Membre
 
 
+class ErreurTransport(RuntimeError):
+    # Échec d'un canal d'envoi (serveur injoignable, envoi refusé). `non_envoyes` : positions, dans
+    # le lot, des destinataires qui n'ont pas reçu le message (None : aucun ne l'a reçu)
+    def __init__(self, message: str, non_envoyes: Optional[List[int]] = None):
+        super().__init__(message)
+        self.non_envoyes = non_envoyes
+
+
 class NotificationStrategy:
     # Envoyer des notifications
+    # Vrai si envoyer_lot fait un seul envoi pour tous les destinataires (et non un par destinataire)
+    par_lot = False
+
     def envoyer(self, message: str, destinataire: Membre):
-        raise NotImplementedError("Cette méthode doit être implémentée par les sous-classes")
\ No newline at end of file
+        raise NotImplementedError("Cette méthode doit être implémentée par les sous-classes")
+
+    def envoyer_lot(self, message: str, destinataires: List[Membre]):
+        # Même message à plusieurs destinataires ; les stratégies à transport l'envoient en un lot.
+        # Un envoi en échec interrompt le lot : ErreurTransport désigne ce destinataire et les suivants.
+        # Sous instrumentation, chaque envoi réussi est chronométré
+        instrumentation = instrumentation_courante()
+        for position, destinataire in enumerate(destinataires):
+            debut = time.perf_counter()
+            try:
+                self.envoyer(message, destinataire)
+            except (ErreurTransport, OSError) as erreur:
+                raise ErreurTransport(str(erreur), list(range(position, len(destinataires)))) from erreur
+            if instrumentation is not None:
+                instrumentation.mesurer("notification_envoi", time.perf_counter() - debut,
+                                        strategie=type(self).__name__)
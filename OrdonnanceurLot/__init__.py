@@ -0,0 +1,149 @@
+from datetime import timedelta
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+from Projet import Projet
+from Tache import Tache
+
+
+def _segments(pointeurs: np.ndarray, noeuds: np.ndarray):
+    # Rassembler les voisins CSR des noeuds donnés : (voisins concaténés, début de chaque segment)
+    debuts = pointeurs[noeuds]
+    longueurs = pointeurs[noeuds + 1] - debuts
+    departs = np.zeros(len(noeuds), dtype=np.int64)
+    np.cumsum(longueurs[:-1], out=departs[1:])
+    positions = np.arange(longueurs.sum(), dtype=np.int64) - np.repeat(departs - debuts, longueurs)
+    return positions, departs
+
+
+class GrapheCSR:
+    # Partie purement tabulaire d'un ou plusieurs projets : prédécesseurs et successeurs
+    # au format CSR, découpage en niveaux. Ne contient que des tableaux, donc se transmet
+    # tel quel à d'autres processus.
+    def __init__(self, premieres: np.ndarray, pred_ptr: np.ndarray, pred_idx: np.ndarray):
+        n = len(pred_ptr) - 1
+        self.premieres = premieres
+        self.projet_de = np.repeat(np.arange(len(premieres)), np.diff(np.append(premieres, n)))
+        self.pred_ptr = pred_ptr
+        self.pred_idx = pred_idx
+        nb_preds = np.diff(pred_ptr)
+        cibles = np.repeat(np.arange(n, dtype=np.int64), nb_preds)
+        self.succ_idx = cibles[np.argsort(pred_idx, kind="stable")]
+        self.succ_ptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(pred_idx, minlength=n), out=self.succ_ptr[1:])
+        self.niveaux = self._calculer_niveaux(nb_preds)
+
+    def __len__(self) -> int:
+        return len(self.pred_ptr) - 1
+
+    def _calculer_niveaux(self, nb_preds: np.ndarray) -> List[np.ndarray]:
+        # Découpage en niveaux (Kahn par vagues) : un noeud ne dépend que de niveaux antérieurs
+        restants = nb_preds.copy()
+        niveau = np.flatnonzero(restants == 0)
+        niveaux = []
+        while len(niveau):
+            niveaux.append(niveau)
+            positions, _ = _segments(self.succ_ptr, niveau)
+            succ = self.succ_idx[positions]
+            np.subtract.at(restants, succ, 1)
+            niveau = np.unique(succ[restants[succ] == 0])
+        return niveaux
+
+    def calculer(self, durees: np.ndarray, marges_libres: bool = True):
+        # Passes avant et arrière niveau par niveau, en jours depuis le début de chaque projet.
+        # `durees` est de forme (n,) ou (n, tirages) : une ligne par tâche, les réductions
+        # portent sur le premier axe et chaque ligne reste contiguë en mémoire.
+        es = np.zeros_like(durees)
+        ef = np.zeros_like(durees)
+        for niveau in self.niveaux:
+            if niveau is not self.niveaux[0]:
+                positions, departs = _segments(self.pred_ptr, niveau)
+                es[niveau] = np.maximum.reduceat(ef[self.pred_idx[positions]], departs)
+            ef[niveau] = es[niveau] + durees[niveau]
+        fins = np.maximum.reduceat(ef, self.premieres)
+
+        lf = fins[self.projet_de]
+        ls = np.empty_like(durees)
+        nb_succ = np.diff(self.succ_ptr)
+        for niveau in reversed(self.niveaux):
+            avec_succ = niveau[nb_succ[niveau] > 0]
+            if len(avec_succ):
+                positions, departs = _segments(self.succ_ptr, avec_succ)
+                lf[avec_succ] = np.minimum.reduceat(ls[self.succ_idx[positions]], departs)
+            ls[niveau] = lf[niveau] - durees[niveau]
+
+        if not marges_libres:
+            return es, ef, ls, lf, None
+        marge_libre = fins[self.projet_de] - ef
+        avec_succ = np.flatnonzero(nb_succ > 0)
+        if len(avec_succ):
+            positions, departs = _segments(self.succ_ptr, avec_succ)
+            marge_libre[avec_succ] = np.minimum.reduceat(es[self.succ_idx[positions]], departs) - ef[avec_succ]
+        return es, ef, ls, lf, marge_libre
+
+
+class GrapheLot:
+    # Plusieurs projets mis à plat : durées en jours (int64) et dépendances au format CSR.
+    # Les tâches d'un projet sont contiguës et gardent l'ordre de Projet.taches.
+    def __init__(self, projets: Iterable[Projet]):
+        self.projets: List[Projet] = [projet for projet in projets if projet.taches]
+        self.taches: List[Tache] = []
+        self.index: Dict[Tache, int] = {}
+        premieres = []
+        for projet in self.projets:
+            projet.ordre_topologique()  # valide le graphe (cycles, dépendances hors projet)
+            premieres.append(len(self.taches))
+            for tache in projet.taches:
+                self.index[tache] = len(self.taches)
+                self.taches.append(tache)
+        n = len(self.taches)
+        self.durees = np.fromiter((tache.duree() for tache in self.taches), dtype=np.int64, count=n)
+        nb_preds = np.fromiter((len(tache.dependances) for tache in self.taches), dtype=np.int64, count=n)
+        pred_ptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(nb_preds, out=pred_ptr[1:])
+        pred_idx = np.fromiter((self.index[dep] for tache in self.taches for dep in tache.dependances),
+                               dtype=np.int64, count=int(pred_ptr[-1]))
+        self.csr = GrapheCSR(np.array(premieres, dtype=np.int64), pred_ptr, pred_idx)
+
+    def calculer(self):
+        return self.csr.calculer(self.durees)
+
+    def appliquer(self, es, ef, ls, lf, marge_libre):
+        # Réécrire les résultats sur les objets Tache et le chemin critique de chaque projet ;
+        # la conversion en datetime se fait en bloc via datetime64
+        debuts = [projet.date_debut for projet in self.projets]
+        origines = np.array(debuts, dtype="datetime64[us]")[self.csr.projet_de]
+
+        def en_dates(jours):
+            return (origines + jours.astype("timedelta64[D]")).astype(object).tolist()
+
+        resultats = zip(self.taches, en_dates(es), en_dates(ef), en_dates(ls), en_dates(lf),
+                        (ls - es).tolist(), marge_libre.tolist())
+        for tache, t_es, t_ef, t_ls, t_lf, marge_totale, t_marge_libre in resultats:
+            tache.ES = t_es
+            tache.EF = t_ef
+            tache.LS = t_ls
+            tache.LF = t_lf
+            tache.marge_totale = marge_totale
+            tache.marge_libre = t_marge_libre
+        fins = np.maximum.reduceat(ef, self.csr.premieres).tolist()
+        for p, projet in enumerate(self.projets):
+            moteur = projet._moteur_chemin_critique()
+            moteur.adopter(debuts[p] + timedelta(days=fins[p]))
+            projet.chemin_critique = moteur.chemin_critique
+            projet.noeuds_recalcules = moteur.noeuds_visites
+            projet._publier("chemin_critique", projet.chemin_critique)
+
+
+def ordonnancer_projets(projets: Iterable[Projet]):
+    # Calcul vectorisé du chemin critique de plusieurs projets ; équivalent à
+    # appeler Projet.calculer_chemin_critique sur chacun d'eux
+    projets = list(projets)
+    for projet in projets:
+        if not projet.taches:
+            projet.chemin_critique = []
+            projet._publier("chemin_critique", projet.chemin_critique)
+    graphe = GrapheLot(projets)
+    if graphe.taches:
+        graphe.appliquer(*graphe.calculer())
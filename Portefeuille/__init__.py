@@ -0,0 +1,195 @@
+import heapq
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from Membre import Membre
+from OrdonnanceurLot import GrapheLot, ordonnancer_projets
+from Projet import Projet
+from Tache import Tache
+
+
+class _Agenda:
+    # Créneaux occupés d'un membre (une tâche à la fois), en jours ; les créneaux qui se
+    # touchent sont fusionnés pour que la recherche d'un trou reste courte
+    __slots__ = ("debuts", "fins")
+
+    def __init__(self):
+        self.debuts: List[int] = []
+        self.fins: List[int] = []
+
+    def reserver(self, pret: int, duree: int) -> int:
+        # Premier créneau libre de `duree` jours à partir de `pret` ; renvoie son début
+        debuts, fins = self.debuts, self.fins
+        i = bisect_right(debuts, pret) - 1
+        debut = pret
+        if i >= 0 and fins[i] > debut:
+            debut = fins[i]
+        i += 1
+        while i < len(debuts) and debuts[i] < debut + duree:
+            debut = fins[i]
+            i += 1
+        fin = debut + duree
+        gauche = i > 0 and fins[i - 1] == debut
+        droite = i < len(debuts) and debuts[i] == fin
+        if gauche and droite:
+            fins[i - 1] = fins[i]
+            del debuts[i], fins[i]
+        elif gauche:
+            fins[i - 1] = fin
+        elif droite:
+            debuts[i] = debut
+        else:
+            debuts.insert(i, debut)
+            fins.insert(i, fin)
+        return debut
+
+
+class PlanningPortefeuille:
+    # Résultat du nivellement : dates des tâches et chronologie de chaque membre
+    def __init__(self, graphe: GrapheLot, origines: List[datetime], decalages: List[int], debuts: List[int],
+                 es: List[int]):
+        self._taches = graphe.taches
+        self._index = graphe.index
+        self._projets = graphe.projets
+        self._premieres = graphe.csr.premieres.tolist() + [len(graphe.taches)]
+        self._projet_de = graphe.csr.projet_de.tolist()
+        self._durees = graphe.durees.tolist()
+        self._origines = origines
+        self._decalages = decalages
+        self._debuts = debuts
+        self._es = es
+        self._chronologies: Dict[Membre, List[int]] = {}
+        for i, tache in enumerate(self._taches):
+            if tache.responsable is not None and self._durees[i] > 0:
+                self._chronologies.setdefault(tache.responsable, []).append(i)
+        for indices in self._chronologies.values():
+            indices.sort(key=debuts.__getitem__)
+
+    def _date(self, i: int, jours: int) -> datetime:
+        p = self._projet_de[i]
+        return self._origines[p] + timedelta(days=jours - self._decalages[p])
+
+    @property
+    def membres(self) -> List[Membre]:
+        return list(self._chronologies)
+
+    def debut(self, tache: Tache) -> datetime:
+        i = self._index[tache]
+        return self._date(i, self._debuts[i])
+
+    def fin(self, tache: Tache) -> datetime:
+        i = self._index[tache]
+        return self._date(i, self._debuts[i] + self._durees[i])
+
+    def retard(self, tache: Tache) -> int:
+        # Jours de décalage par rapport au début au plus tôt du chemin critique
+        i = self._index[tache]
+        return self._debuts[i] - self._es[i]
+
+    def fin_projet(self, projet: Projet) -> datetime:
+        p = self._projets.index(projet)
+        fin = max(self._debuts[i] + self._durees[i] for i in range(self._premieres[p], self._premieres[p + 1]))
+        return self._origines[p] + timedelta(days=fin - self._decalages[p])
+
+    def chronologie(self, membre: Membre) -> List[Tuple[datetime, datetime, Tache]]:
+        # Tâches du membre dans l'ordre où il les réalise
+        return [(self._date(i, self._debuts[i]), self._date(i, self._debuts[i] + self._durees[i]), self._taches[i])
+                for i in self._chronologies.get(membre, ())]
+
+    def utilisation(self, membre: Membre, debut: Optional[datetime] = None, fin: Optional[datetime] = None) -> float:
+        # Part des jours de la période où le membre est occupé (par défaut : du premier début à la dernière fin)
+        chronologie = self.chronologie(membre)
+        if not chronologie:
+            return 0.0
+        debut = chronologie[0][0] if debut is None else debut
+        fin = max(f for _, f, _ in chronologie) if fin is None else fin
+        if fin <= debut:
+            return 0.0
+        occupe = sum(((min(f, fin) - max(d, debut)) for d, f, _ in chronologie if d < fin and f > debut),
+                     timedelta())
+        return occupe / (fin - debut)
+
+
+class Portefeuille:
+    # Ensemble de projets partageant leurs membres : chemins critiques calculés en lot et
+    # nivellement des ressources sur-allouées d'un projet à l'autre
+    def __init__(self, projets: Iterable[Projet] = ()):
+        self.projets: List[Projet] = list(projets)
+
+    def ajouter_projet(self, projet: Projet):
+        self.projets.append(projet)
+
+    def calculer_chemins_critiques(self):
+        ordonnancer_projets(self.projets)
+
+    def surallocations(self) -> Dict[Membre, int]:
+        # Membres affectés à plusieurs tâches simultanées d'après les dates au plus tôt,
+        # avec le nombre maximal de tâches menées de front
+        self.calculer_chemins_critiques()
+        evenements: Dict[Membre, List[Tuple[datetime, int]]] = {}
+        for projet in self.projets:
+            for tache in projet.taches:
+                if tache.responsable is not None and tache.EF > tache.ES:
+                    liste = evenements.setdefault(tache.responsable, [])
+                    liste.append((tache.ES, 1))
+                    liste.append((tache.EF, -1))
+        pics = {}
+        for membre, liste in evenements.items():
+            liste.sort()
+            courant = pic = 0
+            for _, variation in liste:
+                courant += variation
+                pic = max(pic, courant)
+            if pic > 1:
+                pics[membre] = pic
+        return pics
+
+    def niveler(self) -> PlanningPortefeuille:
+        # Ordonnancement sous contrainte de ressources (schéma sériel) : parmi les tâches dont les
+        # prédécesseurs sont placés, la moins flottante (puis la plus tôt au plus tard) est placée
+        # la première, au premier créneau libre de son responsable
+        graphe = GrapheLot(self.projets)
+        resultats = graphe.calculer()
+        graphe.appliquer(*resultats)
+        es, _, ls, _, _ = resultats
+        projets = graphe.projets
+        origines = [projet.date_debut for projet in projets]
+        if not projets:
+            return PlanningPortefeuille(graphe, origines, [], [], [])
+        reference = min(origines)
+        decalages = [(origine - reference).days for origine in origines]
+        csr = graphe.csr
+        projet_de = csr.projet_de.tolist()
+        decalage_de = [decalages[p] for p in projet_de]
+        es = [jours + decalage for jours, decalage in zip(es.tolist(), decalage_de)]
+        ls = [jours + decalage for jours, decalage in zip(ls.tolist(), decalage_de)]
+        durees = graphe.durees.tolist()
+        succ_ptr = csr.succ_ptr.tolist()
+        succ_idx = csr.succ_idx.tolist()
+        restants = (csr.pred_ptr[1:] - csr.pred_ptr[:-1]).tolist()
+        responsables = [tache.responsable for tache in graphe.taches]
+        agendas: Dict[Membre, _Agenda] = {}
+
+        pret = list(decalage_de)
+        debuts = [0] * len(durees)
+        prioritaires = [(ls[i] - es[i], ls[i], i) for i in range(len(durees)) if restants[i] == 0]
+        heapq.heapify(prioritaires)
+        while prioritaires:
+            _, _, i = heapq.heappop(prioritaires)
+            debut = pret[i]
+            membre = responsables[i]
+            if membre is not None and durees[i] > 0:
+                agenda = agendas.get(membre)
+                if agenda is None:
+                    agenda = agendas[membre] = _Agenda()
+                debut = agenda.reserver(debut, durees[i])
+            debuts[i] = debut
+            fin = debut + durees[i]
+            for j in succ_idx[succ_ptr[i]:succ_ptr[i + 1]]:
+                if fin > pret[j]:
+                    pret[j] = fin
+                restants[j] -= 1
+                if restants[j] == 0:
+                    heapq.heappush(prioritaires, (ls[j] - es[j], ls[j], j))
+        return PlanningPortefeuille(graphe, origines, decalages, debuts, es)
@@ -1,17 +1,30 @@
-from datetime import timedelta, datetime
-from typing import List, Optional
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Iterable, Iterator, List, Optional, TextIO
 
-from Changement.__init__ import Changement
-from Equipe.__init__ import Equipe
-from Jalon.__init__ import Jalon
+from AbonnementsNotifications import (SUJET_BUDGET, SUJET_CHANGEMENTS, SUJET_EQUIPE, SUJET_JALONS, SUJET_RISQUES,
+                                      SUJET_TACHES, AbonnementsNotifications)
+from ChargementMasse import (Element, preparer_jalons, preparer_membres, preparer_risques, preparer_taches,
+                             sans_ramasse_miettes)
+from Changement import Changement
+from Equipe import Equipe
+from IndexTaches import IndexTaches
+from Instrumentation import instrumentation_courante, mutation
+from Jalon import Jalon
 from Membre import Membre
+from MoteurCheminCritique import MoteurCheminCritique
 from NotificationContext import NotificationContext
-from NotificationStrategy.__init__ import NotificationStrategy
-from Risque.__init__ import Risque
-from Tache.__init__ import Tache
+from NotificationStrategy import NotificationStrategy
+from RapportPerformance import RapportPerformance
+from RegroupeurNotifications import RegroupeurNotifications
+from Risque import Risque
+from Tache import Tache
 
 
 class Projet:
+    # Notifications : diffusées à toute l'équipe tant que personne n'est abonné ; dès le premier
+    # appel à abonner(), chaque message ne va plus qu'aux abonnés de son sujet et un membre sans
+    # abonnement ne reçoit plus rien.
     def __init__(self, nom: str, description: str, date_debut: datetime, date_fin: datetime, budget: float):
         self.nom = nom
         self.description = description
@@ -26,84 +39,318 @@ class Projet:
         self.changements: List[Changement] = []
         self.chemin_critique: List[Tache] = []
         self.notification_context: Optional[NotificationContext] = None
+        # Abonnements par sujet ; tant qu'il n'y en a aucun, chaque message va à toute l'équipe
+        self.abonnements: Optional[AbonnementsNotifications] = None
+        # Index secondaires des tâches (statut, responsable, dates)
+        self._index = IndexTaches()
+        # Regroupement des notifications en cours (voir lot_notifications)
+        self._regroupeur: Optional[RegroupeurNotifications] = None
+        # Moteur CPM en cache (ordre topologique + successeurs), invalidé quand le graphe change
+        self._moteur: Optional[MoteurCheminCritique] = None
+        # Nombre de tâches recalculées par la dernière mise à jour du chemin critique
+        self.noeuds_recalcules: int = 0
+        # Observateurs des modifications du projet, appelés avec (nature, objet, détail)
+        self._observateurs: List[Callable[[str, object, object], None]] = []
+        # Profondeur des mutations composées en cours (voir _mutation_composee) : les événements
+        # publiés entre-temps décrivent un état intermédiaire
+        self._composees = 0
+        # Journal des changements (voir journaliser et a_la_version)
+        self.journal = None
+        # Analyse de la valeur acquise (voir suivre_valeur_acquise)
+        self.valeur_acquise = None
+        # Magasin en colonnes des tâches (voir stocker_en_colonnes)
+        self.magasin = None
 
     def set_notification_strategy(self, strategy: NotificationStrategy):
         self.notification_context = NotificationContext(strategy)
 
+    def set_notification_context(self, notification_context: NotificationContext):
+        self.notification_context = notification_context
+
+    @mutation("ajouter_tache")
     def ajouter_tache(self, tache: Tache):
+        if self.magasin is not None:
+            self.magasin.adopter((tache,))
         self.taches.append(tache)
-        self.notifier(f"Nouvelle tâche ajoutée: {tache.nom}")
+        tache._rattacher(self)
+        self._index.ajouter(tache)
+        self._moteur = None
+        self._publier("taches", [tache])
+        self.notifier(f"Nouvelle tâche ajoutée: {tache.nom}", SUJET_TACHES, (tache.responsable,))
+
+    @mutation("ajouter_taches")
+    def ajouter_taches(self, taches: Iterable[Element]) -> List[Tache]:
+        # Chargement en masse : validation en une passe, une seule notification
+        # et une seule invalidation du moteur de chemin critique
+        with sans_ramasse_miettes():
+            nouvelles = preparer_taches(self, taches)
+            if self.magasin is not None:
+                self.magasin.adopter(nouvelles)
+            self.taches.extend(nouvelles)
+            for tache in nouvelles:
+                tache._rattacher(self)
+            self._index.ajouter_lot(nouvelles)
+        self._moteur = None
+        if nouvelles:
+            self._publier("taches", nouvelles)
+            self.notifier(f"{len(nouvelles)} nouvelles tâches ajoutées", SUJET_TACHES,
+                          (tache.responsable for tache in nouvelles))
+        return nouvelles
+
+    def rechercher_taches(self, statut: Optional[str] = None, responsable: Optional[Membre] = None,
+                          debut: Optional[datetime] = None, fin: Optional[datetime] = None) -> List[Tache]:
+        # Recherche par index : statut, responsable et/ou chevauchement de la période [debut, fin]
+        return self._index.rechercher(statut, responsable, debut, fin)
+
+    @mutation("ajouter_membres_equipe")
+    def ajouter_membres_equipe(self, membres: Iterable[Element]) -> List[Membre]:
+        # Les membres déjà présents dans l'équipe sont ignorés
+        nouveaux = self.equipe.ajouter_membres(preparer_membres(membres))
+        if nouveaux:
+            self._publier("membres", nouveaux)
+            self.notifier(f"{len(nouveaux)} membres ont été ajoutés à l'équipe", SUJET_EQUIPE)
+        return nouveaux
 
+    @mutation("ajouter_risques")
+    def ajouter_risques(self, risques: Iterable[Element]) -> List[Risque]:
+        nouveaux = preparer_risques(risques)
+        self.risques.extend(nouveaux)
+        if nouveaux:
+            self._publier("risques", nouveaux)
+            self.notifier(f"{len(nouveaux)} nouveaux risques ajoutés", SUJET_RISQUES,
+                          (tache.responsable for risque in nouveaux for tache in risque.taches))
+        return nouveaux
+
+    @mutation("ajouter_jalons")
+    def ajouter_jalons(self, jalons: Iterable[Element]) -> List[Jalon]:
+        nouveaux = preparer_jalons(jalons)
+        self.jalons.extend(nouveaux)
+        if nouveaux:
+            self._publier("jalons", nouveaux)
+            self.notifier(f"{len(nouveaux)} nouveaux jalons ajoutés", SUJET_JALONS)
+        return nouveaux
+
+    @mutation("ajouter_membre_equipe")
     def ajouter_membre_equipe(self, membre: Membre):
-        self.equipe.ajouter_membre(membre)
-        self.notifier(f"{membre.nom} a été ajouté à l'équipe")
+        # O(1) ; sans effet si le membre fait déjà partie de l'équipe
+        if not self.equipe.ajouter_membre(membre):
+            return
+        self._publier("membres", [membre])
+        self.notifier(f"{membre.nom} a été ajouté à l'équipe", SUJET_EQUIPE)
+
+    @mutation("retirer_membre_equipe")
+    def retirer_membre_equipe(self, membre: Membre, remplacant: Optional[Membre] = None):
+        # O(1) pour l'équipe, plus O(k) pour les k tâches du projet dont il est responsable (trouvées
+        # par l'index des responsables) : elles passent au remplaçant, ou n'ont plus de responsable
+        with self._mutation_composee():
+            self.equipe.retirer_membre(membre)
+            for tache in list(self._index.par_responsable.get(membre, ())):
+                tache.changer_responsable(remplacant)
+            if self.abonnements is not None:
+                self.abonnements.desabonner(membre)
+        self._publier("membre_retire", membre, remplacant)
+        self.notifier(f"{membre.nom} a quitté l'équipe", SUJET_EQUIPE)
+
+    @mutation("modifier_membre_equipe")
+    def modifier_membre_equipe(self, membre: Membre, nom: Optional[str] = None, role: Optional[str] = None):
+        # O(1) ; les tâches désignent le même objet Membre et affichent donc le nouveau nom
+        ancien = (membre.nom, membre.role)
+        self.equipe.modifier_membre(membre, nom, role)
+        self._publier("membre_modifie", membre, ancien)
 
+    def taches_de(self, membre: Membre) -> List[Tache]:
+        # O(k) par l'index des responsables
+        return list(self._index.par_responsable.get(membre, ()))
+
+    @mutation("definir_budget")
     def definir_budget(self, budget: float):
         self.budget = budget
-        self.notifier(f"Le budget du projet a été défini: {self.budget} Unité Monetaire")
+        self._publier("budget", budget)
+        self.notifier(f"Le budget du projet a été défini: {self.budget} Unité Monetaire", SUJET_BUDGET)
 
+    @mutation("ajouter_risque")
     def ajouter_risque(self, risque: Risque):
         self.risques.append(risque)
-        self.notifier(f"Nouveau risque ajouté: {risque.description}")
+        self._publier("risques", [risque])
+        self.notifier(f"Nouveau risque ajouté: {risque.description}", SUJET_RISQUES,
+                      (tache.responsable for tache in risque.taches))
 
+    @mutation("ajouter_jalon")
     def ajouter_jalon(self, jalon: Jalon):
         self.jalons.append(jalon)
-        self.notifier(f"Nouveau jalon ajouté: {jalon.nom}")
+        self._publier("jalons", [jalon])
+        self.notifier(f"Nouveau jalon ajouté: {jalon.nom}", SUJET_JALONS)
 
+    @mutation("enregistrer_changement")
     def enregistrer_changement(self, description: str):
         changement = Changement(description, self.version, datetime.now())
         self.changements.append(changement)
         self.version += 1
-        self.notifier(f"Changement enregistré: {description} (version {changement.version})")
+        self._publier("changement", changement)
+        self.notifier(f"Changement enregistré: {description} (version {changement.version})", SUJET_CHANGEMENTS)
+
+    def observer(self, observateur: Callable[[str, object, object], None]):
+        self._observateurs.append(observateur)
+
+    def _publier(self, nature: str, objet=None, detail=None):
+        for observateur in self._observateurs:
+            observateur(nature, objet, detail)
+
+    @contextmanager
+    def _mutation_composee(self):
+        # Les observateurs qui figent l'état du projet (points de reprise du journal) attendent
+        # l'événement qui suit la sortie du bloc
+        self._composees += 1
+        try:
+            yield
+        finally:
+            self._composees -= 1
+
+    def stocker_en_colonnes(self):
+        # Range les tâches, présentes et à venir, dans un MagasinTaches : chacune reste le même objet
+        # mais lit et écrit dates, statut, responsable et résultats du chemin critique dans sa ligne.
+        # calculer_chemin_critique travaille alors sur les colonnes (recalcul complet vectorisé, sans
+        # mise à jour incrémentale), et les parcours du magasin (magasin.taches_en_retard...)
+        # renvoient les tâches du projet. Dates au jour près ; irréversible pour les tâches rangées.
+        if self.magasin is None:
+            from MagasinTaches import MagasinTaches
+            self.magasin = MagasinTaches.pour_projet(self)
+            self._moteur = None
+        return self.magasin
+
+    def journaliser(self, journal):
+        # Consigne désormais chaque opération dans le journal (JournalChangements)
+        journal.attacher(self)
+        self.journal = journal
+
+    def suivre_valeur_acquise(self, **options):
+        # Tient à jour PV, EV, AC, SPI et CPI au fil des modifications (options : voir ValeurAcquise) ;
+        # le rapport gagne une section « Valeur acquise »
+        from ValeurAcquise import ValeurAcquise
+        self.valeur_acquise = ValeurAcquise(self, **options)
+        return self.valeur_acquise
+
+    def a_la_version(self, version: int) -> "Projet":
+        # Copie du projet tel qu'il était à la version donnée, reconstruite depuis le journal
+        if self.journal is None:
+            raise ValueError("Aucun journal de changements n'est attaché au projet")
+        return self.journal.a_la_version(version)
+
+    def iterer_rapport_performance(self) -> Iterator[str]:
+        return RapportPerformance(self).lignes()
+
+    def ecrire_rapport_performance(self, flux: TextIO, format_sortie: str = "texte"):
+        instrumentation = instrumentation_courante()
+        if instrumentation is None:
+            RapportPerformance(self).ecrire(flux, format_sortie)
+            return
+        with instrumentation.chronometre("rapport", format=format_sortie):
+            RapportPerformance(self).ecrire(flux, format_sortie)
 
     def generer_rapport_performance(self) -> str:
-        rapport = f"Rapport d'activités du Projet '{self.nom}'\n"
-        rapport += f"Version: {self.version}\n"
-        rapport += f"Dates: {self.date_debut} à {self.date_fin}\n"
-        rapport += f"Budget : {self.budget} Unité Monetaire\n"
-        rapport += "Équipe:\n"
-        for membre in self.equipe.obtenir_membres():
-            rapport += f"{membre.nom} ({membre.role})\n"
-        rapport += "Tâches:\n"
-        for tache in self.taches:
-            rapport += f"{tache.nom} ({tache.date_debut} à {tache.date_fin}), Responsable: {tache.responsable.nom}, Statut: {tache.statut}\n"
-        rapport += "Jalons:\n"
-        for jalon in self.jalons:
-            rapport += f"{jalon.nom} ({jalon.date})\n"
-        rapport += "Risques:\n"
-        for risque in self.risques:
-            rapport += f"{risque.description} (Probabilité: {risque.probabilite}, Impact: {risque.impact})\n"
-        rapport += "Chemin Critique:\n"
-        for tache in self.chemin_critique:
-            rapport += f"{tache.nom} ({tache.date_debut} à {tache.date_fin})\n"
-        return rapport
-
-    def notifier(self, message: str):
+        # Sections en cache (RapportPerformance.CACHE_SECTIONS) : un attribut modifié sur place sans
+        # passer par une méthode du projet ou de la tâche exige CACHE_SECTIONS.invalider(projet)
+        instrumentation = instrumentation_courante()
+        if instrumentation is None:
+            return "".join(self.iterer_rapport_performance())
+        with instrumentation.chronometre("rapport", format="texte"):
+            return "".join(self.iterer_rapport_performance())
+
+    def abonner(self, membre: Membre, *sujets: str):
+        # Dès le premier abonnement, les messages ne vont plus qu'aux abonnés de leur sujet
+        if self.abonnements is None:
+            self.abonnements = AbonnementsNotifications()
+        self.abonnements.abonner(membre, *sujets)
+
+    def desabonner(self, membre: Membre, *sujets: str):
+        if self.abonnements is not None:
+            self.abonnements.desabonner(membre, *sujets)
+
+    def notifier(self, message: str, sujet: Optional[str] = None, concernes: Iterable[Optional[Membre]] = ()):
+        # `concernes` : responsables des tâches en cause, prévenus s'ils suivent leurs tâches
+        if self.notification_context:
+            if self.abonnements is None:
+                destinataires = self.equipe.obtenir_membres()
+            else:
+                destinataires = self.abonnements.destinataires(sujet, concernes)
+                if not destinataires:
+                    return
+            if self._regroupeur is not None:
+                self._regroupeur.ajouter(message, destinataires)
+            else:
+                self.notification_context.notifier(message, destinataires)
+
+    @contextmanager
+    def lot_notifications(self, taille_max: Optional[int] = None, fenetre: Optional[float] = None):
+        # Suspendre la diffusion message par message : à la sortie du bloc, chaque destinataire
+        # reçoit un résumé unique. Un bloc imbriqué réutilise le regroupement englobant.
+        if self._regroupeur is not None:
+            yield self._regroupeur
+            return
+        self._regroupeur = RegroupeurNotifications(self._diffuser, taille_max, fenetre)
+        try:
+            yield self._regroupeur
+        finally:
+            regroupeur, self._regroupeur = self._regroupeur, None
+            regroupeur.vider()
+
+    def _diffuser(self, message: str, destinataires: List[Membre]):
         if self.notification_context:
-            self.notification_context.notifier(message, self.equipe.obtenir_membres())
+            self.notification_context.notifier(message, destinataires)
+
+    def ordre_topologique(self) -> List[Tache]:
+        return self._moteur_chemin_critique().ordre
 
     def calculer_chemin_critique(self):
-        # Calculer les temps au plus tôt
-        for tache in self.taches:
-            if not tache.dependances:
-                tache.ES = self.date_debut
-                tache.EF = tache.ES + timedelta(days=tache.duree())
+        if self.magasin is not None:
+            # Passes vectorisées sur les colonnes ; les tâches lisent leurs résultats dans leur ligne
+            self.chemin_critique = self.magasin.calculer_chemin_critique()
+            self.noeuds_recalcules = len(self.taches)
+            self._publier("chemin_critique", self.chemin_critique)
+            return
+        moteur = self._moteur_chemin_critique()
+        moteur.date_debut = self.date_debut
+        self.chemin_critique = moteur.calculer()
+        self.noeuds_recalcules = moteur.noeuds_visites
+        self._publier("chemin_critique", self.chemin_critique)
+
+    def _moteur_chemin_critique(self) -> MoteurCheminCritique:
+        if self._moteur is None:
+            self._moteur = MoteurCheminCritique(self.taches, self.date_debut)
+        return self._moteur
+
+    @mutation("tache_modifiee")
+    def _tache_modifiee(self, tache: Tache, nature: str, detail=None):
+        # Appelée par une tâche du projet quand elle change : les index sont tenus à jour et,
+        # si le chemin critique a déjà été calculé, il est mis à jour sur place de façon incrémentale
+        self._publier(nature, tache, detail)
+        if nature == "statut":
+            self._index.changer_statut(tache, detail)
+            if self.abonnements is not None:
+                self.notifier(f"Statut de la tâche {tache.nom}: {tache.statut}", concernes=(tache.responsable,))
+            return
+        if nature == "responsable":
+            self._index.changer_responsable(tache, detail)
+            if self.abonnements is not None:
+                nouveau = tache.responsable.nom if tache.responsable is not None else "personne"
+                self.notifier(f"Tâche {tache.nom} réassignée à {nouveau}", concernes=(tache.responsable, detail))
+            return
+        if nature == "dates":
+            self._index.changer_dates(tache)
+        elif nature == "dependances" and self.magasin is not None:
+            self.magasin.liens_modifies()
+        moteur = self._moteur
+        if moteur is None:
+            return
+        if nature == "dates":
+            self.noeuds_recalcules = moteur.mettre_a_jour(tache)
+        elif nature == "dependances":
+            if detail is None:
+                # Liste remplacée ou modifiée en place : l'ordre topologique est à reconstruire
+                self._moteur = None
+            elif moteur.accepte_dependance(tache, detail):
+                self.noeuds_recalcules = moteur.ajouter_arc(tache, detail)
             else:
-                tache.ES = max(dep.EF for dep in tache.dependances)
-                tache.EF = tache.ES + timedelta(days=tache.duree())
-
-        # Initialiser la date du fin au plus tard pour la dernière tâche
-        fin_projet = max(tache.EF for tache in self.taches)
-        for tache in self.taches:
-            if tache.EF == fin_projet:
-                tache.LF = tache.EF
-                tache.LS = tache.LF - timedelta(days=tache.duree())
-
-        # Calculer les temps au plus tard pour toutes les tâches
-        for tache in reversed(self.taches):
-            if tache.LF is None:
-                tache.LF = min(dep.LS for dep in self.taches if tache in dep.dependances)
-                tache.LS = tache.LF - timedelta(days=tache.duree())
-
-        # Déterminer le chemin critique
-        self.chemin_critique = [tache for tache in self.taches if (tache.LF - tache.EF).days == 0]
+                # L'ordre topologique n'est plus valide : tout sera reconstruit au prochain calcul,
+                # qui signalera un éventuel cycle (rien n'est levé ici, pendant ajouter_dependance)
+                self._moteur = None
@@ -1,7 +1,8 @@
 from Membre import Membre
-from NotificationStrategy.__init__ import NotificationStrategy
+from TransportsNotifications import StrategieTransport
 
 
-class PushNotificationStrategy(NotificationStrategy):
-    def envoyer(self, message: str, destinataire: Membre):
+class PushNotificationStrategy(StrategieTransport):
+    # Envoyer des notifications push (TransportHTTP vers le service push)
+    def afficher(self, message: str, destinataire: Membre):
         print(f"Notification envoyée à {destinataire.nom} par notification push: {message}")
\ No newline at end of file
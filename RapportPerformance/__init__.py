@@ -0,0 +1,227 @@
+import csv
+import json
+import weakref
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, TextIO
+
+if TYPE_CHECKING:
+    from Projet import Projet
+
+# Colonnes de la sortie CSV : chaque enregistrement ne remplit que celles qui le concernent
+COLONNES_CSV = ["section", "nom", "role", "date_debut", "date_fin", "responsable", "statut",
+                "date", "description", "probabilite", "impact", "version", "budget", "pv", "ev", "ac", "spi", "cpi"]
+
+# Sections du rapport à invalider selon la nature d'une modification publiée par le projet
+SECTIONS_PAR_NATURE = {
+    "membres": ("equipe",),
+    "taches": ("taches",),
+    "statut": ("taches",),
+    "dates": ("taches", "chemin_critique"),
+    "dependances": ("chemin_critique",),
+    "jalons": ("jalons",),
+    "risques": ("risques",),
+    "chemin_critique": ("chemin_critique",),
+    "responsable": ("taches",),
+    "membre_retire": ("equipe", "taches"),
+    "membre_modifie": ("equipe", "taches"),
+}
+
+
+# Sections mises en cache
+SECTIONS_RAPPORT = ("equipe", "taches", "jalons", "risques", "chemin_critique")
+
+
+class CacheSections:
+    # Sections de rapport déjà rendues, partagées par tous les projets et bornées par une éviction
+    # LRU, en nombre d'entrées et en caractères. Les entrées sont rangées sous id(projet) : le cache
+    # ne garde pas les projets en vie, celles d'un projet disparu sont retirées par weakref.finalize.
+    # Une entrée est retirée quand le projet publie une modification qui la concerne ; sa signature
+    # (taille de la collection, version de l'équipe) rattrape en plus les ajouts faits directement
+    # dans les listes du projet. Un attribut modifié sur place sans passer par une méthode
+    # (tache.statut = ..., risque.impact = ...) n'est pas vu : appeler alors invalider(projet).
+    # Mémoire : une section absente du cache est transmise ligne à ligne pendant son rendu, et n'est
+    # gardée que si elle tient en `taille_entree` caractères. Au-delà (grands projets), elle est
+    # rendue à chaque rapport mais jamais retenue en entier : la mémoire de pointe reste bornée,
+    # au prix du gain du cache sur ces sections.
+    def __init__(self, capacite: int = 4096, taille_max: int = 32_000_000, taille_entree: int = 4_000_000):
+        self.capacite = capacite
+        self.taille_max = taille_max
+        self.taille_entree = taille_entree
+        self._entrees: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._observes: Dict[int, weakref.finalize] = {}
+        # Caractères des sections en cache
+        self.taille = 0
+        self.succes = 0
+        self.echecs = 0
+        self.evictions = 0
+
+    def lignes(self, projet: "Projet", section: str, signature: Hashable,
+               produire: Callable[[], Iterable[str]]) -> Iterator[str]:
+        # Section en cache d'un seul tenant ; sinon les lignes de `produire()` au fil du rendu
+        cle = (id(projet), section)
+        entree = self._entrees.get(cle)
+        if entree is not None and entree[0] == signature:
+            self.succes += 1
+            self._entrees.move_to_end(cle)
+            yield entree[1]
+            return
+        self.echecs += 1
+        if id(projet) not in self._observes:
+            self._observes[id(projet)] = weakref.finalize(projet, self._oublier, id(projet))
+            projet.observer(self._observateur(id(projet)))
+        morceaux: Optional[List[str]] = []
+        taille = 0
+        for ligne in produire():
+            yield ligne
+            if morceaux is not None:
+                taille += len(ligne)
+                if taille > self.taille_entree:
+                    morceaux = None
+                else:
+                    morceaux.append(ligne)
+        if morceaux is not None:
+            self._memoriser(cle, signature, "".join(morceaux))
+
+    def _memoriser(self, cle: tuple, signature: Hashable, texte: str):
+        self._retirer(cle)
+        self._entrees[cle] = (signature, texte)
+        self.taille += len(texte)
+        while len(self._entrees) > self.capacite or (self.taille > self.taille_max and len(self._entrees) > 1):
+            _, (_, ancien) = self._entrees.popitem(last=False)
+            self.taille -= len(ancien)
+            self.evictions += 1
+
+    def _observateur(self, identifiant: int):
+        def invalider(nature: str, objet, detail):
+            for section in SECTIONS_PAR_NATURE.get(nature, ()):
+                self._retirer((identifiant, section))
+        return invalider
+
+    def _retirer(self, cle: tuple):
+        entree = self._entrees.pop(cle, None)
+        if entree is not None:
+            self.taille -= len(entree[1])
+
+    def _oublier(self, identifiant: int):
+        # Projet ramassé : ses sections sont retirées avant que son id ne puisse resservir
+        self._observes.pop(identifiant, None)
+        for section in SECTIONS_RAPPORT:
+            self._retirer((identifiant, section))
+
+    def invalider(self, projet: "Projet", sections: Optional[Iterable[str]] = None):
+        # Sans sections : tout le rapport du projet
+        for section in SECTIONS_RAPPORT if sections is None else sections:
+            self._retirer((id(projet), section))
+
+    def vider(self):
+        self._entrees.clear()
+        self.taille = 0
+        self.succes = self.echecs = self.evictions = 0
+
+    def statistiques(self) -> Dict[str, int]:
+        return {"entrees": len(self._entrees), "succes": self.succes, "echecs": self.echecs,
+                "evictions": self.evictions}
+
+
+CACHE_SECTIONS = CacheSections()
+
+
+class RapportPerformance:
+    # Rapport d'activités produit au fil de l'eau : chaque section est un générateur de lignes,
+    # rien n'est concaténé tant que l'appelant ne le demande pas
+    def __init__(self, projet: "Projet"):
+        self.projet = projet
+
+    def section_entete(self) -> Iterator[str]:
+        projet = self.projet
+        yield f"Rapport d'activités du Projet '{projet.nom}'\n"
+        yield f"Version: {projet.version}\n"
+        yield f"Dates: {projet.date_debut} à {projet.date_fin}\n"
+        yield f"Budget : {projet.budget} Unité Monetaire\n"
+
+    def section_equipe(self) -> Iterator[str]:
+        yield "Équipe:\n"
+        for membre in self.projet.equipe.obtenir_membres():
+            yield f"{membre.nom} ({membre.role})\n"
+
+    def section_taches(self) -> Iterator[str]:
+        yield "Tâches:\n"
+        for tache in self.projet.taches:
+            responsable = tache.responsable.nom if tache.responsable is not None else "Aucun"
+            yield (f"{tache.nom} ({tache.date_debut} à {tache.date_fin}), "
+                   f"Responsable: {responsable}, Statut: {tache.statut}\n")
+
+    def section_jalons(self) -> Iterator[str]:
+        yield "Jalons:\n"
+        for jalon in self.projet.jalons:
+            yield f"{jalon.nom} ({jalon.date})\n"
+
+    def section_risques(self) -> Iterator[str]:
+        yield "Risques:\n"
+        for risque in self.projet.risques:
+            yield f"{risque.description} (Probabilité: {risque.probabilite}, Impact: {risque.impact})\n"
+
+    def section_chemin_critique(self) -> Iterator[str]:
+        yield "Chemin Critique:\n"
+        for tache in self.projet.chemin_critique:
+            yield f"{tache.nom} ({tache.date_debut} à {tache.date_fin})\n"
+
+    def section_valeur_acquise(self) -> Iterator[str]:
+        # Présente seulement si le projet suit sa valeur acquise
+        if self.projet.valeur_acquise is None:
+            return
+        i = self.projet.valeur_acquise.indicateurs()
+        yield "Valeur acquise:\n"
+        yield f"PV: {i['pv']:.2f}, EV: {i['ev']:.2f}, AC: {i['ac']:.2f}, SPI: {i['spi']:.2f}, CPI: {i['cpi']:.2f}\n"
+
+    def _en_cache(self, section: str, signature) -> Iterator[str]:
+        return CACHE_SECTIONS.lignes(self.projet, section, signature, getattr(self, "section_" + section))
+
+    def lignes(self) -> Iterator[str]:
+        # L'en-tête (budget, version) et la valeur acquise (qui dépend du jour) sont toujours
+        # recalculés ; les autres sections viennent du cache tant qu'elles n'ont pas changé
+        projet = self.projet
+        yield from self.section_entete()
+        yield from self._en_cache("equipe", (id(projet.equipe), projet.equipe.version))
+        for section in ("taches", "jalons", "risques", "chemin_critique"):
+            collection = getattr(projet, section)
+            yield from self._en_cache(section, (id(collection), len(collection)))
+        yield from self.section_valeur_acquise()
+
+    def enregistrements(self) -> Iterator[Dict[str, Any]]:
+        # Même contenu que le texte, sous forme d'enregistrements structurés
+        projet = self.projet
+        yield {"section": "projet", "nom": projet.nom, "version": projet.version,
+               "date_debut": projet.date_debut, "date_fin": projet.date_fin, "budget": projet.budget}
+        for membre in projet.equipe.obtenir_membres():
+            yield {"section": "equipe", "nom": membre.nom, "role": membre.role}
+        for tache in projet.taches:
+            yield {"section": "taches", "nom": tache.nom, "date_debut": tache.date_debut,
+                   "date_fin": tache.date_fin, "statut": tache.statut,
+                   "responsable": tache.responsable.nom if tache.responsable is not None else None}
+        for jalon in projet.jalons:
+            yield {"section": "jalons", "nom": jalon.nom, "date": jalon.date}
+        for risque in projet.risques:
+            yield {"section": "risques", "description": risque.description,
+                   "probabilite": risque.probabilite, "impact": risque.impact}
+        for tache in projet.chemin_critique:
+            yield {"section": "chemin_critique", "nom": tache.nom,
+                   "date_debut": tache.date_debut, "date_fin": tache.date_fin}
+        if projet.valeur_acquise is not None:
+            indicateurs = projet.valeur_acquise.indicateurs()
+            yield {"section": "valeur_acquise", **{cle: indicateurs[cle] for cle in ("pv", "ev", "ac", "spi", "cpi")}}
+
+    def ecrire(self, flux: TextIO, format_sortie: str = "texte"):
+        # Écrire directement dans un objet fichier : "texte", "csv" ou "jsonl"
+        if format_sortie == "texte":
+            flux.writelines(self.lignes())
+        elif format_sortie == "csv":
+            redacteur = csv.DictWriter(flux, fieldnames=COLONNES_CSV, restval="")
+            redacteur.writeheader()
+            redacteur.writerows(self.enregistrements())
+        elif format_sortie == "jsonl":
+            for enregistrement in self.enregistrements():
+                flux.write(json.dumps(enregistrement, ensure_ascii=False, default=str))
+                flux.write("\n")
+        else:
+            raise ValueError(f"Format de rapport inconnu: {format_sortie}")
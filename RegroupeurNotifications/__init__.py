@@ -0,0 +1,82 @@
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from Membre import Membre
+
+
+class RegroupeurNotifications:
+    # Accumule les notifications au lieu de les diffuser une par une, puis envoie à chaque
+    # destinataire un seul résumé. Le vidage a lieu à la demande, quand `taille_max` messages
+    # sont en attente, ou quand le plus ancien message attend depuis plus de `fenetre` secondes :
+    # un minuteur (thread daemon) vide alors le regroupement même si aucun message ne suit, les
+    # envois partant depuis ce thread. Ajouts et vidages sont protégés par un verrou.
+    def __init__(self, envoyer: Callable[[str, List[Membre]], None], taille_max: Optional[int] = None,
+                 fenetre: Optional[float] = None, horloge: Callable[[], float] = time.monotonic):
+        self.envoyer = envoyer
+        self.taille_max = taille_max
+        self.fenetre = fenetre
+        self.horloge = horloge
+        # Messages en attente, groupés par liste de destinataires : (numéro d'ordre, message)
+        self._groupes: Dict[Tuple[Membre, ...], List[Tuple[int, str]]] = {}
+        self._nb_messages = 0
+        self._debut: Optional[float] = None
+        self._minuteur: Optional[threading.Timer] = None
+        self._verrou = threading.RLock()
+        self.nb_vidages = 0
+
+    def ajouter(self, message: str, destinataires: List[Membre]):
+        with self._verrou:
+            if self._debut is None:
+                self._debut = self.horloge()
+                if self.fenetre is not None:
+                    self._minuteur = threading.Timer(self.fenetre, self.vider)
+                    self._minuteur.daemon = True
+                    self._minuteur.start()
+            cle = tuple(destinataires)
+            groupe = self._groupes.get(cle)
+            if groupe is None:
+                groupe = self._groupes[cle] = []
+            groupe.append((self._nb_messages, message))
+            self._nb_messages += 1
+            if self.taille_max is not None and self._nb_messages >= self.taille_max:
+                self.vider()
+            elif self.fenetre is not None and self.horloge() - self._debut >= self.fenetre:
+                self.vider()
+
+    def __len__(self) -> int:
+        return self._nb_messages
+
+    @staticmethod
+    def formater(messages: List[str]) -> str:
+        if len(messages) == 1:
+            return messages[0]
+        return f"Résumé de {len(messages)} notifications:\n" + "\n".join(f"- {message}" for message in messages)
+
+    def vider(self):
+        with self._verrou:
+            if self._minuteur is not None:
+                self._minuteur.cancel()
+                self._minuteur = None
+            if not self._groupes:
+                return
+            groupes = list(self._groupes.items())
+            self._groupes = {}
+            self._nb_messages = 0
+            self._debut = None
+            self.nb_vidages += 1
+            self._envoyer_groupes(groupes)
+
+    def _envoyer_groupes(self, groupes: List[Tuple[Tuple[Membre, ...], List[Tuple[int, str]]]]):
+        # Un destinataire présent dans plusieurs groupes reçoit leurs messages fusionnés
+        # dans l'ordre d'arrivée ; chaque combinaison de groupes n'est formatée qu'une fois
+        par_combinaison: Dict[Tuple[int, ...], List[Membre]] = {}
+        par_destinataire: Dict[Membre, List[int]] = {}
+        for i, (destinataires, _) in enumerate(groupes):
+            for destinataire in destinataires:
+                par_destinataire.setdefault(destinataire, []).append(i)
+        for destinataire, indices in par_destinataire.items():
+            par_combinaison.setdefault(tuple(indices), []).append(destinataire)
+        for indices, destinataires in par_combinaison.items():
+            messages = sorted(message for i in indices for message in groupes[i][1])
+            self.envoyer(self.formater([texte for _, texte in messages]), destinataires)
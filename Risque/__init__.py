@@ -1,5 +1,14 @@
+from typing import Iterable, List, Optional
+
+from Tache import Tache
+
+
 class Risque:
-    def __init__(self, description: str, probabilite: float, impact: str):
+    __slots__ = ("description", "probabilite", "impact", "taches")
+
+    def __init__(self, description: str, probabilite: float, impact: str, taches: Optional[Iterable[Tache]] = None):
         self.description = description
         self.probabilite = probabilite
-        self.impact = impact
\ No newline at end of file
+        self.impact = impact
+        # Tâches dont la durée s'allonge si le risque survient (toutes celles du projet si vide)
+        self.taches: List[Tache] = list(taches) if taches else []
@@ -1,8 +1,8 @@
 from Membre import Membre
-from NotificationStrategy.__init__ import NotificationStrategy
+from TransportsNotifications import StrategieTransport
 
 
-class SMSNotificationStrategy(NotificationStrategy):
-    # Envoyer des notifications par SMS
-    def envoyer(self, message: str, destinataire: Membre):
+class SMSNotificationStrategy(StrategieTransport):
+    # Envoyer des notifications par SMS (TransportHTTP vers une passerelle SMS)
+    def afficher(self, message: str, destinataire: Membre):
         print(f"Notification envoyée à {destinataire.nom} par SMS: {message}")
\ No newline at end of file
@@ -0,0 +1,133 @@
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from OrdonnanceurLot import GrapheLot, GrapheCSR
+from Projet import Projet
+from Tache import Tache
+
+# Allongement relatif moyen de la durée des tâches touchées quand un risque survient
+IMPACTS: Dict[str, float] = {
+    "faible": 0.1,
+    "moyen": 0.25,
+    "moyenne": 0.25,
+    "eleve": 0.5,
+    "elevee": 0.5,
+    "tres eleve": 1.0,
+    "tres elevee": 1.0,
+}
+
+# Écart toléré pour considérer qu'une tâche n'a pas de marge (durées réelles)
+_TOLERANCE = 1e-9
+
+
+def intensite_impact(impact: Union[str, float]) -> float:
+    # Un impact numérique est pris tel quel, un impact textuel est lu dans IMPACTS
+    if isinstance(impact, (int, float)):
+        return float(impact)
+    cle = unicodedata.normalize("NFKD", impact).encode("ascii", "ignore").decode().strip().lower()
+    if cle not in IMPACTS:
+        raise ValueError(f"Impact de risque inconnu: {impact}")
+    return IMPACTS[cle]
+
+
+class _ModeleRisques:
+    # Données transmises aux processus de simulation : graphe CSR, durées de base
+    # et, pour chaque risque, sa probabilité, son intensité et ses colonnes (None = toutes)
+    def __init__(self, csr: GrapheCSR, durees: np.ndarray,
+                 risques: List[Tuple[float, float, Optional[np.ndarray]]]):
+        self.csr = csr
+        self.durees = durees
+        self.risques = risques
+
+
+def _simuler_bloc(modele: _ModeleRisques, taille: int, graine: np.random.SeedSequence):
+    # Un bloc de tirages : durées perturbées par les risques puis CPM vectorisé
+    generateur = np.random.default_rng(graine)
+    durees = np.repeat(modele.durees[:, None], taille, axis=1)
+    for probabilite, intensite, colonnes in modele.risques:
+        survenu = generateur.random(taille) < probabilite
+        facteur = 1.0 + survenu * intensite * generateur.triangular(0.0, 1.0, 2.0, size=taille)
+        if colonnes is None:
+            durees *= facteur
+        else:
+            durees[colonnes] *= facteur
+    _, ef, _, lf, _ = modele.csr.calculer(durees, marges_libres=False)
+    critiques = np.abs(lf - ef) < _TOLERANCE
+    return ef.max(axis=0), critiques.sum(axis=1)
+
+
+_modele_processus: Optional[_ModeleRisques] = None
+
+
+def _initialiser_processus(modele: _ModeleRisques):
+    # Le modèle n'est envoyé qu'une fois par processus, pas à chaque bloc
+    global _modele_processus
+    _modele_processus = modele
+
+
+def _simuler_bloc_processus(taille: int, graine: np.random.SeedSequence):
+    return _simuler_bloc(_modele_processus, taille, graine)
+
+
+class ResultatMonteCarlo:
+    def __init__(self, projet: Projet, durees_projet: np.ndarray, criticite: Dict[Tache, float]):
+        self.projet = projet
+        # Durée totale du projet (en jours) pour chaque tirage
+        self.durees_projet = durees_projet
+        # Indice de criticité : part des tirages où la tâche est sur le chemin critique
+        self.criticite = criticite
+
+    def percentile(self, p: float) -> datetime:
+        return self.projet.date_debut + timedelta(days=float(np.percentile(self.durees_projet, p)))
+
+    def percentiles(self) -> Dict[str, datetime]:
+        return {f"P{p}": self.percentile(p) for p in (50, 80, 95)}
+
+
+class SimulationMonteCarlo:
+    # Simulation du calendrier d'un projet sous l'effet de ses risques : à chaque tirage,
+    # chaque risque survient avec sa probabilité et allonge les tâches qu'il touche.
+    # Les tirages sont découpés en blocs ayant chacun leur graine dérivée de `graine`,
+    # le résultat ne dépend donc pas du nombre de processus.
+    def __init__(self, projet: Projet, iterations: int = 100_000, graine: Optional[int] = None,
+                 processus: int = 1, taille_bloc: Optional[int] = None):
+        self.projet = projet
+        self.iterations = iterations
+        self.graine = graine
+        self.processus = processus
+        self.taille_bloc = taille_bloc
+
+    def _construire_modele(self) -> Tuple[GrapheLot, _ModeleRisques]:
+        graphe = GrapheLot([self.projet])
+        risques = []
+        for risque in self.projet.risques:
+            colonnes = None
+            if risque.taches:
+                colonnes = np.array([graphe.index[tache] for tache in risque.taches], dtype=np.int64)
+            risques.append((risque.probabilite, intensite_impact(risque.impact), colonnes))
+        return graphe, _ModeleRisques(graphe.csr, graphe.durees.astype(np.float64), risques)
+
+    def executer(self) -> ResultatMonteCarlo:
+        if not self.projet.taches:
+            raise ValueError("Le projet ne contient aucune tâche")
+        graphe, modele = self._construire_modele()
+        # Environ deux millions de cellules par tableau de travail
+        taille_bloc = self.taille_bloc or max(1, 2_000_000 // len(graphe.taches))
+        tailles = [min(taille_bloc, self.iterations - debut) for debut in range(0, self.iterations, taille_bloc)]
+        graines = np.random.SeedSequence(self.graine).spawn(len(tailles))
+
+        if self.processus > 1:
+            with ProcessPoolExecutor(self.processus, initializer=_initialiser_processus,
+                                     initargs=(modele,)) as executeur:
+                blocs = list(executeur.map(_simuler_bloc_processus, tailles, graines))
+        else:
+            blocs = [_simuler_bloc(modele, taille, graine) for taille, graine in zip(tailles, graines)]
+
+        durees_projet = np.concatenate([fins for fins, _ in blocs])
+        comptes = sum(compte for _, compte in blocs)
+        criticite = dict(zip(graphe.taches, (comptes / self.iterations).tolist()))
+        return ResultatMonteCarlo(self.projet, durees_projet, criticite)
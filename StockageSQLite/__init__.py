@@ -0,0 +1,366 @@
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from Changement import Changement
+from Equipe import Equipe
+from IndexTaches import IndexTaches
+from InstantaneProjet import ordre_membres
+from Jalon import Jalon
+from Membre import Membre
+from Projet import Projet
+from Risque import Risque
+from Tache import Tache
+
+# Tâches, membres, risques... sont rangés par (projet, rang) ; les dates sont en ISO 8601.
+# Budget et impact gardent leur type (entier, réel ou texte) grâce au typage dynamique de SQLite.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS projets (
+    id INTEGER PRIMARY KEY, nom TEXT, description TEXT, date_debut TEXT, date_fin TEXT,
+    budget, version INTEGER);
+CREATE TABLE IF NOT EXISTS membres (
+    projet INTEGER, rang INTEGER, nom TEXT, role TEXT, equipe INTEGER,
+    PRIMARY KEY (projet, rang)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS taches (
+    projet INTEGER, rang INTEGER, nom TEXT, description TEXT, date_debut TEXT, date_fin TEXT,
+    responsable INTEGER, statut TEXT, es TEXT, ef TEXT, ls TEXT, lf TEXT,
+    marge_totale INTEGER, marge_libre INTEGER, critique INTEGER,
+    PRIMARY KEY (projet, rang)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS dependances (
+    projet INTEGER, tache INTEGER, position INTEGER, dependance INTEGER,
+    PRIMARY KEY (projet, tache, position)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS risques (
+    projet INTEGER, rang INTEGER, description TEXT, probabilite REAL, impact,
+    PRIMARY KEY (projet, rang)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS risques_taches (
+    projet INTEGER, risque INTEGER, position INTEGER, tache INTEGER,
+    PRIMARY KEY (projet, risque, position)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS jalons (
+    projet INTEGER, rang INTEGER, nom TEXT, date TEXT,
+    PRIMARY KEY (projet, rang)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS changements (
+    projet INTEGER, rang INTEGER, description TEXT, version INTEGER, date TEXT,
+    PRIMARY KEY (projet, rang)) WITHOUT ROWID;
+"""
+TABLES_ENFANTS = ("membres", "taches", "dependances", "risques", "risques_taches", "jalons", "changements")
+
+
+def _iso(date: Optional[datetime]) -> Optional[str]:
+    return None if date is None else date.isoformat()
+
+
+def _date(texte: Optional[str]) -> Optional[datetime]:
+    return None if texte is None else datetime.fromisoformat(texte)
+
+
+def _memoriser(conversion):
+    # Les dates d'un projet se répètent beaucoup : chaque valeur distincte n'est convertie qu'une fois
+    valeurs = {None: None}
+
+    def convertir(valeur):
+        try:
+            return valeurs[valeur]
+        except KeyError:
+            resultat = valeurs[valeur] = conversion(valeur)
+            return resultat
+    return convertir
+
+
+class PoolConnexions:
+    # Petit pool de connexions SQLite (mode WAL : lecteurs concurrents et un rédacteur)
+    def __init__(self, chemin: str, taille: int = 4):
+        if taille < 1:
+            raise ValueError("Le pool doit contenir au moins une connexion")
+        self.chemin = chemin
+        self.taille = taille
+        self._libres: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._toutes: List[sqlite3.Connection] = []
+        # Connexions sorties du pool pendant fermer() : fermées à leur retour
+        self._a_fermer: set = set()
+        self._verrou = threading.Lock()
+
+    def _ouvrir(self) -> sqlite3.Connection:
+        # Les requêtes paramétrées sont préparées une fois puis gardées en cache par connexion
+        connexion = sqlite3.connect(self.chemin, timeout=30, check_same_thread=False, cached_statements=256)
+        connexion.execute("PRAGMA journal_mode=WAL")
+        connexion.execute("PRAGMA synchronous=NORMAL")
+        return connexion
+
+    @contextmanager
+    def connexion(self) -> Iterator[sqlite3.Connection]:
+        connexion = None
+        while connexion is None:
+            try:
+                connexion = self._libres.get_nowait()
+            except queue.Empty:
+                with self._verrou:
+                    if len(self._toutes) < self.taille:
+                        connexion = self._ouvrir()
+                        self._toutes.append(connexion)
+                if connexion is None:
+                    # None : une connexion sortie avant fermer() a été fermée à son retour, place libre
+                    connexion = self._libres.get()
+        try:
+            yield connexion
+        finally:
+            with self._verrou:
+                a_fermer = connexion in self._a_fermer
+                self._a_fermer.discard(connexion)
+            if a_fermer:
+                connexion.close()
+                self._libres.put(None)
+            else:
+                self._libres.put(connexion)
+
+    def fermer(self):
+        # Les connexions libres sont fermées aussitôt, celles en cours d'utilisation à leur retour ;
+        # le pool en rouvre à la demande s'il resert
+        with self._verrou:
+            libres = set()
+            while True:
+                try:
+                    libres.add(self._libres.get_nowait())
+                except queue.Empty:
+                    break
+            libres.discard(None)
+            for connexion in self._toutes:
+                if connexion in libres:
+                    connexion.close()
+                else:
+                    self._a_fermer.add(connexion)
+            self._toutes.clear()
+
+
+class _Collection:
+    # Collection d'un ProjetSQLite lue dans la base au premier accès, puis gardée sur l'instance
+    def __set_name__(self, proprietaire, nom: str):
+        self.nom = nom
+
+    def __get__(self, projet, proprietaire=None):
+        if projet is None:
+            return self
+        if self.nom not in projet._collections:
+            projet._charger(self.nom)
+        return projet._collections[self.nom]
+
+    def __set__(self, projet, valeur):
+        projet.__dict__.setdefault("_collections", {})[self.nom] = valeur
+
+
+class ProjetSQLite(Projet):
+    # Projet chargé paresseusement : seule la ligne du projet est lue à l'ouverture
+    taches = _Collection()
+    equipe = _Collection()
+    risques = _Collection()
+    jalons = _Collection()
+    changements = _Collection()
+    chemin_critique = _Collection()
+
+    def __init__(self, stockage: "StockageSQLite", identifiant: int, nom: str, description: str,
+                 date_debut: datetime, date_fin: datetime, budget: float, version: int):
+        super().__init__(nom, description, date_debut, date_fin, budget)
+        self.version = version
+        self.identifiant = identifiant
+        self._stockage = stockage
+        # Les collections vides posées par Projet.__init__ sont oubliées : elles viendront de la base
+        self._collections.clear()
+        self._membres_par_rang: List[Membre] = []
+
+    @property
+    def _index(self) -> IndexTaches:
+        # Les index ne valent que pour des tâches chargées : toute recherche (rechercher_taches,
+        # taches_de, retrait d'un membre...) commence donc par charger les tâches
+        if "taches" not in self._collections:
+            self._charger("taches")
+        return self.__dict__["_index"]
+
+    @_index.setter
+    def _index(self, index: IndexTaches):
+        self.__dict__["_index"] = index
+
+    def est_charge(self, nom: str) -> bool:
+        return nom in self._collections
+
+    def _charger(self, nom: str):
+        stockage = self._stockage
+        if nom == "equipe":
+            equipe = Equipe()
+            membres = stockage.lire_membres(self.identifiant)
+            for membre, dans_equipe in membres:
+                if dans_equipe:
+                    equipe.ajouter_membre(membre)
+            self._membres_par_rang = [membre for membre, _ in membres]
+            self._collections["equipe"] = equipe
+        elif nom == "taches":
+            self.equipe
+            taches, critiques = stockage.lire_taches(self.identifiant, self._membres_par_rang)
+            self._collections["taches"] = taches
+            for tache in taches:
+                tache._rattacher(self)
+                self._index.ajouter(tache)
+            self._collections.setdefault("chemin_critique", critiques)
+        elif nom == "chemin_critique":
+            self.taches
+        elif nom == "risques":
+            self._collections["risques"] = stockage.lire_risques(self.identifiant, self.taches)
+        elif nom == "jalons":
+            self._collections["jalons"] = stockage.lire_jalons(self.identifiant)
+        elif nom == "changements":
+            self._collections["changements"] = stockage.lire_changements(self.identifiant)
+
+
+class StockageSQLite:
+    # Persistance des projets dans une base SQLite partageable entre processus
+    def __init__(self, chemin: str, taille_pool: int = 4):
+        self.pool = PoolConnexions(chemin, taille_pool)
+        with self.pool.connexion() as connexion:
+            connexion.executescript(SCHEMA)
+
+    def fermer(self):
+        self.pool.fermer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fermer()
+
+    def projets(self) -> List[Tuple[int, str]]:
+        with self.pool.connexion() as connexion:
+            return connexion.execute("SELECT id, nom FROM projets ORDER BY id").fetchall()
+
+    def sauvegarder(self, projet: Projet, identifiant: Optional[int] = None) -> int:
+        # Écrit le projet entier en une transaction (remplace la version stockée s'il y en a une)
+        if identifiant is None:
+            identifiant = getattr(projet, "identifiant", None)
+        membres = ordre_membres(projet)
+        equipe = set(projet.equipe.obtenir_membres())
+        rangs_membres = {membre: rang for rang, membre in enumerate(membres)}
+        taches = projet.taches
+        rangs_taches = {tache: rang for rang, tache in enumerate(taches)}
+        critiques = set(projet.chemin_critique)
+        iso = _memoriser(_iso)
+        ligne_projet = (projet.nom, projet.description, _iso(projet.date_debut), _iso(projet.date_fin),
+                        projet.budget, projet.version)
+        with self.pool.connexion() as connexion, connexion:
+            if identifiant is None:
+                identifiant = connexion.execute(
+                    "INSERT INTO projets (nom, description, date_debut, date_fin, budget, version) "
+                    "VALUES (?, ?, ?, ?, ?, ?)", ligne_projet).lastrowid
+            else:
+                connexion.execute("INSERT OR REPLACE INTO projets VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                  (identifiant,) + ligne_projet)
+                for table in TABLES_ENFANTS:
+                    connexion.execute(f"DELETE FROM {table} WHERE projet = ?", (identifiant,))
+            connexion.executemany("INSERT INTO membres VALUES (?, ?, ?, ?, ?)",
+                                  ((identifiant, rang, membre.nom, membre.role, membre in equipe)
+                                   for rang, membre in enumerate(membres)))
+            connexion.executemany(
+                "INSERT INTO taches VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                ((identifiant, rang, tache.nom, tache.description, iso(tache.date_debut), iso(tache.date_fin),
+                  rangs_membres.get(tache.responsable), tache.statut, iso(tache.ES), iso(tache.EF),
+                  iso(tache.LS), iso(tache.LF), tache.marge_totale, tache.marge_libre, tache in critiques)
+                 for rang, tache in enumerate(taches)))
+            connexion.executemany("INSERT INTO dependances VALUES (?, ?, ?, ?)",
+                                  ((identifiant, rang, position, rangs_taches[dependance])
+                                   for rang, tache in enumerate(taches)
+                                   for position, dependance in enumerate(tache.dependances)))
+            connexion.executemany("INSERT INTO risques VALUES (?, ?, ?, ?, ?)",
+                                  ((identifiant, rang, risque.description, risque.probabilite, risque.impact)
+                                   for rang, risque in enumerate(projet.risques)))
+            connexion.executemany("INSERT INTO risques_taches VALUES (?, ?, ?, ?)",
+                                  ((identifiant, rang, position, rangs_taches[tache])
+                                   for rang, risque in enumerate(projet.risques)
+                                   for position, tache in enumerate(risque.taches)))
+            connexion.executemany("INSERT INTO jalons VALUES (?, ?, ?, ?)",
+                                  ((identifiant, rang, jalon.nom, _iso(jalon.date))
+                                   for rang, jalon in enumerate(projet.jalons)))
+            connexion.executemany("INSERT INTO changements VALUES (?, ?, ?, ?, ?)",
+                                  ((identifiant, rang, changement.description, changement.version,
+                                    _iso(changement.date))
+                                   for rang, changement in enumerate(projet.changements)))
+        return identifiant
+
+    def charger(self, identifiant: int) -> ProjetSQLite:
+        with self.pool.connexion() as connexion:
+            ligne = connexion.execute(
+                "SELECT nom, description, date_debut, date_fin, budget, version FROM projets WHERE id = ?",
+                (identifiant,)).fetchone()
+        if ligne is None:
+            raise KeyError(f"Aucun projet d'identifiant {identifiant}")
+        nom, description, date_debut, date_fin, budget, version = ligne
+        return ProjetSQLite(self, identifiant, nom, description, _date(date_debut), _date(date_fin), budget,
+                            version)
+
+    def supprimer(self, identifiant: int):
+        with self.pool.connexion() as connexion, connexion:
+            connexion.execute("DELETE FROM projets WHERE id = ?", (identifiant,))
+            for table in TABLES_ENFANTS:
+                connexion.execute(f"DELETE FROM {table} WHERE projet = ?", (identifiant,))
+
+    # --- Lecture des collections (appelée par ProjetSQLite au premier accès) ---
+
+    def lire_membres(self, identifiant: int) -> List[Tuple[Membre, bool]]:
+        with self.pool.connexion() as connexion:
+            lignes = connexion.execute("SELECT nom, role, equipe FROM membres WHERE projet = ? ORDER BY rang",
+                                       (identifiant,)).fetchall()
+        return [(Membre(nom, role), bool(equipe)) for nom, role, equipe in lignes]
+
+    def lire_taches(self, identifiant: int, membres: List[Membre]) -> Tuple[List[Tache], List[Tache]]:
+        with self.pool.connexion() as connexion:
+            lignes = connexion.execute(
+                "SELECT nom, description, date_debut, date_fin, responsable, statut, es, ef, ls, lf, "
+                "marge_totale, marge_libre, critique FROM taches WHERE projet = ? ORDER BY rang",
+                (identifiant,)).fetchall()
+            aretes = connexion.execute(
+                "SELECT tache, dependance FROM dependances WHERE projet = ? ORDER BY tache, position",
+                (identifiant,)).fetchall()
+        date = _memoriser(_date)
+        taches = []
+        critiques = []
+        for (nom, description, debut, fin, responsable, statut, es, ef, ls, lf, marge_totale, marge_libre,
+             critique) in lignes:
+            tache = Tache(nom, description, date(debut), date(fin),
+                          membres[responsable] if responsable is not None else None, statut)
+            tache.ES, tache.EF, tache.LS, tache.LF = date(es), date(ef), date(ls), date(lf)
+            tache.marge_totale = marge_totale
+            tache.marge_libre = marge_libre
+            taches.append(tache)
+            if critique:
+                critiques.append(tache)
+        dependances: Dict[int, List[Tache]] = {}
+        for tache, dependance in aretes:
+            dependances.setdefault(tache, []).append(taches[dependance])
+        for rang, liste in dependances.items():
+            taches[rang].dependances = liste
+        return taches, critiques
+
+    def lire_risques(self, identifiant: int, taches: List[Tache]) -> List[Risque]:
+        with self.pool.connexion() as connexion:
+            lignes = connexion.execute(
+                "SELECT description, probabilite, impact FROM risques WHERE projet = ? ORDER BY rang",
+                (identifiant,)).fetchall()
+            liens = connexion.execute(
+                "SELECT risque, tache FROM risques_taches WHERE projet = ? ORDER BY risque, position",
+                (identifiant,)).fetchall()
+        concernees: Dict[int, List[Tache]] = {}
+        for risque, tache in liens:
+            concernees.setdefault(risque, []).append(taches[tache])
+        return [Risque(description, probabilite, impact, concernees.get(rang))
+                for rang, (description, probabilite, impact) in enumerate(lignes)]
+
+    def lire_jalons(self, identifiant: int) -> List[Jalon]:
+        with self.pool.connexion() as connexion:
+            lignes = connexion.execute("SELECT nom, date FROM jalons WHERE projet = ? ORDER BY rang",
+                                       (identifiant,)).fetchall()
+        return [Jalon(nom, _date(date)) for nom, date in lignes]
+
+    def lire_changements(self, identifiant: int) -> List[Changement]:
+        with self.pool.connexion() as connexion:
+            lignes = connexion.execute(
+                "SELECT description, version, date FROM changements WHERE projet = ? ORDER BY rang",
+                (identifiant,)).fetchall()
+        return [Changement(description, version, _date(date)) for description, version, date in lignes]
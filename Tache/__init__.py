@@ -1,10 +1,84 @@
 from datetime import datetime, timedelta
-from typing import Optional, List
+from typing import Iterable, Optional, List
 
 from Membre import Membre
 
 
+class ListeDependances(list):
+    # Liste des dépendances d'une tâche : toute modification en place est signalée aux projets
+    # de la tâche, comme ajouter_dependance. Tant que la tâche n'a aucune dépendance, la liste
+    # renvoyée n'est pas conservée ; elle le devient à sa première modification.
+    __slots__ = ("_tache",)
+
+    def __init__(self, tache: "Tache", dependances: Iterable["Tache"] = ()):
+        super().__init__(dependances)
+        self._tache = tache
+
+    def _modifiee(self):
+        # Remplacement quelconque : les projets reconstruisent leur ordre topologique
+        self._tache._dependances = self if self else None
+        self._tache._signaler("dependances")
+
+    def append(self, tache: "Tache"):
+        # Un seul arc : les projets le prennent en compte de façon incrémentale
+        super().append(tache)
+        self._tache._dependances = self
+        self._tache._signaler("dependances", tache)
+
+    def extend(self, taches: Iterable["Tache"]):
+        super().extend(taches)
+        self._modifiee()
+
+    def __iadd__(self, taches: Iterable["Tache"]):
+        self.extend(taches)
+        return self
+
+    def insert(self, position: int, tache: "Tache"):
+        super().insert(position, tache)
+        self._modifiee()
+
+    def remove(self, tache: "Tache"):
+        super().remove(tache)
+        self._modifiee()
+
+    def pop(self, position: int = -1) -> "Tache":
+        tache = super().pop(position)
+        self._modifiee()
+        return tache
+
+    def clear(self):
+        super().clear()
+        self._modifiee()
+
+    def __setitem__(self, position, valeur):
+        super().__setitem__(position, valeur)
+        self._modifiee()
+
+    def __delitem__(self, position):
+        super().__delitem__(position)
+        self._modifiee()
+
+    def __copy__(self) -> List["Tache"]:
+        # Une copie n'est plus liée à la tâche
+        return list(self)
+
+
+def _alias(attribut: str) -> property:
+    # Nom en minuscules (es, ef, ls, lf) de l'ancienne version de main.py
+    return property(lambda tache: getattr(tache, attribut),
+                    lambda tache, valeur: setattr(tache, attribut, valeur))
+
+
 class Tache:
+    # Attributs fixes (__slots__) : pas de dictionnaire par instance. La liste des dépendances
+    # et celle des projets ne sont allouées qu'au premier ajout. `dependances` reste une liste
+    # modifiable : ajout, remplacement ou modification en place préviennent les projets.
+    # `_magasin` et `_ligne` ne servent qu'une fois la tâche rangée dans un MagasinTaches.
+    # `__weakref__` garde les tâches référençables par weakref, comme avant les __slots__.
+    __slots__ = ("nom", "description", "date_debut", "date_fin", "responsable", "statut", "_dependances",
+                 "ES", "EF", "LS", "LF", "marge_totale", "marge_libre", "_projets", "_magasin", "_ligne",
+                 "__weakref__")
+
     def __init__(self, nom: str, description: str, date_debut: datetime, date_fin: datetime, responsable: Membre,
                  statut: str):
         self.nom = nom
@@ -13,19 +87,70 @@ class Tache:
         self.date_fin = date_fin
         self.responsable = responsable
         self.statut = statut
-        self.dependances: List['Tache'] = []
+        self._dependances: Optional[ListeDependances] = None
         #Ajout des attributs supplementaires pour pouvoir
         # calculer le chemin critique apres dans la classe Projet
         self.ES: Optional[datetime] = None #Date de début au plus tôt
         self.EF: Optional[datetime] = None #Date de fin au plus tôt
         self.LS: Optional[datetime] = None #Date de début au plus tard
         self.LF: Optional[datetime] = None #Date de fin au plus tard
+        self.marge_totale: Optional[int] = None #Marge totale en jours
+        self.marge_libre: Optional[int] = None #Marge libre en jours
+        # Projets contenant la tâche, prévenus quand son graphe de dépendances change
+        self._projets: Optional[List] = None
+
+    es = _alias("ES")
+    ef = _alias("EF")
+    ls = _alias("LS")
+    lf = _alias("LF")
+
+    @property
+    def dependances(self) -> ListeDependances:
+        # Liste modifiable ; ses modifications sont signalées aux projets de la tâche
+        if self._dependances is None:
+            return ListeDependances(self)
+        return self._dependances
+
+    @dependances.setter
+    def dependances(self, dependances: Iterable['Tache']):
+        self._dependances = ListeDependances(self, dependances) or None
+        self._signaler("dependances")
 
     def ajouter_dependance(self, tache: 'Tache'):
-        self.dependances.append(tache)
+        if self._dependances is None:
+            self._dependances = ListeDependances(self, (tache,))
+        else:
+            list.append(self._dependances, tache)
+        self._signaler("dependances", tache)
+
+    def modifier_dates(self, date_debut: Optional[datetime] = None, date_fin: Optional[datetime] = None):
+        # Les projets de la tâche repropagent leur chemin critique de façon incrémentale
+        if date_debut is not None:
+            self.date_debut = date_debut
+        if date_fin is not None:
+            self.date_fin = date_fin
+        self._signaler("dates")
 
     def mettre_a_jour_statut(self, statut: str):
+        ancien_statut = self.statut
         self.statut = statut
+        self._signaler("statut", ancien_statut)
+
+    def changer_responsable(self, responsable: Optional[Membre]):
+        ancien_responsable = self.responsable
+        self.responsable = responsable
+        self._signaler("responsable", ancien_responsable)
 
     def duree(self) -> int:
-        return (self.date_fin - self.date_debut).days
\ No newline at end of file
+        return (self.date_fin - self.date_debut).days
+
+    def _rattacher(self, projet):
+        if self._projets is None:
+            self._projets = [projet]
+        else:
+            self._projets.append(projet)
+
+    def _signaler(self, nature: str, detail=None):
+        if self._projets is not None:
+            for projet in self._projets:
+                projet._tache_modifiee(self, nature, detail)
@@ -0,0 +1,370 @@
+import json
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from Membre import Membre
+from NotificationStrategy import ErreurTransport, NotificationStrategy
+
+# smtplib, http.client, socketserver et http.server coûtent chacun plusieurs dizaines de
+# millisecondes à importer : ils ne le sont qu'à la première connexion ou au démarrage d'un serveur.
+
+
+class SeauJetons:
+    # Limiteur de débit : `debit` jetons par seconde, au plus `capacite` accumulés (rafale permise)
+    def __init__(self, debit: float, capacite: Optional[float] = None,
+                 horloge: Callable[[], float] = time.monotonic, attendre: Callable[[float], None] = time.sleep):
+        if debit <= 0:
+            raise ValueError("Le débit doit être positif")
+        self.debit = debit
+        self.capacite = debit if capacite is None else capacite
+        self.horloge = horloge
+        self.attendre = attendre
+        self.jetons = self.capacite
+        self._instant = horloge()
+        self._verrou = threading.Lock()
+
+    def _remplir(self):
+        maintenant = self.horloge()
+        self.jetons = min(self.capacite, self.jetons + (maintenant - self._instant) * self.debit)
+        self._instant = maintenant
+
+    def prendre(self, n: float = 1):
+        # Bloque jusqu'à ce que `n` jetons soient disponibles
+        if n > self.capacite:
+            raise ValueError(f"Impossible de prendre {n} jetons d'un seau de capacité {self.capacite}")
+        with self._verrou:
+            self._remplir()
+            while self.jetons < n:
+                self.attendre((n - self.jetons) / self.debit)
+                self._remplir()
+            self.jetons -= n
+
+
+class Transport:
+    # Canal d'envoi réel sous les stratégies : la connexion est ouverte au premier envoi et
+    # réutilisée ; un lot est regroupé par texte (un message, plusieurs destinataires) puis découpé
+    # en paquets d'au plus `taille_lot` destinataires, chacun payé en jetons au limiteur éventuel.
+    def __init__(self, taille_lot: int = 100, limiteur: Optional[SeauJetons] = None):
+        self.taille_lot = taille_lot
+        self.limiteur = limiteur
+        self._connexion = None
+        self._verrou = threading.Lock()
+        self.connexions = 0
+        self.paquets_envoyes = 0
+        self.messages_envoyes = 0
+
+    def envoyer_lot(self, envois: Iterable[Tuple[str, str]]) -> int:
+        # `envois` : couples (adresse, texte) ; renvoie le nombre de messages envoyés. Un paquet en
+        # échec lève ErreurTransport avec les positions, dans `envois`, des couples non envoyés
+        envois = list(envois)
+        groupes: Dict[str, List[int]] = {}
+        for position, (_, texte) in enumerate(envois):
+            groupes.setdefault(texte, []).append(position)
+        taille = self.taille_lot if self.limiteur is None else max(1, min(self.taille_lot, int(self.limiteur.capacite)))
+        paquets = [(texte, positions[debut:debut + taille])
+                   for texte, positions in groupes.items() for debut in range(0, len(positions), taille)]
+        envoyes = 0
+        with self._verrou:
+            try:
+                for numero, (texte, paquet) in enumerate(paquets):
+                    if self.limiteur is not None:
+                        self.limiteur.prendre(len(paquet))
+                    try:
+                        self._envoyer_connecte(texte, [envois[position][0] for position in paquet])
+                    except Exception as erreur:
+                        if not self._erreur_transport(erreur):
+                            raise
+                        non_envoyes = sorted(position for _, reste in paquets[numero:] for position in reste)
+                        raise ErreurTransport(str(erreur), non_envoyes) from erreur
+                    self.paquets_envoyes += 1
+                    envoyes += len(paquet)
+            finally:
+                self.messages_envoyes += envoyes
+        return envoyes
+
+    def _envoyer_connecte(self, texte: str, adresses: List[str]):
+        if self._connexion is None:
+            self._connexion = self._connecter()
+            self.connexions += 1
+        try:
+            self._envoyer_paquet(self._connexion, texte, adresses)
+        except Exception as erreur:
+            if not self._connexion_perdue(erreur):
+                raise
+            # Connexion fermée par le serveur entre deux lots : une seule reconnexion
+            self._abandonner()
+            self._connexion = self._connecter()
+            self.connexions += 1
+            self._envoyer_paquet(self._connexion, texte, adresses)
+
+    def _abandonner(self):
+        connexion, self._connexion = self._connexion, None
+        try:
+            self._deconnecter(connexion)
+        except Exception:  # la connexion est déjà inutilisable
+            pass
+
+    def fermer(self):
+        with self._verrou:
+            if self._connexion is not None:
+                connexion, self._connexion = self._connexion, None
+                self._deconnecter(connexion)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fermer()
+
+    # À fournir par chaque canal
+    def _connecter(self):
+        raise NotImplementedError
+
+    def _envoyer_paquet(self, connexion, texte: str, adresses: List[str]):
+        raise NotImplementedError
+
+    def _deconnecter(self, connexion):
+        connexion.close()
+
+    def _connexion_perdue(self, erreur: Exception) -> bool:
+        return isinstance(erreur, ConnectionError)
+
+    def _erreur_transport(self, erreur: Exception) -> bool:
+        # Erreur du canal (et non du programme) : le paquet est compté comme non envoyé
+        return isinstance(erreur, (ErreurTransport, OSError))
+
+
+class TransportSMTP(Transport):
+    # Email : une transaction SMTP (MAIL, RCPT... , DATA) par paquet, sur une connexion réutilisée
+    def __init__(self, hote: str = "localhost", port: int = 25, expediteur: str = "mpql@localhost",
+                 sujet: str = "Notification MPQL", taille_lot: int = 100, limiteur: Optional[SeauJetons] = None,
+                 delai: float = 10.0):
+        super().__init__(taille_lot, limiteur)
+        self.hote = hote
+        self.port = port
+        self.expediteur = expediteur
+        self.sujet = sujet
+        self.delai = delai
+
+    def _connecter(self):
+        import smtplib
+        connexion = smtplib.SMTP(self.hote, self.port, timeout=self.delai)
+        connexion.ehlo()
+        return connexion
+
+    def _envoyer_paquet(self, connexion, texte: str, adresses: List[str]):
+        contenu = (f"From: {self.expediteur}\r\nTo: undisclosed-recipients:;\r\nSubject: {self.sujet}\r\n"
+                   f"Content-Type: text/plain; charset=utf-8\r\nContent-Transfer-Encoding: 8bit\r\n\r\n{texte}\r\n")
+        connexion.sendmail(self.expediteur, adresses, contenu.encode("utf-8"))
+
+    def _deconnecter(self, connexion):
+        connexion.quit()
+
+    def _connexion_perdue(self, erreur: Exception) -> bool:
+        import smtplib
+        return isinstance(erreur, (ConnectionError, smtplib.SMTPServerDisconnected))
+
+
+class TransportHTTP(Transport):
+    # Point d'accès HTTP groupé (SMS en masse, push multidiffusion) : un POST JSON
+    # {"message": ..., "destinataires": [...]} par paquet, en connexion persistante (HTTP/1.1)
+    def __init__(self, url: str, taille_lot: int = 500, limiteur: Optional[SeauJetons] = None, delai: float = 10.0):
+        super().__init__(taille_lot, limiteur)
+        self.url = url
+        self.delai = delai
+
+    def _connecter(self):
+        import http.client
+        from urllib.parse import urlsplit
+        adresse = urlsplit(self.url)
+        classe = http.client.HTTPSConnection if adresse.scheme == "https" else http.client.HTTPConnection
+        return classe(adresse.hostname, adresse.port, timeout=self.delai)
+
+    def _erreur_transport(self, erreur: Exception) -> bool:
+        import http.client
+        return isinstance(erreur, (ErreurTransport, OSError, http.client.HTTPException))
+
+    def _envoyer_paquet(self, connexion, texte: str, adresses: List[str]):
+        from urllib.parse import urlsplit
+        corps = json.dumps({"message": texte, "destinataires": adresses}, ensure_ascii=False).encode("utf-8")
+        connexion.request("POST", urlsplit(self.url).path or "/", corps, {"Content-Type": "application/json"})
+        reponse = connexion.getresponse()
+        reponse.read()
+        if reponse.status >= 300:
+            raise ErreurTransport(f"Le point d'accès {self.url} a répondu {reponse.status} {reponse.reason}")
+
+
+class StrategieTransport(NotificationStrategy):
+    # Stratégie qui délègue à un transport ; sans transport, les messages sont affichés (console).
+    # `adresse` traduit un membre en adresse du canal (email, numéro, jeton d'appareil).
+    def __init__(self, transport: Optional[Transport] = None, adresse: Optional[Callable[[Membre], str]] = None):
+        self.transport = transport
+        self.adresse = adresse or (lambda membre: membre.nom)
+
+    @property
+    def par_lot(self) -> bool:
+        return self.transport is not None
+
+    def afficher(self, message: str, destinataire: Membre):
+        raise NotImplementedError("Cette méthode doit être implémentée par les sous-classes")
+
+    def envoyer(self, message: str, destinataire: Membre):
+        if self.transport is None:
+            self.afficher(message, destinataire)
+        else:
+            self.transport.envoyer_lot([(self.adresse(destinataire), message)])
+
+    def envoyer_lot(self, message: str, destinataires: List[Membre]):
+        if self.transport is None:
+            super().envoyer_lot(message, destinataires)
+        else:
+            self.transport.envoyer_lot([(self.adresse(destinataire), message) for destinataire in destinataires])
+
+
+class _ServeurLocal:
+    # Serveur de substitution exécuté dans un thread, sur un port libre de la machine
+    def __init__(self, hote: str = "127.0.0.1", port: int = 0):
+        self.hote = hote
+        self.port = port
+        self.connexions = 0
+        self._serveur = None
+        self._thread: Optional[threading.Thread] = None
+        self._verrou = threading.Lock()
+
+    def _creer_serveur(self):
+        raise NotImplementedError
+
+    def demarrer(self):
+        if self._serveur is not None:
+            return self
+        self._serveur = self._creer_serveur()
+        self._serveur.daemon_threads = True
+        self.port = self._serveur.server_address[1]
+        # Attente courte entre deux scrutations : arreter() rend la main presque aussitôt
+        self._thread = threading.Thread(target=self._serveur.serve_forever, args=(0.05,), name=type(self).__name__,
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def arreter(self):
+        if self._serveur is None:
+            return
+        self._serveur.shutdown()
+        self._serveur.server_close()
+        self._thread.join()
+        self._serveur = None
+        self._thread = None
+
+    def _connexion_ouverte(self):
+        with self._verrou:
+            self.connexions += 1
+
+    def __enter__(self):
+        return self.demarrer()
+
+    def __exit__(self, *exc):
+        self.arreter()
+
+
+class ServeurSMTPLocal(_ServeurLocal):
+    # Serveur SMTP de débogage : accepte tous les messages et les garde dans `messages`
+    # (expéditeur, destinataires, contenu) au lieu de les remettre
+    def __init__(self, hote: str = "127.0.0.1", port: int = 0):
+        super().__init__(hote, port)
+        self.messages: List[Tuple[str, List[str], bytes]] = []
+
+    def _creer_serveur(self):
+        import socketserver
+        serveur_local = self
+
+        class Session(socketserver.StreamRequestHandler):
+            # Réponses en plusieurs écritures : sans TCP_NODELAY, chacune attendrait l'accusé différé du client
+            disable_nagle_algorithm = True
+
+            def repondre(self, ligne: str):
+                self.wfile.write(ligne.encode("ascii") + b"\r\n")
+
+            def handle(self):
+                serveur_local._connexion_ouverte()
+                expediteur, destinataires = None, []
+                self.repondre("220 mpql ESMTP")
+                for ligne in self.rfile:
+                    commande = ligne.decode("ascii", "replace").strip()
+                    verbe = commande[:4].upper()
+                    if verbe == "EHLO":
+                        self.repondre("250-mpql")
+                        self.repondre("250-PIPELINING")
+                        self.repondre("250 8BITMIME")
+                    elif verbe in ("HELO", "NOOP"):
+                        self.repondre("250 OK")
+                    elif verbe == "MAIL":
+                        expediteur, destinataires = commande[10:].strip("<> "), []
+                        self.repondre("250 OK")
+                    elif verbe == "RCPT":
+                        destinataires.append(commande[8:].strip("<> "))
+                        self.repondre("250 OK")
+                    elif verbe == "DATA":
+                        self.repondre("354 Fin par <CRLF>.<CRLF>")
+                        contenu = []
+                        for donnee in self.rfile:
+                            if donnee == b".\r\n":
+                                break
+                            contenu.append(donnee[1:] if donnee.startswith(b"..") else donnee)
+                        with serveur_local._verrou:
+                            serveur_local.messages.append((expediteur, destinataires, b"".join(contenu)))
+                        self.repondre("250 OK")
+                    elif verbe == "RSET":
+                        expediteur, destinataires = None, []
+                        self.repondre("250 OK")
+                    elif verbe == "QUIT":
+                        self.repondre("221 Au revoir")
+                        return
+                    else:
+                        self.repondre("502 Commande non prise en charge")
+
+        return socketserver.ThreadingTCPServer((self.hote, self.port), Session)
+
+
+class ServeurHTTPLocal(_ServeurLocal):
+    # Faux point d'accès HTTP : garde le corps JSON de chaque POST dans `requetes` et répond
+    # `statut` (200 par défaut), après `latence` secondes pour simuler un fournisseur distant
+    def __init__(self, hote: str = "127.0.0.1", port: int = 0, statut: int = 200, latence: float = 0.0):
+        super().__init__(hote, port)
+        self.statut = statut
+        self.latence = latence
+        self.requetes: List[dict] = []
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.hote}:{self.port}/envois"
+
+    def _creer_serveur(self):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        serveur_local = self
+
+        class PointAcces(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                serveur_local._connexion_ouverte()
+
+            def do_POST(self):
+                corps = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if serveur_local.latence:
+                    time.sleep(serveur_local.latence)
+                with serveur_local._verrou:
+                    serveur_local.requetes.append(json.loads(corps))
+                reponse = b'{"ok": true}'
+                self.send_response(serveur_local.statut)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(reponse)))
+                self.end_headers()
+                self.wfile.write(reponse)
+
+            def log_message(self, *args):
+                pass
+
+        return ThreadingHTTPServer((self.hote, self.port), PointAcces)
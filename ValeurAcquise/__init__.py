@@ -0,0 +1,195 @@
+import math
+from datetime import datetime
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from Tache import Tache
+
+if TYPE_CHECKING:
+    from Projet import Projet
+
+# Part du travail d'une tâche considérée comme acquise selon son statut (règle 50/50 pour « En cours »)
+AVANCEMENT_STATUT = {"Non démarrée": 0.0, "En cours": 0.5, "Bloquée": 0.5, "Terminée": 1.0}
+
+
+def _ajouter(deltas: Dict[int, float], jour: int, valeur: float):
+    total = deltas.get(jour, 0) + valeur
+    if total:
+        deltas[jour] = total
+    else:
+        deltas.pop(jour, None)
+
+
+class ValeurAcquise:
+    # Analyse de la valeur acquise d'un projet. Le budget (BAC) est réparti entre les tâches au
+    # prorata de leur durée : les agrégats sont tenus en jours-tâche et multipliés par le budget
+    # à la lecture, si bien qu'un changement de budget ne coûte rien et qu'un changement de statut
+    # ou de dates ne touche que la tâche concernée. Les courbes en S sont des sommes préfixes sur
+    # des seaux d'un jour, recalculées seulement après une modification.
+    def __init__(self, projet: "Projet", avancements: Optional[Dict[str, float]] = None,
+                 horloge: Callable[[], datetime] = datetime.now):
+        self.projet = projet
+        self.avancements = AVANCEMENT_STATUT if avancements is None else avancements
+        self.horloge = horloge
+        self.origine = projet.date_debut
+        # Par tâche : jour de début (depuis l'origine), durée en jours, avancement pris en compte
+        self._taches: Dict[Tache, List] = {}
+        # Jours-tâche prévus au total et acquis à ce jour ; coût réel cumulé
+        self.jours_prevus = 0
+        self.jours_acquis = 0.0
+        self.cout = 0.0
+        # Variations par jour : tâches actives (+1 au début, -1 à la fin), jours-tâche acquis, coûts
+        self._actives: Dict[int, float] = {}
+        self._acquis: Dict[int, float] = {}
+        self._couts: Dict[int, float] = {}
+        self._cumuls: Optional[Tuple[int, np.ndarray, np.ndarray, np.ndarray]] = None
+        for tache in projet.taches:
+            # Travail déjà acquis : daté d'après les dates prévues de la tâche
+            self._ajouter_tache(tache, None)
+        projet.observer(self._observer)
+
+    def _jour(self, date: datetime) -> int:
+        return (date - self.origine).days
+
+    def _observer(self, nature: str, objet, detail):
+        if nature == "taches":
+            aujourd_hui = self._jour(self.horloge())
+            for tache in objet:
+                self._ajouter_tache(tache, aujourd_hui)
+        elif nature == "statut":
+            self._changer_avancement(objet)
+        elif nature == "dates":
+            self._changer_dates(objet)
+        else:
+            # Le budget est lu à chaque calcul : rien à mettre à jour
+            return
+        self._cumuls = None
+
+    def _ajouter_tache(self, tache: Tache, jour_acquis: Optional[int]):
+        if tache in self._taches:
+            return
+        debut = self._jour(tache.date_debut)
+        duree = max(0, tache.duree())
+        avancement = self.avancements.get(tache.statut, 0.0)
+        self._taches[tache] = [debut, duree, avancement]
+        self._planifier(debut, duree, 1)
+        if avancement:
+            jour = debut + int(duree * avancement) if jour_acquis is None else jour_acquis
+            self._acquerir(jour, duree * avancement)
+        self._cumuls = None
+
+    def _planifier(self, debut: int, duree: int, signe: int):
+        if duree:
+            self.jours_prevus += signe * duree
+            _ajouter(self._actives, debut, signe)
+            _ajouter(self._actives, debut + duree, -signe)
+
+    def _acquerir(self, jour: int, jours_tache: float):
+        self.jours_acquis += jours_tache
+        _ajouter(self._acquis, jour, jours_tache)
+
+    def _changer_avancement(self, tache: Tache):
+        etat = self._taches[tache]
+        _, duree, ancien = etat
+        nouveau = self.avancements.get(tache.statut, 0.0)
+        if nouveau != ancien:
+            etat[2] = nouveau
+            self._acquerir(self._jour(self.horloge()), duree * (nouveau - ancien))
+
+    def _changer_dates(self, tache: Tache):
+        etat = self._taches[tache]
+        debut, duree, avancement = etat
+        self._planifier(debut, duree, -1)
+        etat[0] = self._jour(tache.date_debut)
+        etat[1] = max(0, tache.duree())
+        self._planifier(etat[0], etat[1], 1)
+        if avancement and etat[1] != duree:
+            # La tâche a grandi ou rétréci : la part déjà acquise suit sa nouvelle durée
+            self._acquerir(self._jour(self.horloge()), (etat[1] - duree) * avancement)
+
+    def enregistrer_cout(self, montant: float, date: Optional[datetime] = None):
+        # Coût réel engagé (AC), daté du jour où il a été constaté
+        self.cout += montant
+        _ajouter(self._couts, self._jour(self.horloge() if date is None else date), montant)
+        self._cumuls = None
+
+    # --- Lecture ---
+
+    def _sommes_prefixes(self) -> Tuple[int, np.ndarray, np.ndarray, np.ndarray]:
+        # Jours-tâche prévus, jours-tâche acquis et coûts cumulés à la fin de chaque jour
+        if self._cumuls is None:
+            jours = [*self._actives, *self._acquis, *self._couts]
+            premier = min(jours, default=0)
+            n = max(jours, default=0) - premier + 1
+
+            def seaux(deltas: Dict[int, float]) -> np.ndarray:
+                tableau = np.zeros(n)
+                tableau[np.fromiter(deltas, np.int64, len(deltas)) - premier] = list(deltas.values())
+                return tableau
+
+            prevus = np.cumsum(np.cumsum(seaux(self._actives)))
+            self._cumuls = (premier, prevus, np.cumsum(seaux(self._acquis)), np.cumsum(seaux(self._couts)))
+        return self._cumuls
+
+    def _a_la_date(self, rang: int, date: Optional[datetime]) -> float:
+        premier, *cumuls = self._sommes_prefixes()
+        i = self._jour(self.horloge() if date is None else date) - premier
+        if i < 0:
+            return 0.0
+        cumul = cumuls[rang]
+        return float(cumul[min(i, len(cumul) - 1)])
+
+    def _valeur(self, jours_tache: float) -> float:
+        if not self.jours_prevus:
+            return 0.0
+        return self.projet.budget * jours_tache / self.jours_prevus
+
+    def valeur_planifiee(self, date: Optional[datetime] = None) -> float:
+        # PV : part du budget dont le travail était prévu d'être fait à la fin du jour donné
+        return self._valeur(self._a_la_date(0, date))
+
+    def valeur_acquise(self, date: Optional[datetime] = None) -> float:
+        # EV : part du budget correspondant au travail effectivement accompli
+        if date is None:
+            return self._valeur(self.jours_acquis)
+        return self._valeur(self._a_la_date(1, date))
+
+    def cout_reel(self, date: Optional[datetime] = None) -> float:
+        # AC : coûts réels enregistrés jusqu'à la fin du jour donné
+        if date is None:
+            return self.cout
+        return self._a_la_date(2, date)
+
+    def indicateurs(self, date: Optional[datetime] = None) -> Dict[str, float]:
+        # BAC, PV, EV, AC, écarts (SV, CV), indices (SPI, CPI) et estimation à terminaison (EAC)
+        date = self.horloge() if date is None else date
+        pv = self.valeur_planifiee(date)
+        ev = self.valeur_acquise(date)
+        ac = self.cout_reel(date)
+        cpi = ev / ac if ac else math.nan
+        return {"bac": self.projet.budget, "pv": pv, "ev": ev, "ac": ac, "sv": ev - pv, "cv": ev - ac,
+                "spi": ev / pv if pv else math.nan, "cpi": cpi,
+                "eac": self.projet.budget / cpi if cpi else math.nan}
+
+    def courbes_s(self, debut: Optional[datetime] = None,
+                  fin: Optional[datetime] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        # Courbes en S jour par jour : dates (datetime64[D]), PV, EV et AC cumulés à la fin de chaque jour
+        premier, prevus, acquis, couts = self._sommes_prefixes()
+        bas = premier if debut is None else self._jour(debut)
+        haut = premier + len(prevus) - 1 if fin is None else self._jour(fin)
+        if haut < bas:
+            vide = np.zeros(0)
+            return np.zeros(0, "datetime64[D]"), vide, vide, vide
+        # Avant le premier seau : rien ; après le dernier : valeurs finales
+        indices = np.clip(np.arange(bas, haut + 1) - premier, -1, len(prevus) - 1)
+        avant = indices < 0
+
+        def lire(cumul: np.ndarray) -> np.ndarray:
+            valeurs = cumul[indices]
+            valeurs[avant] = 0.0
+            return valeurs
+
+        echelle = self.projet.budget / self.jours_prevus if self.jours_prevus else 0.0
+        dates = np.datetime64(self.origine, "D") + np.arange(bas, haut + 1)
+        return dates, lire(prevus) * echelle, lire(acquis) * echelle, lire(couts)
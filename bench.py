@@ -0,0 +1,680 @@
+"""
+Bancs d'essai de performance.
+
+Utilisation : python bench.py <nom> [--taille N]
+              python bench.py suite [--taille N] [--sortie F.json] [--reference F.json] [--seuil R]
+"""
+import argparse
+import io
+import json
+import math
+import os
+import platform
+import sys
+import random
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from CalculParallele import calculer_en_parallele
+from Equipe import Equipe
+from InstantaneProjet import Instantane, sauvegarder_instantane
+from Instrumentation import HistogrammeMemoire, Instrumentation
+from Membre import Membre
+from NotificationContext import NotificationContext
+from NotificationStrategy import NotificationStrategy
+from Portefeuille import Portefeuille
+from Projet import Projet
+from PushNotificationStrategy import PushNotificationStrategy
+from SMSNotificationStrategy import SMSNotificationStrategy
+from EmailNotificationStrategy import EmailNotificationStrategy
+from TransportsNotifications import SeauJetons, ServeurHTTPLocal, ServeurSMTPLocal, TransportHTTP, TransportSMTP
+from RapportPerformance import CACHE_SECTIONS
+from Risque import Risque
+from StockageSQLite import StockageSQLite
+from Tache import Tache
+from ValeurAcquise import AVANCEMENT_STATUT
+
+
+class _TacheDict:
+    """
+    Ancienne représentation d'une tâche (dictionnaire par instance,
+    liste de dépendances toujours allouée), gardée comme référence.
+    """
+
+    def __init__(self, nom, description, date_debut, date_fin, responsable, statut):
+        self.nom = nom
+        self.description = description
+        self.date_debut = date_debut
+        self.date_fin = date_fin
+        self.responsable = responsable
+        self.statut = statut
+        self.dependances = []
+        self.ES = None
+        self.EF = None
+        self.LS = None
+        self.LF = None
+        self.marge_totale = None
+        self.marge_libre = None
+        self._projets = []
+
+
+def _octets_par_tache(classe, taille: int) -> float:
+    membre = Membre("Modou", "Chef de projet")
+    debut = datetime(2024, 1, 1)
+    fin = debut + timedelta(days=10)
+    tracemalloc.start()
+    avant = tracemalloc.get_traced_memory()[0]
+    taches = [classe("Tâche", "", debut, fin, membre, "Non démarrée") for _ in range(taille)]
+    apres = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # La liste qui retient les tâches n'est pas comptée
+    return (apres - avant - taches.__sizeof__()) / taille
+
+
+def bench_memoire(taille: int):
+    """
+    Mémoire occupée par tâche, avant et après le passage aux __slots__.
+    """
+    avant = _octets_par_tache(_TacheDict, taille)
+    apres = _octets_par_tache(Tache, taille)
+    print(f"Tâche avec dictionnaire : {avant:.0f} octets")
+    print(f"Tâche avec __slots__    : {apres:.0f} octets ({100 * (1 - apres / avant):.0f} % de moins)")
+
+
+def bench_chargement(taille: int):
+    """
+    Chargement en masse (ajouter_taches) d'une chaîne de tâches dont les dépendances et le
+    responsable sont donnés par leur nom.
+    """
+    debut = datetime(2024, 1, 1)
+    fin = debut + timedelta(days=1)
+    lot = [(f"T{i}", "", debut, fin, "Modou", "Non démarrée", [f"T{i - 1}"] if i else []) for i in range(taille)]
+
+    def projet_vide():
+        projet = Projet("Chargement", "", debut, datetime(2026, 12, 31), 0)
+        projet.ajouter_membre_equipe(Membre("Modou", "Chef de projet"))
+        return projet
+
+    duree = _meilleur_temps(projet_vide, lambda projet: projet.ajouter_taches(lot), 3)
+    print(f"{taille} tâches : {duree * 1e3:8.1f} ms   {taille / duree:12,.0f} tâches/s")
+
+
+def bench_colonnes(taille: int):
+    """
+    Projet rangé en colonnes (stocker_en_colonnes) contre tâches objets : mémoire retenue une fois le
+    chemin critique calculé, tâches en retard d'un membre et chemin critique.
+    """
+    reference = datetime(2024, 2, 1)
+    for mode in ("objets", "colonnes"):
+        tracemalloc.start()
+        avant = tracemalloc.get_traced_memory()[0]
+        projet = _projet_rempli(generer_couches(taille))
+        if mode == "colonnes":
+            projet.stocker_en_colonnes()
+        projet.calculer_chemin_critique()
+        octets = (tracemalloc.get_traced_memory()[0] - avant) / taille
+        tracemalloc.stop()
+        membre = projet.taches[0].responsable
+        if mode == "objets":
+            retard = _chronometrer(lambda: [t for t in projet.taches if t.responsable is membre
+                                            and t.date_fin < reference and t.statut != "Terminée"], 5)
+        else:
+            retard = _chronometrer(lambda: projet.magasin.taches_en_retard(membre, reference), 5)
+        cpm = _chronometrer(projet.calculer_chemin_critique, 3)
+        print(f"{mode:9} {octets:7.0f} octets/tâche   en retard {retard * 1e3:8.2f} ms   "
+              f"chemin critique {cpm * 1e3:9.2f} ms")
+
+
+def _chronometrer(fonction, repetitions: int) -> float:
+    debut = time.perf_counter()
+    for _ in range(repetitions):
+        fonction()
+    return (time.perf_counter() - debut) / repetitions
+
+
+def bench_index(taille: int):
+    """
+    Recherches indexées comparées à un parcours complet de Projet.taches.
+    """
+    generateur = random.Random(0)
+    membres = [Membre(f"Membre {i}", "Développeur") for i in range(50)]
+    statuts = ["Non démarrée", "En cours", "Terminée", "Bloquée"]
+    projet = Projet("Index", "", datetime(2024, 1, 1), datetime(2026, 12, 31), 0)
+    for i in range(taille):
+        debut = datetime(2024, 1, 1) + timedelta(days=generateur.randrange(1000))
+        projet.ajouter_tache(Tache(f"T{i}", "", debut, debut + timedelta(days=generateur.randrange(30)),
+                                   generateur.choice(membres), generateur.choice(statuts)))
+    membre = membres[0]
+    debut, fin = datetime(2025, 3, 1), datetime(2025, 3, 31)
+    projet.rechercher_taches(debut=debut, fin=fin)  # construction de l'arbre d'intervalles
+
+    requetes = {
+        "statut + responsable": (
+            lambda: [t for t in projet.taches if t.statut == "Bloquée" and t.responsable is membre],
+            lambda: projet.rechercher_taches(statut="Bloquée", responsable=membre)),
+        "période (mars 2025)": (
+            lambda: [t for t in projet.taches if t.date_debut <= fin and t.date_fin >= debut],
+            lambda: projet.rechercher_taches(debut=debut, fin=fin)),
+    }
+    for nom, (parcours, index) in requetes.items():
+        duree_parcours = _chronometrer(parcours, 10)
+        duree_index = _chronometrer(index, 10)
+        print(f"{nom:22} parcours {duree_parcours * 1e3:8.2f} ms   index {duree_index * 1e3:8.3f} ms"
+              f"   x{duree_parcours / duree_index:.0f}")
+
+
+def bench_stockage(taille: int):
+    """
+    Débit de sauvegarde et de chargement : en mémoire (instantané binaire) et dans SQLite.
+    """
+    membre = Membre("Modou", "Chef de projet")
+    projet = Projet("Stockage", "", datetime(2024, 1, 1), datetime(2026, 12, 31), 0)
+    projet.ajouter_membre_equipe(membre)
+    debut = datetime(2024, 1, 1)
+    projet.ajouter_taches((f"T{i}", "", debut, debut + timedelta(days=i % 20), membre, "Non démarrée",
+                           [f"T{i - 1}"] if i % 50 else []) for i in range(taille))
+    projet.calculer_chemin_critique()
+
+    def afficher(nom: str, duree: float):
+        print(f"{nom:32} {duree * 1e3:9.1f} ms   {taille / duree:12,.0f} tâches/s")
+
+    flux = io.BytesIO()
+    afficher("mémoire : sauvegarde", _chronometrer(lambda: sauvegarder_instantane(projet, flux), 1))
+    afficher("mémoire : chargement", _chronometrer(lambda: Instantane.depuis_octets(flux.getvalue()).projet(), 1))
+    with tempfile.TemporaryDirectory() as dossier, StockageSQLite(os.path.join(dossier, "bench.db")) as stockage:
+        identifiant = stockage.sauvegarder(projet)
+        afficher("sqlite : sauvegarde", _chronometrer(lambda: stockage.sauvegarder(projet, identifiant), 1))
+        afficher("sqlite : ouverture (paresseuse)", _chronometrer(lambda: stockage.charger(identifiant), 1))
+        afficher("sqlite : chargement des tâches", _chronometrer(lambda: stockage.charger(identifiant).taches, 1))
+
+
+def bench_portefeuille(taille: int):
+    """
+    Nivellement des ressources d'un portefeuille de projets de 100 tâches.
+    """
+    generateur = random.Random(0)
+    membres = [Membre(f"Membre {i}", "Développeur") for i in range(max(1, taille // 300))]
+    portefeuille = Portefeuille()
+    for p in range(max(1, taille // 100)):
+        projet = Projet(f"Projet {p}", "", datetime(2024, 1, 1) + timedelta(days=generateur.randrange(200)),
+                        datetime(2026, 12, 31), 0)
+        projet.equipe.ajouter_membres(membres)
+        debut = datetime(2024, 1, 1)
+        projet.ajouter_taches((f"T{i}", "", debut, debut + timedelta(days=generateur.randrange(10)),
+                               generateur.choice(membres), "Non démarrée",
+                               [f"T{j}" for j in generateur.sample(range(i), min(i, 2))]) for i in range(100))
+        portefeuille.ajouter_projet(projet)
+    debut = time.perf_counter()
+    planning = portefeuille.niveler()
+    duree = time.perf_counter() - debut
+    utilisation = sum(planning.utilisation(membre) for membre in membres) / len(membres)
+    print(f"{len(portefeuille.projets)} projets, {taille} tâches, {len(membres)} membres : "
+          f"{duree * 1e3:.0f} ms, utilisation moyenne {100 * utilisation:.0f} %")
+
+
+def _projets_independants(nombre: int, taches: int) -> list:
+    generateur = random.Random(0)
+    membre = Membre("Modou", "Chef de projet")
+    projets = []
+    for p in range(nombre):
+        projet = Projet(f"Projet {p}", "", datetime(2024, 1, 1), datetime(2026, 12, 31), 0)
+        projet.ajouter_membre_equipe(membre)
+        debut = datetime(2024, 1, 1)
+        projet.ajouter_taches((f"T{i}", "", debut, debut + timedelta(days=generateur.randrange(10)), membre,
+                               "Non démarrée", [f"T{j}" for j in generateur.sample(range(i), min(i, 2))])
+                              for i in range(taches))
+        projets.append(projet)
+    return projets
+
+
+def bench_parallele(taille: int):
+    """
+    Chemins critiques et rapports de projets de 200 tâches : séquentiel, puis de 1 à N processus.
+    """
+    nombre = max(1, taille // 200)
+    projets = _projets_independants(nombre, 200)
+
+    def sequentiel():
+        for projet in projets:
+            projet.calculer_chemin_critique()
+            projet.generer_rapport_performance()
+
+    reference = _chronometrer(sequentiel, 1)
+    print(f"{nombre} projets, séquentiel : {reference * 1e3:8.0f} ms")
+    coeurs = os.cpu_count() or 1
+    processus = sorted({1, coeurs} | {2 ** k for k in range(1, coeurs.bit_length()) if 2 ** k < coeurs})
+    for n in processus:
+        duree = _chronometrer(lambda: calculer_en_parallele(projets, processus=n), 1)
+        print(f"{n:3} processus           : {duree * 1e3:8.0f} ms   x{reference / duree:.1f}")
+
+
+def bench_valeur_acquise(taille: int):
+    """
+    Tableau de bord de projets de 100 tâches : quelques statuts changent, puis les indicateurs
+    et les courbes en S de tous les projets sont relus ; comparé à un recalcul complet.
+    """
+    nombre = max(1, taille // 100)
+    projets = _projets_independants(nombre, 100)
+    for projet in projets:
+        projet.definir_budget(100_000)
+    suivis = [projet.suivre_valeur_acquise(horloge=lambda: datetime(2024, 1, 5)) for projet in projets]
+    generateur = random.Random(0)
+    date = datetime(2024, 1, 5)
+
+    def modifier():
+        for projet in generateur.sample(projets, max(1, nombre // 10)):
+            generateur.choice(projet.taches).mettre_a_jour_statut(generateur.choice(["En cours", "Terminée"]))
+
+    def tableau_de_bord():
+        for suivi in suivis:
+            suivi.indicateurs(date)
+            suivi.courbes_s()
+
+    def recalcul_complet():
+        # Ce que fait un export horaire : tout relire pour chaque projet
+        for projet in projets:
+            total = sum(tache.duree() for tache in projet.taches)
+            prevu = sum(min(max((date - tache.date_debut).days + 1, 0), tache.duree()) for tache in projet.taches)
+            acquis = sum(tache.duree() * AVANCEMENT_STATUT.get(tache.statut, 0) for tache in projet.taches)
+            if total:
+                projet.budget * prevu / total, projet.budget * acquis / total
+
+    modifier()
+    tableau_de_bord()
+    incremental = _chronometrer(lambda: (modifier(), tableau_de_bord()), 5)
+    complet = _chronometrer(recalcul_complet, 5)
+    print(f"{nombre} projets, tableau de bord incrémental : {incremental * 1e3:8.2f} ms")
+    print(f"{nombre} projets, recalcul complet (sans courbes) : {complet * 1e3:8.2f} ms")
+
+
+def bench_cache_rapport(taille: int):
+    """
+    Rapports régénérés après l'ajout d'un risque : cache des sections vidé à chaque fois, puis conservé.
+    """
+    projet = _projet_rempli(generer_couches(taille))
+    projet.calculer_chemin_critique()
+
+    def regenerer(vider: bool):
+        for i in range(10):
+            if vider:
+                CACHE_SECTIONS.vider()
+            projet.ajouter_risque(Risque(f"Risque {i}", 0.1, "Faible"))
+            projet.generer_rapport_performance()
+
+    sans_cache = _chronometrer(lambda: regenerer(True), 1)
+    CACHE_SECTIONS.vider()
+    projet.generer_rapport_performance()
+    avec_cache = _chronometrer(lambda: regenerer(False), 1)
+    print(f"sans cache : {sans_cache * 100:8.2f} ms par rapport")
+    print(f"avec cache : {avec_cache * 100:8.2f} ms par rapport   x{sans_cache / avec_cache:.0f}   "
+          f"{CACHE_SECTIONS.statistiques()}")
+
+
+def bench_equipe(taille: int):
+    """
+    Import d'une équipe avec doublons, recherches par nom puis retrait de la moitié des membres :
+    liste simple (ancienne Equipe) contre équipe indexée.
+    """
+    taille = min(taille, 20_000)
+    membres = [Membre(f"Membre {i}", f"Rôle {i % 20}") for i in range(taille)]
+    arrivees = membres + membres[::2]
+    random.Random(0).shuffle(arrivees)
+
+    def liste():
+        equipe = []
+        for membre in arrivees:
+            if membre not in equipe:
+                equipe.append(membre)
+        for membre in membres:
+            next(m for m in equipe if m.nom == membre.nom)
+        for membre in membres[::2]:
+            equipe.remove(membre)
+
+    def indexee():
+        equipe = Equipe()
+        equipe.ajouter_membres(arrivees)
+        for membre in membres:
+            equipe.trouver(membre.nom)
+        for membre in membres[::2]:
+            equipe.retirer_membre(membre)
+
+    reference = _chronometrer(liste, 1)
+    duree = _chronometrer(indexee, 1)
+    print(f"{taille} membres, liste    : {reference * 1e3:10.1f} ms")
+    print(f"{taille} membres, indexée  : {duree * 1e3:10.1f} ms   x{reference / duree:.0f}")
+
+
+def bench_abonnements(taille: int):
+    """
+    Événements d'un projet dont l'équipe compte `taille` membres : diffusion à toute l'équipe,
+    puis routage par sujet (1 % d'abonnés au budget, chacun suit ses propres tâches).
+    """
+    taille = min(taille, 10_000)
+    membres = [Membre(f"Membre {i}", "Développeur") for i in range(taille)]
+    generateur = random.Random(0)
+    debut = datetime(2024, 1, 1)
+
+    def scenario(routage: bool):
+        strategie = _StrategieComptage()
+        projet = Projet("Routage", "", debut, datetime(2024, 12, 31), 0)
+        projet.ajouter_membres_equipe(membres)
+        if routage:
+            for i, membre in enumerate(membres):
+                projet.abonner(membre, "mes_taches", *(("budget",) if i % 100 == 0 else ()))
+        projet.set_notification_strategy(strategie)
+        depart = time.perf_counter()
+        for i in range(200):
+            projet.ajouter_tache(Tache(f"T{i}", "", debut, debut + timedelta(days=3), generateur.choice(membres),
+                                       "Non démarrée"))
+            if i % 4 == 0:
+                projet.definir_budget(i)
+        return time.perf_counter() - depart, strategie.envois
+
+    for nom, routage in (("diffusion", False), ("abonnements", True)):
+        duree, envois = scenario(routage)
+        print(f"{nom:12} {envois:>10} envois   {duree * 1e3:9.1f} ms")
+
+
+def bench_transports(taille: int):
+    """
+    Messages par seconde de chaque canal vers les serveurs locaux : une connexion par message,
+    connexion réutilisée message par message, lots, puis lots sous un débit limité à 2000 messages/s.
+    """
+    taille = min(taille, 5_000)
+    membres = [Membre(f"membre{i}", "Développeur") for i in range(taille)]
+    with ServeurSMTPLocal() as smtp, ServeurHTTPLocal() as http:
+        canaux = {
+            "email": (EmailNotificationStrategy, lambda **options: TransportSMTP("127.0.0.1", smtp.port, **options)),
+            "sms": (SMSNotificationStrategy, lambda **options: TransportHTTP(http.url, **options)),
+            "push": (PushNotificationStrategy, lambda **options: TransportHTTP(http.url, **options)),
+        }
+        for canal, (classe, transport) in canaux.items():
+            # Une connexion par message : coûteux, mesuré sur un échantillon
+            echantillon = membres[:200]
+            depart = time.perf_counter()
+            for membre in echantillon:
+                with transport() as ouvert:
+                    classe(ouvert).envoyer("Bonjour", membre)
+            debits = {"connexion/msg": len(echantillon) / (time.perf_counter() - depart)}
+            for mode, options in (("reutilisee", {}), ("lot", {}), ("lot limite", {"limiteur": SeauJetons(2000, 200)})):
+                with transport(**options) as ouvert:
+                    strategie = classe(ouvert)
+                    depart = time.perf_counter()
+                    if mode == "reutilisee":
+                        for membre in membres:
+                            strategie.envoyer("Bonjour", membre)
+                    else:
+                        strategie.envoyer_lot("Bonjour", membres)
+                    debits[mode] = len(membres) / (time.perf_counter() - depart)
+            print(f"{canal:6} " + "   ".join(f"{mode} {debit:>10,.0f} msg/s" for mode, debit in debits.items()))
+
+
+# Code exécuté dans un interpréteur neuf : durée de l'import et modules chargés
+_MESURE_IMPORT = """
+import sys, time
+avant = set(sys.modules)
+debut = time.perf_counter()
+{}
+duree = time.perf_counter() - debut
+charges = set(sys.modules) - avant
+print(duree, len(charges), int("numpy" in charges), int("MoteurCheminCritique" in charges))
+"""
+
+
+def mesurer_import(instruction: str, repetitions: int = 5) -> tuple:
+    # Meilleure durée d'import (secondes) dans un interpréteur neuf, nombre de modules chargés,
+    # et si NumPy ou le moteur de chemin critique l'ont été
+    meilleur = None
+    for _ in range(repetitions):
+        sortie = subprocess.run([sys.executable, "-c", _MESURE_IMPORT.format(instruction)], check=True,
+                                capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+        duree, modules, numpy, moteur = sortie.stdout.split()
+        if meilleur is None or float(duree) < meilleur[0]:
+            meilleur = (float(duree), int(modules), numpy == "1", moteur == "1")
+    return meilleur
+
+
+def bench_import(taille: int):
+    """
+    Durée d'import dans un interpréteur neuf : classes de notification seules, projet, tout le paquet.
+    """
+    repetitions = max(1, min(10, taille // 10_000))
+    cas = {
+        "notifications": "from mpql import NotificationContext, EmailNotificationStrategy",
+        "projet": "from mpql import Projet",
+        "tout": "import mpql; [getattr(mpql, nom) for nom in mpql.__all__]",
+    }
+    for nom, instruction in cas.items():
+        duree, modules, numpy, moteur = mesurer_import(instruction, repetitions)
+        print(f"{nom:14} {duree * 1e3:8.1f} ms   {modules:4} modules   NumPy : {'oui' if numpy else 'non'}   "
+              f"chemin critique : {'oui' if moteur else 'non'}")
+
+
+def generer_chaine(taille: int, graine: int = 0) -> list:
+    # Chaîne : chaque tâche dépend de la précédente
+    return _generer(taille, graine, lambda i, generateur: [i - 1] if i else [])
+
+
+def generer_eventail(taille: int, graine: int = 0) -> list:
+    # Éventail : une source, taille - 2 tâches parallèles qui en dépendent, un puits qui les attend toutes
+    def dependances(i, generateur):
+        if i == 0:
+            return []
+        if i == taille - 1:
+            return list(range(1, taille - 1)) or [0]
+        return [0]
+    return _generer(taille, graine, dependances)
+
+
+def generer_couches(taille: int, graine: int = 0) -> list:
+    # DAG aléatoire en couches d'environ √taille tâches, chacune dépendant de 1 à 3 tâches de la couche précédente
+    largeur = max(1, math.isqrt(taille))
+
+    def dependances(i, generateur):
+        couche = i // largeur
+        if couche == 0:
+            return []
+        precedente = range((couche - 1) * largeur, couche * largeur)
+        return generateur.sample(precedente, min(len(precedente), generateur.randint(1, 3)))
+    return _generer(taille, graine, dependances)
+
+
+def _generer(taille: int, graine: int, dependances) -> list:
+    # Tâches toutes neuves (non rattachées), dépendances déjà posées, dans un ordre topologique
+    generateur = random.Random(graine)
+    membres = [Membre(f"Membre {i}", "Développeur") for i in range(20)]
+    debut = datetime(2024, 1, 1)
+    taches = []
+    for i in range(taille):
+        tache = Tache(f"T{i}", "", debut, debut + timedelta(days=generateur.randint(1, 10)),
+                      generateur.choice(membres), "Non démarrée")
+        deps = dependances(i, generateur)
+        if deps:
+            tache.dependances = [taches[j] for j in deps]
+        taches.append(tache)
+    return taches
+
+
+GENERATEURS = {
+    "chaine": generer_chaine,
+    "eventail": generer_eventail,
+    "couches": generer_couches,
+}
+
+
+class _StrategieComptage(NotificationStrategy):
+    def __init__(self):
+        self.envois = 0
+
+    def envoyer(self, message: str, destinataire: Membre):
+        self.envois += 1
+
+
+def _meilleur_temps(preparer, mesurer, repetitions: int) -> float:
+    # Meilleur temps sur plusieurs répétitions ; la préparation n'est pas chronométrée
+    meilleur = math.inf
+    for _ in range(repetitions):
+        entree = preparer()
+        debut = time.perf_counter()
+        mesurer(entree)
+        meilleur = min(meilleur, time.perf_counter() - debut)
+    return meilleur
+
+
+def _projet_rempli(taches: list) -> Projet:
+    projet = Projet("Suite", "", datetime(2024, 1, 1), datetime(2030, 12, 31), 0)
+    for tache in taches:
+        projet.ajouter_tache(tache)
+    return projet
+
+
+def bench_instrumentation(taille: int):
+    """
+    Coût de l'instrumentation : ajout des tâches, chemin critique et rapport, désactivée puis activée.
+    """
+    def scenario():
+        projet = _projet_rempli(generer_couches(taille))
+        projet.calculer_chemin_critique()
+        projet.generer_rapport_performance()
+
+    inactive = _meilleur_temps(lambda: None, lambda _: scenario(), 3)
+    memoire = HistogrammeMemoire()
+    with Instrumentation([memoire]):
+        active = _meilleur_temps(lambda: None, lambda _: scenario(), 3)
+    print(f"désactivée : {inactive * 1e3:8.1f} ms")
+    print(f"activée    : {active * 1e3:8.1f} ms   (+{(active / inactive - 1) * 100:.1f} %)")
+    for resume in memoire.resumes():
+        etiquettes = ",".join(f"{cle}={valeur}" for cle, valeur in resume["etiquettes"].items())
+        print(f"  {resume['nom']:20} {etiquettes:26} n={resume['nombre']:<8} "
+              f"p50={resume['p50'] * 1e6:9.1f} µs   p99={resume['p99'] * 1e6:9.1f} µs")
+
+
+def mesurer_suite(tailles: list) -> list:
+    # Chronomètre les chemins chauds sur chaque famille de graphes et chaque taille
+    resultats = []
+
+    def noter(mesure: str, graphe: str, taille: int, secondes: float):
+        resultats.append({"mesure": mesure, "graphe": graphe, "taille": taille, "secondes": secondes,
+                          "ns_par_element": secondes * 1e9 / taille})
+        print(f"{mesure:16} {graphe:9} {taille:>9}   {secondes * 1e3:10.2f} ms   "
+              f"{secondes * 1e9 / taille:9.0f} ns/élément")
+
+    for taille in tailles:
+        repetitions = 3 if taille <= 10_000 else 1
+        for graphe, generer in GENERATEURS.items():
+            noter("ajouter_tache", graphe, taille, _meilleur_temps(
+                lambda: generer(taille), _projet_rempli, repetitions))
+            noter("chemin_critique", graphe, taille, _meilleur_temps(
+                lambda: _projet_rempli(generer(taille)), Projet.calculer_chemin_critique, repetitions))
+            projet = _projet_rempli(generer(taille))
+            projet.calculer_chemin_critique()
+
+            def sans_cache():
+                # Sections invalidées avant chaque répétition : le rendu complet est mesuré
+                CACHE_SECTIONS.invalider(projet)
+                return projet
+
+            noter("rapport", graphe, taille, _meilleur_temps(
+                sans_cache, Projet.generer_rapport_performance, repetitions))
+            projet.generer_rapport_performance()
+            noter("rapport_cache", graphe, taille, _meilleur_temps(
+                lambda: projet, Projet.generer_rapport_performance, repetitions))
+        membres = [Membre(f"Membre {i}", "Développeur") for i in range(taille)]
+        contexte = NotificationContext(_StrategieComptage())
+        noter("notifier", "equipe", taille, _meilleur_temps(
+            lambda: membres, lambda destinataires: contexte.notifier("Message", destinataires), repetitions))
+    return resultats
+
+
+def comparer(resultats: list, reference: list, seuil: float) -> list:
+    # Mesures plus lentes que la référence d'un facteur supérieur au seuil
+    anciens = {(r["mesure"], r["graphe"], r["taille"]): r["secondes"] for r in reference}
+    regressions = []
+    for resultat in resultats:
+        ancien = anciens.get((resultat["mesure"], resultat["graphe"], resultat["taille"]))
+        if ancien and resultat["secondes"] / ancien > seuil:
+            regressions.append(dict(resultat, reference=ancien, facteur=resultat["secondes"] / ancien))
+    return regressions
+
+
+def pentes(resultats: list) -> dict:
+    # Exposant de complexité observé entre les deux plus grandes tailles de chaque mesure
+    series = {}
+    for resultat in resultats:
+        series.setdefault((resultat["mesure"], resultat["graphe"]), []).append(resultat)
+    exposants = {}
+    for cle, serie in series.items():
+        serie.sort(key=lambda r: r["taille"])
+        if len(serie) >= 2 and serie[-2]["secondes"] > 0:
+            petit, grand = serie[-2], serie[-1]
+            exposants[cle] = (math.log(grand["secondes"] / petit["secondes"])
+                              / math.log(grand["taille"] / petit["taille"]))
+    return exposants
+
+
+def bench_suite(taille: int, sortie: str = None, reference: str = None, seuil: float = 1.5,
+                pente_max: float = None) -> int:
+    """
+    Suite complète, de 100 tâches jusqu'à `taille` : résultats JSON, échec en cas de régression.
+    """
+    tailles = [10 ** k for k in range(2, 7) if 10 ** k <= taille] or [taille]
+    resultats = mesurer_suite(tailles)
+    echecs = []
+    if reference:
+        with open(reference, encoding="utf-8") as fichier:
+            for regression in comparer(resultats, json.load(fichier)["resultats"], seuil):
+                echecs.append(f"{regression['mesure']} / {regression['graphe']} / {regression['taille']} : "
+                              f"x{regression['facteur']:.2f} par rapport à la référence")
+    exposants = pentes(resultats)
+    if pente_max is not None:
+        for (mesure, graphe), exposant in exposants.items():
+            if exposant > pente_max:
+                echecs.append(f"{mesure} / {graphe} : complexité observée n^{exposant:.2f}")
+    if sortie:
+        with open(sortie, "w", encoding="utf-8") as fichier:
+            json.dump({"python": platform.python_version(), "machine": platform.machine(),
+                       "date": datetime.now().isoformat(timespec="seconds"), "resultats": resultats,
+                       "exposants": {f"{m}/{g}": e for (m, g), e in exposants.items()}},
+                      fichier, ensure_ascii=False, indent=1)
+    for echec in echecs:
+        print(f"RÉGRESSION {echec}")
+    return 1 if echecs else 0
+
+
+BANCS = {
+    "abonnements": bench_abonnements,
+    "cache_rapport": bench_cache_rapport,
+    "chargement": bench_chargement,
+    "colonnes": bench_colonnes,
+    "equipe": bench_equipe,
+    "import": bench_import,
+    "index": bench_index,
+    "instrumentation": bench_instrumentation,
+    "memoire": bench_memoire,
+    "parallele": bench_parallele,
+    "portefeuille": bench_portefeuille,
+    "stockage": bench_stockage,
+    "suite": bench_suite,
+    "transports": bench_transports,
+    "valeur_acquise": bench_valeur_acquise,
+}
+
+
+if __name__ == "__main__":
+    analyseur = argparse.ArgumentParser(description="Bancs d'essai de performance")
+    analyseur.add_argument("nom", choices=sorted(BANCS))
+    analyseur.add_argument("--taille", type=int, default=100_000)
+    analyseur.add_argument("--sortie", help="suite : fichier JSON des résultats")
+    analyseur.add_argument("--reference", help="suite : résultats JSON d'une exécution précédente")
+    analyseur.add_argument("--seuil", type=float, default=1.5,
+                           help="suite : ralentissement toléré par rapport à la référence")
+    analyseur.add_argument("--pente-max", type=float,
+                           help="suite : exposant de complexité maximal entre les deux plus grandes tailles")
+    arguments = analyseur.parse_args()
+    if arguments.nom == "suite":
+        sys.exit(bench_suite(arguments.taille, arguments.sortie, arguments.reference, arguments.seuil,
+                             arguments.pente_max))
+    BANCS[arguments.nom](arguments.taille)
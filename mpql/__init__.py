@@ -0,0 +1,98 @@
+"""
+Point d'entrée unique du projet MPQL.
+
+Les classes sont importées à la demande (``__getattr__`` de module) : ``from mpql import
+NotificationContext`` ne charge ni le chemin critique, ni NumPy, ni le stockage.
+"""
+import importlib
+from typing import TYPE_CHECKING
+
+# Nom exporté -> paquet qui le définit
+_EXPORTS = {
+    "Membre": "Membre",
+    "Equipe": "Equipe",
+    "Tache": "Tache",
+    "Jalon": "Jalon",
+    "Risque": "Risque",
+    "Changement": "Changement",
+    "Projet": "Projet",
+    "NotificationStrategy": "NotificationStrategy",
+    "ErreurTransport": "NotificationStrategy",
+    "EmailNotificationStrategy": "EmailNotificationStrategy",
+    "SMSNotificationStrategy": "SMSNotificationStrategy",
+    "PushNotificationStrategy": "PushNotificationStrategy",
+    "NotificationContext": "NotificationContext",
+    "AbonnementsNotifications": "AbonnementsNotifications",
+    "RegroupeurNotifications": "RegroupeurNotifications",
+    "SeauJetons": "TransportsNotifications",
+    "TransportSMTP": "TransportsNotifications",
+    "TransportHTTP": "TransportsNotifications",
+    "ServeurSMTPLocal": "TransportsNotifications",
+    "ServeurHTTPLocal": "TransportsNotifications",
+    "DispatcheurNotifications": "DispatcheurNotifications",
+    "NotificationContextAsynchrone": "DispatcheurNotifications",
+    "MoteurCheminCritique": "MoteurCheminCritique",
+    "CycleDependancesError": "MoteurCheminCritique",
+    "ordonnancer_projets": "OrdonnanceurLot",
+    "RapportPerformance": "RapportPerformance",
+    "CACHE_SECTIONS": "RapportPerformance",
+    "SimulationMonteCarlo": "SimulationMonteCarlo",
+    "MagasinTaches": "MagasinTaches",
+    "sauvegarder_instantane": "InstantaneProjet",
+    "charger_instantane": "InstantaneProjet",
+    "Instantane": "InstantaneProjet",
+    "JournalChangements": "JournalChangements",
+    "StockageSQLite": "StockageSQLite",
+    "Portefeuille": "Portefeuille",
+    "calculer_en_parallele": "CalculParallele",
+    "Instrumentation": "Instrumentation",
+    "ValeurAcquise": "ValeurAcquise",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(nom: str):
+    module = _EXPORTS.get(nom)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {nom!r}")
+    valeur = getattr(importlib.import_module(module), nom)
+    # Les accès suivants ne repassent plus par __getattr__
+    globals()[nom] = valeur
+    return valeur
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
+
+
+if TYPE_CHECKING:
+    from AbonnementsNotifications import AbonnementsNotifications
+    from CalculParallele import calculer_en_parallele
+    from Changement import Changement
+    from DispatcheurNotifications import DispatcheurNotifications, NotificationContextAsynchrone
+    from EmailNotificationStrategy import EmailNotificationStrategy
+    from Equipe import Equipe
+    from InstantaneProjet import Instantane, charger_instantane, sauvegarder_instantane
+    from Instrumentation import Instrumentation
+    from Jalon import Jalon
+    from JournalChangements import JournalChangements
+    from MagasinTaches import MagasinTaches
+    from Membre import Membre
+    from MoteurCheminCritique import CycleDependancesError, MoteurCheminCritique
+    from NotificationContext import NotificationContext
+    from NotificationStrategy import ErreurTransport, NotificationStrategy
+    from OrdonnanceurLot import ordonnancer_projets
+    from Portefeuille import Portefeuille
+    from Projet import Projet
+    from PushNotificationStrategy import PushNotificationStrategy
+    from RapportPerformance import CACHE_SECTIONS, RapportPerformance
+    from RegroupeurNotifications import RegroupeurNotifications
+    from Risque import Risque
+    from SimulationMonteCarlo import SimulationMonteCarlo
+    from SMSNotificationStrategy import SMSNotificationStrategy
+    from StockageSQLite import StockageSQLite
+    from Tache import Tache
+    from TransportsNotifications import (SeauJetons, ServeurHTTPLocal, ServeurSMTPLocal, TransportHTTP,
+                                         TransportSMTP)
+    from ValeurAcquise import ValeurAcquise
@@ -5,14 +5,48 @@ Ce module contient des tests pour vérifier le bon
 fonctionnement de la classe Projet et ses interactions
 avec d'autres classes telles que Membre, Tache, Risque, et Jalon.
 """
+import contextlib
+import csv
+import gc
+import io
+import json
+import os
+import pickle
+import random
+import socket
+import sqlite3
+import tempfile
+import threading
+import time
 import unittest
-from datetime import datetime
+import weakref
+from datetime import datetime, timedelta
 
+from InstantaneProjet import Instantane, charger_instantane, sauvegarder_instantane
+from Instrumentation import HistogrammeMemoire, Instrumentation, JournalJSON, instrumentation_courante
+import bench
+from CalculParallele import calculer_en_parallele
+from DispatcheurNotifications import (DispatcheurNotifications, NotificationContextAsynchrone,
+                                      TransportFactice)
 from Jalon import Jalon
+from JournalChangements import JournalChangements
+from MagasinTaches import MagasinTaches
 from Membre import Membre
+from MoteurCheminCritique import CycleDependancesError
+from NotificationContext import NotificationContext
+from NotificationStrategy import ErreurTransport
+from OrdonnanceurLot import ordonnancer_projets
+from Portefeuille import Portefeuille
 from Projet import Projet
+from RapportPerformance import CACHE_SECTIONS, RapportPerformance
 from Risque import Risque
+from StockageSQLite import StockageSQLite
+from SimulationMonteCarlo import SimulationMonteCarlo, intensite_impact
 from Tache import Tache
+from EmailNotificationStrategy import EmailNotificationStrategy
+from PushNotificationStrategy import PushNotificationStrategy
+from TransportsNotifications import (SeauJetons, ServeurHTTPLocal, ServeurSMTPLocal, Transport, TransportHTTP,
+                                     TransportSMTP)
 
 
 class TestProjetMethods(unittest.TestCase):
@@ -130,6 +164,1853 @@ class TestProjetMethods(unittest.TestCase):
         self.assertIn("Retard de livraison", rapport)
         self.assertIn("Chemin Critique:", rapport)
 
+    def test_ecrire_rapport_texte(self):
+        """
+        Le rapport écrit dans un flux est identique au rapport généré
+        """
+        flux = io.StringIO()
+        self.projet.ecrire_rapport_performance(flux)
+        self.assertEqual(flux.getvalue(), self.projet.generer_rapport_performance())
+
+    def test_ecrire_rapport_csv_jsonl(self):
+        """
+        Sorties CSV et JSON Lines du rapport
+        """
+        flux = io.StringIO()
+        self.projet.ecrire_rapport_performance(flux, "csv")
+        flux.seek(0)
+        lignes = list(csv.DictReader(flux))
+        taches = [ligne for ligne in lignes if ligne["section"] == "taches"]
+        self.assertEqual([ligne["nom"] for ligne in taches], ["Analyse des besoins", "Développement"])
+        self.assertEqual(taches[1]["responsable"], "Christian")
+
+        flux = io.StringIO()
+        self.projet.ecrire_rapport_performance(flux, "jsonl")
+        enregistrements = [json.loads(ligne) for ligne in flux.getvalue().splitlines()]
+        self.assertEqual(enregistrements[0]["nom"], "Nouveau Produit")
+        self.assertIn({"section": "risques", "description": "Retard de livraison",
+                       "probabilite": 0.3, "impact": "Élevé"}, enregistrements)
+        with self.assertRaises(ValueError):
+            self.projet.ecrire_rapport_performance(io.StringIO(), "xml")
+
+
+class TestCheminCritique(unittest.TestCase):
+    """
+    Calcul du chemin critique et des marges.
+    """
+
+    def setUp(self):
+        self.membre = Membre("Modou", "Chef de projet")
+        self.projet = Projet("Planning", "Projet de planification",
+                             datetime(2024, 1, 1), datetime(2024, 12, 31), 1000)
+        self.a = Tache("A", "", datetime(2024, 1, 1), datetime(2024, 1, 11), self.membre, "Non démarrée")
+        self.b = Tache("B", "", datetime(2024, 1, 1), datetime(2024, 1, 21), self.membre, "Non démarrée")
+        self.c = Tache("C", "", datetime(2024, 1, 1), datetime(2024, 1, 6), self.membre, "Non démarrée")
+        self.d = Tache("D", "", datetime(2024, 1, 1), datetime(2024, 1, 3), self.membre, "Non démarrée")
+        self.b.ajouter_dependance(self.a)
+        self.c.ajouter_dependance(self.a)
+        self.d.ajouter_dependance(self.c)
+        for tache in (self.a, self.b, self.c, self.d):
+            self.projet.ajouter_tache(tache)
+
+    def test_chemin_critique(self):
+        """
+        Seules les tâches sans marge sont critiques
+        """
+        self.projet.calculer_chemin_critique()
+        self.assertEqual(self.projet.chemin_critique, [self.a, self.b])
+        self.assertEqual(self.b.EF, datetime(2024, 1, 31))
+
+    def test_marges(self):
+        """
+        Marges totale et libre en jours
+        """
+        self.projet.calculer_chemin_critique()
+        self.assertEqual(self.a.marge_totale, 0)
+        self.assertEqual(self.c.marge_totale, 13)
+        self.assertEqual(self.c.marge_libre, 0)
+        self.assertEqual(self.d.marge_libre, 13)
+
+    def test_recalcul(self):
+        """
+        Un second calcul repart de zéro
+        """
+        self.projet.calculer_chemin_critique()
+        self.d.date_fin = datetime(2024, 1, 31)
+        self.projet.calculer_chemin_critique()
+        self.assertEqual(self.projet.chemin_critique, [self.a, self.c, self.d])
+
+
+    def test_dependances_allouees_a_la_demande(self):
+        """
+        Les tâches n'ont pas de dictionnaire ; la liste des dépendances n'est conservée qu'une fois remplie
+        """
+        self.assertFalse(hasattr(self.a, "__dict__"))
+        self.assertEqual(len(self.a.dependances), 0)
+        self.assertIsNone(self.a._dependances)
+        self.assertEqual(self.d.dependances, [self.c])
+        with self.assertRaises(AttributeError):
+            self.a.priorite = 1
+
+    def test_references_faibles(self):
+        """
+        Tâches et membres restent référençables par weakref, y compris une tâche rangée en colonnes
+        """
+        self.assertIs(weakref.ref(self.a)(), self.a)
+        self.assertIs(weakref.ref(self.a.responsable)(), self.a.responsable)
+        self.projet.stocker_en_colonnes()
+        suivies = weakref.WeakSet(self.projet.taches)
+        self.assertEqual(len(suivies), len(self.projet.taches))
+
+    def test_ordre_insertion_quelconque(self):
+        """
+        Le calcul ne dépend pas de l'ordre d'ajout des tâches
+        """
+        projet = Projet("Désordre", "", datetime(2024, 1, 1), datetime(2024, 12, 31), 1000)
+        for tache in (self.d, self.b, self.c, self.a):
+            projet.ajouter_tache(tache)
+        ordre = projet.ordre_topologique()
+        self.assertLess(ordre.index(self.a), ordre.index(self.c))
+        self.assertLess(ordre.index(self.c), ordre.index(self.d))
+        projet.calculer_chemin_critique()
+        self.assertEqual(projet.chemin_critique, [self.b, self.a])
+
+    def test_ordre_en_cache(self):
+        """
+        L'ordre n'est recalculé que si un nouvel arc le contredit
+        """
+        ordre = self.projet.ordre_topologique()
+        self.assertIs(self.projet.ordre_topologique(), ordre)
+        self.d.ajouter_dependance(self.b)
+        self.assertIs(self.projet.ordre_topologique(), ordre)
+        self.b.ajouter_dependance(self.c)
+        self.assertIsNot(self.projet.ordre_topologique(), ordre)
+
+    def test_cycle(self):
+        """
+        Un cycle de dépendances est signalé avec les tâches concernées
+        """
+        self.a.ajouter_dependance(self.d)
+        with self.assertRaises(CycleDependancesError) as contexte:
+            self.projet.calculer_chemin_critique()
+        self.assertEqual(contexte.exception.cycle, [self.a, self.c, self.d])
+
+
+class TestCheminCritiqueIncremental(unittest.TestCase):
+    """
+    Mise à jour incrémentale du chemin critique.
+    """
+
+    def setUp(self):
+        self.membre = Membre("Modou", "Chef de projet")
+        self.projet = Projet("Chaînes", "", datetime(2024, 1, 1), datetime(2024, 12, 31), 1000)
+        # Deux chaînes indépendantes de 50 tâches : 1 jour chacune et 2 jours chacune
+        self.chaines = []
+        for duree in (1, 2):
+            chaine = []
+            for i in range(50):
+                tache = Tache(f"T{duree}-{i}", "", datetime(2024, 1, 1),
+                              datetime(2024, 1, 1 + duree), self.membre, "Non démarrée")
+                if chaine:
+                    tache.ajouter_dependance(chaine[-1])
+                self.projet.ajouter_tache(tache)
+                chaine.append(tache)
+            self.chaines.append(chaine)
+        self.projet.calculer_chemin_critique()
+
+    def verifier_contre_calcul_complet(self):
+        attendu = [(t.ES, t.EF, t.LS, t.LF, t.marge_totale, t.marge_libre) for t in self.projet.taches]
+        chemin = list(self.projet.chemin_critique)
+        self.projet._moteur = None
+        self.projet.calculer_chemin_critique()
+        self.assertEqual(attendu, [(t.ES, t.EF, t.LS, t.LF, t.marge_totale, t.marge_libre)
+                                   for t in self.projet.taches])
+        self.assertEqual(chemin, self.projet.chemin_critique)
+
+    def test_modifier_dates_sans_changer_la_fin(self):
+        """
+        Allonger une tâche non critique ne touche que son cône
+        """
+        chemin = self.projet.chemin_critique
+        self.chaines[0][40].modifier_dates(date_fin=datetime(2024, 1, 5))
+        self.assertIs(self.projet.chemin_critique, chemin)
+        self.assertLess(self.projet.noeuds_recalcules, 60)
+        self.verifier_contre_calcul_complet()
+
+    def test_modifier_dates_change_le_chemin(self):
+        """
+        Une tâche devenue très longue fait basculer le chemin critique
+        """
+        self.chaines[0][10].modifier_dates(date_fin=datetime(2024, 6, 1))
+        self.assertIn(self.chaines[0][10], self.projet.chemin_critique)
+        self.assertNotIn(self.chaines[1][10], self.projet.chemin_critique)
+        self.verifier_contre_calcul_complet()
+
+    def test_ajouter_dependance(self):
+        """
+        Un nouvel arc compatible avec l'ordre est propagé localement
+        """
+        self.chaines[0][45].ajouter_dependance(self.chaines[1][5])
+        self.assertLess(self.projet.noeuds_recalcules, 20)
+        self.verifier_contre_calcul_complet()
+        # Arc contraire à l'ordre en cache : le moteur est abandonné, le calcul suivant le reconstruit
+        self.chaines[1][30].ajouter_dependance(self.chaines[0][49])
+        self.assertIsNone(self.projet._moteur)
+        self.projet.calculer_chemin_critique()
+        self.verifier_contre_calcul_complet()
+
+    def test_cycle_signale_au_calcul(self):
+        """
+        Un arc qui ferme un cycle est accepté ; le calcul suivant lève l'erreur, pour chaque projet
+        """
+        autre = Projet("Autre", "", datetime(2024, 1, 1), datetime(2024, 12, 31), 1000)
+        autre.ajouter_taches(self.chaines[0])
+        autre.calculer_chemin_critique()
+        self.chaines[0][0].ajouter_dependance(self.chaines[0][49])
+        self.assertIn(self.chaines[0][49], self.chaines[0][0].dependances)
+        for projet in (self.projet, autre):
+            self.assertIsNone(projet._moteur)
+            with self.assertRaises(CycleDependancesError):
+                projet.calculer_chemin_critique()
+
+    def test_liste_dependances_modifiable(self):
+        """
+        Les dépendances restent une liste modifiable dont les changements atteignent le projet
+        """
+        premiere = self.chaines[0][0]
+        premiere.dependances.append(self.chaines[1][49])
+        self.assertEqual(premiere.dependances, [self.chaines[1][49]])
+        self.projet.calculer_chemin_critique()
+        self.assertEqual(premiere.ES, self.chaines[1][49].EF)
+        premiere.dependances.clear()
+        self.projet.calculer_chemin_critique()
+        self.assertEqual(premiere.ES, datetime(2024, 1, 1))
+        self.chaines[1][10].dependances = []
+        self.projet.calculer_chemin_critique()
+        self.assertEqual(self.chaines[1][10].ES, datetime(2024, 1, 1))
+        self.assertIsNot(self.projet.ordre_topologique(), None)
+        self.verifier_contre_calcul_complet()
+
+
+class TestOrdonnanceurLot(unittest.TestCase):
+    """
+    Ordonnancement vectorisé de plusieurs projets.
+    """
+
+    def creer_projet(self, graine: int) -> Projet:
+        membre = Membre("Modou", "Chef de projet")
+        projet = Projet(f"Projet {graine}", "", datetime(2024, 1, graine), datetime(2024, 12, 31), 1000)
+        taches = []
+        for i in range(30):
+            tache = Tache(f"T{i}", "", datetime(2024, 1, 1),
+                          datetime(2024, 1, 1 + (i * graine) % 17), membre, "Non démarrée")
+            for j in range(i % 3):
+                tache.ajouter_dependance(taches[(i * 7 + j * graine) % len(taches)])
+            taches.append(tache)
+        for tache in reversed(taches):
+            projet.ajouter_tache(tache)
+        return projet
+
+    def test_identique_au_calcul_scalaire(self):
+        """
+        Les dates, marges et chemins critiques sont identiques
+        """
+        projets = [self.creer_projet(graine) for graine in range(1, 6)]
+        projets.append(Projet("Vide", "", datetime(2024, 1, 1), datetime(2024, 12, 31), 0))
+        attendus = []
+        for projet in projets:
+            projet.calculer_chemin_critique()
+            attendus.append(([(t.ES, t.EF, t.LS, t.LF, t.marge_totale, t.marge_libre) for t in projet.taches],
+                             list(projet.chemin_critique)))
+            for tache in projet.taches:
+                tache.ES = tache.EF = tache.LS = tache.LF = None
+        ordonnancer_projets(projets)
+        for projet, attendu in zip(projets, attendus):
+            self.assertEqual(attendu, ([(t.ES, t.EF, t.LS, t.LF, t.marge_totale, t.marge_libre)
+                                        for t in projet.taches], projet.chemin_critique))
+
+    def test_mise_a_jour_incrementale_apres_lot(self):
+        """
+        Le calcul incrémental reprend à partir des résultats du lot
+        """
+        projet = self.creer_projet(3)
+        ordonnancer_projets([projet])
+        projet.taches[5].modifier_dates(date_fin=datetime(2024, 3, 1))
+        resultat = [(t.ES, t.LF) for t in projet.taches]
+        projet._moteur = None
+        projet.calculer_chemin_critique()
+        self.assertEqual(resultat, [(t.ES, t.LF) for t in projet.taches])
+
+
+class TestSimulationMonteCarlo(unittest.TestCase):
+    """
+    Simulation des risques sur le calendrier.
+    """
+
+    def setUp(self):
+        membre = Membre("Modou", "Chef de projet")
+        self.projet = Projet("Risques", "", datetime(2024, 1, 1), datetime(2024, 12, 31), 1000)
+        self.a = Tache("A", "", datetime(2024, 1, 1), datetime(2024, 1, 11), membre, "Non démarrée")
+        self.b = Tache("B", "", datetime(2024, 1, 1), datetime(2024, 1, 9), membre, "Non démarrée")
+        self.c = Tache("C", "", datetime(2024, 1, 1), datetime(2024, 1, 6), membre, "Non démarrée")
+        self.c.ajouter_dependance(self.a)
+        self.c.ajouter_dependance(self.b)
+        for tache in (self.a, self.b, self.c):
+            self.projet.ajouter_tache(tache)
+
+    def test_sans_risque(self):
+        """
+        Sans risque, tous les tirages donnent le chemin critique déterministe
+        """
+        resultat = SimulationMonteCarlo(self.projet, iterations=100, graine=1).executer()
+        self.assertEqual(resultat.percentiles()["P95"], datetime(2024, 1, 16))
+        self.assertEqual(resultat.criticite, {self.a: 1.0, self.b: 0.0, self.c: 1.0})
+
+    def test_risque_certain(self):
+        """
+        Un risque certain allonge les tâches qu'il touche
+        """
+        self.projet.ajouter_risque(Risque("Retard fournisseur", 1.0, 2.0, [self.b]))
+        resultat = SimulationMonteCarlo(self.projet, iterations=2000, graine=1).executer()
+        self.assertGreater(resultat.criticite[self.b], 0.5)
+        self.assertGreater(resultat.percentile(80), datetime(2024, 1, 16))
+
+    def test_graine_deterministe(self):
+        """
+        Le résultat ne dépend que de la graine, pas du nombre de processus
+        """
+        self.projet.ajouter_risque(Risque("Retard de livraison", 0.3, "Élevé"))
+        serie = SimulationMonteCarlo(self.projet, iterations=500, graine=7, taille_bloc=100).executer()
+        parallele = SimulationMonteCarlo(self.projet, iterations=500, graine=7, taille_bloc=100,
+                                         processus=2).executer()
+        self.assertEqual(serie.durees_projet.tolist(), parallele.durees_projet.tolist())
+        self.assertEqual(serie.criticite, parallele.criticite)
+
+    def test_intensite_impact(self):
+        """
+        Les impacts textuels sont lus sans tenir compte des accents
+        """
+        self.assertEqual(intensite_impact("Élevé"), intensite_impact("eleve"))
+        self.assertEqual(intensite_impact(0.4), 0.4)
+        with self.assertRaises(ValueError):
+            intensite_impact("Catastrophique")
+
+
+class TestDispatcheurNotifications(unittest.TestCase):
+    """
+    Envoi asynchrone des notifications.
+    """
+
+    def setUp(self):
+        self.projet = Projet("Notifications", "", datetime(2024, 1, 1), datetime(2024, 12, 31), 1000)
+        for i in range(10):
+            self.projet.equipe.ajouter_membre(Membre(f"Membre {i}", "Développeur"))
+
+    def test_mutations_non_bloquantes(self):
+        """
+        Les mutations déposent les envois et la fermeture les termine tous
+        """
+        transport = TransportFactice(latence=0.01)
+        with DispatcheurNotifications(concurrence=5) as dispatcheur:
+            self.projet.set_notification_context(NotificationContextAsynchrone(transport, dispatcheur))
+            self.projet.definir_budget(2000)
+            self.projet.ajouter_jalon(Jalon("Livraison", datetime(2024, 6, 1)))
+        self.assertEqual(len(transport.envoyes), 20)
+        self.assertLessEqual(transport.simultanes_max, 5)
+        self.assertGreater(transport.simultanes_max, 1)
+
+    def test_reessais(self):
+        """
+        Un envoi en échec est retenté avant d'être abandonné
+        """
+        transport = TransportFactice(echecs=2)
+        with DispatcheurNotifications(tentatives=3, delai_initial=0.001) as dispatcheur:
+            dispatcheur.soumettre(transport, "Bonjour", self.projet.equipe.membres[0])
+        self.assertEqual(len(transport.envoyes), 1)
+        self.assertEqual(dispatcheur.echecs, [])
+
+        transport = TransportFactice(echecs=5)
+        with DispatcheurNotifications(tentatives=2, delai_initial=0.001) as dispatcheur:
+            dispatcheur.soumettre(transport, "Bonjour", self.projet.equipe.membres[0])
+        self.assertEqual(transport.envoyes, [])
+        self.assertEqual(len(dispatcheur.echecs), 1)
+
+    def test_strategie_saturee_isolee(self):
+        """
+        Une stratégie à sa limite ne retarde pas les envois d'une autre ; le dispatcheur redémarre
+        """
+        lent, rapide = TransportFactice(latence=0.2), TransportFactice()
+        membre = self.projet.equipe.membres[0]
+        dispatcheur = DispatcheurNotifications()
+        dispatcheur.limiter(lent, 1)
+        for _ in range(2):
+            with dispatcheur:
+                for _ in range(3):
+                    dispatcheur.soumettre(lent, "Lent", membre)
+                debut = time.perf_counter()
+                dispatcheur.soumettre(rapide, "Rapide", membre)
+                while not rapide.envoyes:
+                    time.sleep(0.005)
+                self.assertLess(time.perf_counter() - debut, 0.15)
+                rapide.envoyes.clear()
+            self.assertEqual(len(lent.envoyes), 3)
+            self.assertEqual(lent.simultanes_max, 1)
+            lent.envoyes.clear()
+
+
+class TestLotNotifications(unittest.TestCase):
+    """
+    Regroupement des notifications pendant les mutations en masse.
+    """
+
+    def setUp(self):
+        self.transport = TransportFactice()
+        self.projet = Projet("Import", "", datetime(2024, 1, 1), datetime(2024, 12, 31), 1000)
+        self.projet.set_notification_strategy(self.transport)
+        self.modou = Membre("Modou", "Chef de projet")
+        self.christian = Membre("Christian", "Développeur")
+        self.projet.equipe.ajouter_membre(self.modou)
+        self.projet.equipe.ajouter_membre(self.christian)
+
+    def ajouter_taches(self, nombre: int):
+        for i in range(nombre):
+            self.projet.ajouter_tache(Tache(f"T{i}", "", datetime(2024, 1, 1), datetime(2024, 1, 2),
+                                            self.modou, "Non démarrée"))
+
+    def test_un_resume_par_destinataire(self):
+        """
+        Chaque membre reçoit un seul résumé à la sortie du bloc
+        """
+        with self.projet.lot_notifications():
+            self.ajouter_taches(50)
+            self.projet.ajouter_risque(Risque("Retard", 0.2, "Faible"))
+            self.assertEqual(self.transport.envoyes, [])
+        self.assertEqual([destinataire for _, destinataire in self.transport.envoyes],
+                         [self.modou, self.christian])
+        resume = self.transport.envoyes[0][0]
+        self.assertTrue(resume.startswith("Résumé de 51 notifications:"))
+        self.assertTrue(resume.endswith("- Nouveau risque ajouté: Retard"))
+
+    def test_vidage_par_taille(self):
+        """
+        Le regroupement se vide dès que la taille maximale est atteinte
+        """
+        with self.projet.lot_notifications(taille_max=20) as regroupeur:
+            self.ajouter_taches(45)
+            self.assertEqual(len(self.transport.envoyes), 4)
+        self.assertEqual(regroupeur.nb_vidages, 3)
+        self.assertEqual(len(self.transport.envoyes), 6)
+
+    def test_vidage_par_fenetre(self):
+        """
+        Le regroupement se vide quand la fenêtre de temps est écoulée
+        """
+        with self.projet.lot_notifications(fenetre=60) as regroupeur:
+            instants = iter([0, 0, 10, 70])
+            regroupeur.horloge = lambda: next(instants)
+            self.ajouter_taches(2)
+            self.assertEqual(self.transport.envoyes, [])
+            self.ajouter_taches(1)
+            self.assertEqual(len(self.transport.envoyes), 2)
+
+    def test_fenetre_sans_message_suivant(self):
+        """
+        Un message isolé part à l'échéance de la fenêtre, sans attendre un autre message ni la sortie du bloc
+        """
+        with self.projet.lot_notifications(fenetre=0.05) as regroupeur:
+            self.ajouter_taches(1)
+            limite = time.monotonic() + 5
+            while len(self.transport.envoyes) < 2 and time.monotonic() < limite:
+                time.sleep(0.01)
+            self.assertEqual([message for message, _ in self.transport.envoyes],
+                             ["Nouvelle tâche ajoutée: T0"] * 2)
+            self.assertEqual(len(regroupeur), 0)
+
+
+class TestChargementMasse(unittest.TestCase):
+    """
+    Chargement en masse des éléments d'un projet.
+    """
+
+    def setUp(self):
+        self.transport = TransportFactice()
+        self.projet = Projet("Import", "", datetime(2024, 1, 1), datetime(2024, 12, 31), 1000)
+        self.projet.set_notification_strategy(self.transport)
+        self.projet.ajouter_membres_equipe([("Modou", "Chef de projet"),
+                                            {"nom": "Christian", "role": "Développeur"}])
+
+    def test_ajouter_taches(self):
+        """
+        Tuples et dicts, références par nom, une seule notification
+        """
+        debut, fin = datetime(2024, 1, 1), datetime(2024, 1, 11)
+        taches = self.projet.ajouter_taches([
+            ("Développement", "", debut, fin, "Christian", "Non démarrée", ["Analyse"]),
+            {"nom": "Analyse", "description": "", "date_debut": debut, "date_fin": fin,
+             "responsable": "Modou", "statut": "Terminée"},
+        ])
+        self.assertEqual(self.projet.taches, taches)
+        self.assertEqual(taches[0].dependances, [taches[1]])
+        self.assertEqual(taches[0].responsable.nom, "Christian")
+        self.assertEqual([message for message, _ in self.transport.envoyes[-2:]],
+                         ["2 nouvelles tâches ajoutées"] * 2)
+        self.projet.calculer_chemin_critique()
+        self.assertEqual(taches[0].EF, datetime(2024, 1, 21))
+
+    def test_validation(self):
+        """
+        Un lot invalide est rejeté sans rien ajouter au projet
+        """
+        debut, fin = datetime(2024, 1, 1), datetime(2024, 1, 11)
+        with self.assertRaises(ValueError):
+            self.projet.ajouter_taches([("A", "", fin, debut, "Modou", "Non démarrée")])
+        with self.assertRaises(ValueError):
+            self.projet.ajouter_taches([("A", "", debut, fin, "Inconnu", "Non démarrée")])
+        with self.assertRaises(ValueError):
+            self.projet.ajouter_taches([("A", "", debut, fin, "Modou", "Non démarrée", ["B"])])
+        externe = Tache("Externe", "", debut, fin, None, "Non démarrée")
+        with self.assertRaises(ValueError):
+            self.projet.ajouter_taches([("A", "", debut, fin, "Modou", "Non démarrée", [externe])])
+        with self.assertRaises(ValueError):
+            self.projet.ajouter_risques([("Retard", 1.5, "Élevé")])
+        self.assertEqual(self.projet.taches, [])
+        self.assertEqual(self.projet.risques, [])
+
+    def test_lot_refuse_sans_effet(self):
+        """
+        Une référence invalide en fin de lot ne modifie aucune tâche fournie ; une date absente est refusée
+        """
+        debut, fin = datetime(2024, 1, 1), datetime(2024, 1, 11)
+        a = Tache("A", "", debut, fin, "Modou", "Non démarrée")
+        with self.assertRaises(ValueError):
+            self.projet.ajouter_taches([a, ("B", "", debut, fin, "Modou", "Non démarrée", [a]),
+                                        ("C", "", debut, fin, "Modou", "Non démarrée", ["Inconnue"])])
+        self.assertEqual(a.responsable, "Modou")
+        with self.assertRaises(ValueError):
+            self.projet.ajouter_taches([("D", "", None, fin, "Modou", "Non démarrée")])
+        self.assertEqual(self.projet.taches, [])
+
+    def test_ramasse_miettes_retabli(self):
+        """
+        Le ramasse-miettes, suspendu pendant le chargement, est rétabli même après un lot refusé
+        """
+        debut, fin = datetime(2024, 1, 1), datetime(2024, 1, 11)
+        self.projet.ajouter_taches([("A", "", debut, fin, "Modou", "Non démarrée")])
+        self.assertTrue(gc.isenabled())
+        with self.assertRaises(ValueError):
+            self.projet.ajouter_taches([("B", "", debut, fin, "Modou", "Non démarrée", ["Inconnue"])])
+        self.assertTrue(gc.isenabled())
+        gc.disable()
+        try:
+            self.projet.ajouter_taches([("C", "", debut, fin, "Modou", "Non démarrée", ["A"])])
+            self.assertFalse(gc.isenabled())
+        finally:
+            gc.enable()
+        self.assertEqual(self.projet.taches[1].dependances, [self.projet.taches[0]])
+
+    def test_risques_et_jalons(self):
+        """
+        Risques et jalons chargés depuis des tuples
+        """
+        self.projet.ajouter_risques([("Retard", 0.3, "Élevé"), Risque("Budget", 0.1, "Moyen")])
+        self.projet.ajouter_jalons([("Lancement", datetime(2024, 1, 1))])
+        self.assertEqual([risque.description for risque in self.projet.risques], ["Retard", "Budget"])
+        self.assertEqual(self.projet.jalons[0].nom, "Lancement")
+
+
+class TestMagasinTaches(unittest.TestCase):
+    """
+    Stockage en colonnes des tâches.
+    """
+
+    def setUp(self):
+        self.modou = Membre("Modou", "Chef de projet")
+        self.christian = Membre("Christian", "Développeur")
+        self.projet = Projet("Colonnes", "", datetime(2024, 1, 1), datetime(2024, 12, 31), 1000)
+        self.projet.ajouter_membres_equipe([self.modou, self.christian])
+        debut = datetime(2024, 1, 1)
+        self.projet.ajouter_taches([
+            ("Tests", "", datetime(2024, 2, 1), datetime(2024, 2, 15), self.christian, "Non démarrée",
+             ["Développement"]),
+            ("Analyse", "", debut, datetime(2024, 1, 11), self.modou, "Terminée"),
+            ("Développement", "", datetime(2024, 1, 11), datetime(2024, 2, 1), self.christian, "En cours",
+             ["Analyse"]),
+            ("Documentation", "", datetime(2024, 1, 11), datetime(2024, 1, 20), self.modou, "Non démarrée",
+             ["Analyse"]),
+        ])
+        self.magasin = MagasinTaches.depuis_projet(self.projet)
+
+    def test_vues(self):
+        """
+        Les vues restituent les attributs des tâches
+        """
+        self.assertEqual(len(self.magasin), 4)
+        vues = {vue.nom: vue for vue in self.magasin}
+        self.assertEqual(vues["Tests"].date_fin, datetime(2024, 2, 15))
+        self.assertIs(vues["Tests"].responsable, self.christian)
+        self.assertEqual([dep.nom for dep in vues["Tests"].dependances], ["Développement"])
+        vues["Tests"].mettre_a_jour_statut("En cours")
+        self.assertEqual([vue.nom for vue in self.magasin.taches_par_statut("En cours")],
+                         ["Développement", "Tests"])
+
+    def test_taches_en_retard(self):
+        """
+        Tâches non terminées dont la fin est passée, pour un membre
+        """
+        reference = datetime(2024, 1, 25)
+        self.assertEqual([vue.nom for vue in self.magasin.taches_en_retard(self.modou, reference)],
+                         ["Documentation"])
+        self.assertEqual(self.magasin.taches_en_retard(self.christian, reference), [])
+        # Heure quelconque : ramenée au jour
+        self.assertEqual([vue.nom for vue in self.magasin.taches_en_retard(self.modou, datetime(2024, 1, 20, 12))],
+                         [])
+        self.assertEqual([vue.nom for vue in self.magasin.taches_en_retard(self.modou, datetime(2024, 1, 21, 8))],
+                         ["Documentation"])
+
+    def test_chemin_critique(self):
+        """
+        Le chemin critique calculé sur les colonnes est celui du projet
+        """
+        critiques = self.magasin.calculer_chemin_critique()
+        self.projet.calculer_chemin_critique()
+        self.assertEqual({vue.nom for vue in critiques}, {tache.nom for tache in self.projet.chemin_critique})
+        vues = {vue.nom: vue for vue in self.magasin}
+        self.assertEqual(vues["Tests"].LF, self.projet.taches[0].LF)
+
+    def test_projet_en_colonnes(self):
+        """
+        Les tâches du projet deviennent des vues sur leur ligne : mêmes objets, modifications et chemin
+        critique passent par les colonnes
+        """
+        reference = Projet("Référence", "", datetime(2024, 1, 1), datetime(2024, 12, 31), 1000)
+        reference.ajouter_membres_equipe([self.modou, self.christian])
+        reference.ajouter_taches([(t.nom, "", t.date_debut, t.date_fin, t.responsable, t.statut,
+                                   [d.nom for d in t.dependances]) for t in self.projet.taches])
+        tests = self.projet.taches[0]
+        magasin = self.projet.stocker_en_colonnes()
+        self.assertIs(self.projet.taches[0], tests)
+        self.assertIsInstance(tests, Tache)
+        self.assertEqual(tests.date_fin, datetime(2024, 2, 15))
+        for projet in (self.projet, reference):
+            projet.taches[3].modifier_dates(date_fin=datetime(2024, 3, 1))
+            projet.taches[3].changer_responsable(self.christian)
+            projet.ajouter_tache(Tache("Recette", "", datetime(2024, 2, 15), datetime(2024, 2, 20), self.modou,
+                                       "Non démarrée"))
+            projet.taches[4].ajouter_dependance(projet.taches[0])
+            projet.calculer_chemin_critique()
+        self.assertEqual(magasin.fin[3], 60)
+        self.assertEqual([t.nom for t in self.projet.chemin_critique], [t.nom for t in reference.chemin_critique])
+        for tache, attendue in zip(self.projet.taches, reference.taches):
+            self.assertEqual((tache.ES, tache.EF, tache.LS, tache.LF, tache.marge_totale, tache.marge_libre),
+                             (attendue.ES, attendue.EF, attendue.LS, attendue.LF, attendue.marge_totale,
+                              attendue.marge_libre))
+        self.assertEqual(self.projet.generer_rapport_performance().replace("Colonnes", "Référence"),
+                         reference.generer_rapport_performance())
+        tests.mettre_a_jour_statut("Terminée")
+        self.assertEqual(magasin.taches_par_statut("Terminée"), [tests, self.projet.taches[1]])
+        self.assertEqual(self.projet.rechercher_taches(statut="Terminée"), [self.projet.taches[1], tests])
+        self.assertEqual(magasin.taches_en_retard(self.christian, datetime(2024, 3, 2)), [self.projet.taches[2],
+                                                                                          self.projet.taches[3]])
+        with self.assertRaises(ValueError):
+            self.projet.ajouter_tache(Tache("Demi-journée", "", datetime(2024, 3, 1, 12), datetime(2024, 3, 2),
+                                            self.modou, "Non démarrée"))
+        self.assertEqual(len(self.projet.taches), 5)
+        self.projet.taches[0].ajouter_dependance(self.projet.taches[4])
+        with self.assertRaises(CycleDependancesError):
+            self.projet.calculer_chemin_critique()
+
+
+class TestIndexTaches(unittest.TestCase):
+    """
+    Recherche indexée des tâches.
+    """
+
+    def setUp(self):
+        self.modou = Membre("Modou", "Chef de projet")
+        self.christian = Membre("Christian", "Développeur")
+        self.projet = Projet("Index", "", datetime(2024, 1, 1), datetime(2024, 12, 31), 1000)
+        generateur = random.Random(4)
+        for i in range(500):
+            debut = datetime(2024, 1, 1) + timedelta(days=generateur.randrange(300))
+            self.projet.ajouter_tache(Tache(f"T{i}", "", debut, debut + timedelta(days=generateur.randrange(40)),
+                                            generateur.choice([self.modou, self.christian]),
+                                            generateur.choice(["Non démarrée", "En cours", "Terminée"])))
+
+    def parcours(self, statut=None, responsable=None, debut=None, fin=None):
+        return {tache for tache in self.projet.taches
+                if (statut is None or tache.statut == statut)
+                and (responsable is None or tache.responsable is responsable)
+                and (debut is None or tache.date_fin >= debut)
+                and (fin is None or tache.date_debut <= fin)}
+
+    def verifier(self, **criteres):
+        resultat = self.projet.rechercher_taches(**criteres)
+        self.assertEqual(len(resultat), len(set(resultat)))
+        self.assertEqual(set(resultat), self.parcours(**criteres))
+
+    def test_statut_et_responsable(self):
+        """
+        Tâches non démarrées de Christian
+        """
+        self.verifier(statut="Non démarrée", responsable=self.christian)
+        self.verifier(statut="Inconnu")
+
+    def test_periode(self):
+        """
+        Tâches chevauchant mars, seules ou combinées à un statut
+        """
+        mars = {"debut": datetime(2024, 3, 1), "fin": datetime(2024, 3, 31)}
+        self.verifier(**mars)
+        self.verifier(statut="En cours", **mars)
+        self.verifier(debut=datetime(2024, 10, 1))
+
+    def test_index_tenus_a_jour(self):
+        """
+        Les index suivent les changements de statut et de dates
+        """
+        for tache in self.projet.taches[:100]:
+            tache.mettre_a_jour_statut("Bloquée")
+            tache.modifier_dates(date_debut=datetime(2024, 3, 10), date_fin=datetime(2024, 3, 12))
+        self.verifier(statut="Bloquée")
+        self.verifier(debut=datetime(2024, 3, 11), fin=datetime(2024, 3, 11))
+        self.projet.ajouter_tache(Tache("Nouvelle", "", datetime(2024, 3, 11), datetime(2024, 3, 11),
+                                        self.modou, "Bloquée"))
+        self.verifier(statut="Bloquée", responsable=self.modou, debut=datetime(2024, 3, 11))
+        self.verifier(debut=datetime(2024, 3, 11), fin=datetime(2024, 3, 11))
+
+    def test_modifications_entre_recherches(self):
+        """
+        Dates modifiées entre chaque recherche : résultats exacts, au plus log n arbres et rien à parcourir
+        linéairement au moment de la recherche
+        """
+        generateur = random.Random(7)
+        index = self.projet._index
+        for _ in range(300):
+            tache = generateur.choice(self.projet.taches)
+            debut = datetime(2024, 1, 1) + timedelta(days=generateur.randrange(300))
+            tache.modifier_dates(date_debut=debut, date_fin=debut + timedelta(days=generateur.randrange(40)))
+            jour = datetime(2024, 1, 1) + timedelta(days=generateur.randrange(330))
+            self.verifier(debut=jour, fin=jour + timedelta(days=3))
+            self.assertFalse(index._a_inserer)
+            self.assertLessEqual(len(index._arbres), (2 * len(index)).bit_length())
+
+
+class TestInstantaneProjet(unittest.TestCase):
+    """
+    Instantané binaire d'un projet.
+    """
+
+    def setUp(self):
+        self.modou = Membre("Modou", "Chef de projet")
+        self.christian = Membre("Christian", "Développeur")
+        self.projet = Projet("Instantané", "Projet à figer", datetime(2024, 1, 1), datetime(2024, 12, 31), 1000)
+        self.projet.ajouter_membres_equipe([self.modou, self.christian])
+        self.projet.ajouter_taches([
+            ("A", "", datetime(2024, 1, 1), datetime(2024, 1, 5), self.modou, "Terminée"),
+            ("B", "Étape é", datetime(2024, 1, 6), datetime(2024, 1, 10), self.modou, "En cours", ["A"]),
+            ("C", "", datetime(2024, 1, 6), datetime(2024, 1, 7), self.christian, "Non démarrée", ["A"]),
+            ("D", "", datetime(2024, 1, 11), datetime(2024, 1, 12), self.modou, "Non démarrée", ["B", "C"]),
+        ])
+        self.projet.ajouter_risque(Risque("Retard", 0.3, "Élevé", [self.projet.taches[1]]))
+        self.projet.ajouter_jalon(Jalon("Livraison", datetime(2024, 1, 12)))
+        self.projet.calculer_chemin_critique()
+
+    def test_aller_retour_fichier(self):
+        """
+        Le projet relu depuis un fichier produit le même rapport
+        """
+        with tempfile.TemporaryDirectory() as dossier:
+            chemin = os.path.join(dossier, "projet.bin")
+            sauvegarder_instantane(self.projet, chemin)
+            with charger_instantane(chemin) as instantane:
+                relu = instantane.projet()
+                self.assertEqual(relu.generer_rapport_performance(), self.projet.generer_rapport_performance())
+                self.assertEqual([d.nom for d in relu.taches[3].dependances], ["B", "C"])
+                self.assertEqual(relu.risques[0].taches[0].nom, "B")
+
+    def test_responsable_hors_equipe(self):
+        """
+        Un responsable de tâche qui n'est pas dans l'équipe n'y entre pas au rechargement
+        """
+        externe = Membre("Awa", "Consultante")
+        self.projet.ajouter_tache(Tache("E", "", datetime(2024, 1, 13), datetime(2024, 1, 14), externe,
+                                        "Non démarrée"))
+        flux = io.BytesIO()
+        sauvegarder_instantane(self.projet, flux)
+        relu = Instantane.depuis_octets(flux.getvalue()).projet()
+        self.assertEqual([m.nom for m in relu.equipe.obtenir_membres()], ["Modou", "Christian"])
+        self.assertEqual(relu.taches[4].responsable.nom, "Awa")
+
+    def test_chargement_paresseux(self):
+        """
+        Une tâche lue à la demande ne matérialise que ses ancêtres
+        """
+        flux = io.BytesIO()
+        sauvegarder_instantane(self.projet, flux)
+        instantane = Instantane.depuis_octets(flux.getvalue())
+        self.assertEqual(len(instantane.taches), 4)
+        tache = instantane.taches[1]
+        self.assertEqual((tache.nom, tache.description, tache.responsable.nom), ("B", "Étape é", "Modou"))
+        self.assertEqual([d.nom for d in tache.dependances], ["A"])
+        self.assertIs(tache.dependances[0], instantane.taches[0])
+        self.assertEqual(tache.marge_totale, 0)
+        self.assertEqual(instantane.lire_tache(2).responsable.nom, "Christian")
+        self.assertEqual(instantane.dependances(3), [1, 2])
+        self.assertEqual(instantane.table_taches["critique"].tolist(), [1, 1, 0, 1])
+
+
+class TestJournalChangements(unittest.TestCase):
+    """
+    Journal des changements et reconstruction des versions.
+    """
+
+    def setUp(self):
+        self.modou = Membre("Modou", "Chef de projet")
+        self.projet = Projet("Journal", "", datetime(2024, 1, 1), datetime(2024, 12, 31), 1000)
+        self.projet.ajouter_membre_equipe(self.modou)
+        self.rapports = {}
+
+    def historique(self, versions: int):
+        # Modifications aléatoires ; le rapport de chaque version est relevé avant de la clore
+        generateur = random.Random(7)
+        for version in range(versions):
+            for _ in range(generateur.randrange(1, 6)):
+                choix = generateur.randrange(6)
+                taches = self.projet.taches
+                if choix == 0 or not taches:
+                    tache = Tache(f"T{len(taches)}", "", datetime(2024, 1, 1), datetime(2024, 1, 5),
+                                  self.modou, "Non démarrée")
+                    if taches:
+                        tache.ajouter_dependance(generateur.choice(taches))
+                    self.projet.ajouter_tache(tache)
+                elif choix == 1:
+                    generateur.choice(taches).mettre_a_jour_statut(generateur.choice(["En cours", "Terminée"]))
+                elif choix == 2:
+                    generateur.choice(taches).modifier_dates(date_fin=datetime(2024, 2, generateur.randrange(1, 28)))
+                elif choix == 3:
+                    self.projet.definir_budget(generateur.randrange(1000))
+                elif choix == 4:
+                    self.projet.ajouter_risque(Risque("Retard", 0.5, "Élevé", [generateur.choice(taches)]))
+                else:
+                    self.projet.ajouter_membre_equipe(Membre(f"M{version}", "Développeur"))
+            self.rapports[self.projet.version] = self.projet.generer_rapport_performance()
+            self.projet.enregistrer_changement(f"Changement {version}")
+        self.rapports[self.projet.version] = self.projet.generer_rapport_performance()
+
+    def test_versions_reconstruites(self):
+        """
+        Chaque version est reconstruite à l'identique en rejouant peu d'opérations
+        """
+        journal = JournalChangements(intervalle_points=10)
+        self.projet.journaliser(journal)
+        self.historique(40)
+        for version, rapport in self.rapports.items():
+            self.assertEqual(self.projet.a_la_version(version).generer_rapport_performance(), rapport)
+            self.assertLess(journal.operations_rejouees, 10)
+        self.assertEqual(self.projet.a_la_version(12).version, 12)
+        with self.assertRaises(ValueError):
+            self.projet.a_la_version(99)
+
+    @staticmethod
+    def etat(projet: Projet) -> tuple:
+        # État comparable d'un projet ; un responsable est repéré par son rang dans l'équipe,
+        # ce qui vérifie qu'il s'agit bien du même objet que le membre de l'équipe
+        rangs = {membre: i for i, membre in enumerate(projet.equipe.membres)}
+
+        def membre(m):
+            return None if m is None else (m.nom, m.role, rangs.get(m))
+
+        return (projet.version, projet.budget, [membre(m) for m in projet.equipe.membres],
+                [(t.nom, t.date_debut, t.date_fin, t.statut, membre(t.responsable), [d.nom for d in t.dependances])
+                 for t in projet.taches],
+                [(r.description, [t.nom for t in r.taches]) for r in projet.risques])
+
+    def test_historiques_aleatoires(self):
+        """
+        Mutations aléatoires (retraits de membres et réassignations compris) : chaque version relue
+        correspond à l'état relevé, quel que soit l'intervalle entre points de reprise
+        """
+        for graine in range(12):
+            for intervalle in (1, 3, 10):
+                with self.subTest(graine=graine, intervalle=intervalle):
+                    generateur = random.Random(graine)
+                    projet = Projet("Aléatoire", "", datetime(2024, 1, 1), datetime(2024, 12, 31), 0)
+                    projet.ajouter_membre_equipe(Membre("M", "Chef de projet"))
+                    projet.journaliser(JournalChangements(intervalle_points=intervalle))
+                    externes, etats = [], {}
+                    for i in range(150):
+                        choix = generateur.randrange(10)
+                        taches, equipe = projet.taches, list(projet.equipe.membres)
+                        if choix == 0 or not taches:
+                            if generateur.random() < 0.2:
+                                externes.append(Membre(f"X{i}", "Consultant"))
+                            tache = Tache(f"T{i}", "", datetime(2024, 1, 1), datetime(2024, 1, 5),
+                                          generateur.choice(equipe + externes + [None]), "Non démarrée")
+                            if taches and generateur.random() < 0.5:
+                                tache.ajouter_dependance(generateur.choice(taches))
+                            projet.ajouter_tache(tache)
+                        elif choix == 1:
+                            generateur.choice(taches).mettre_a_jour_statut(generateur.choice(["En cours", "Terminée"]))
+                        elif choix == 2:
+                            generateur.choice(taches).modifier_dates(
+                                date_fin=datetime(2024, 2, generateur.randrange(1, 28)))
+                        elif choix == 3:
+                            projet.ajouter_membre_equipe(generateur.choice([Membre(f"M{i}", "Développeur")] + externes))
+                        elif choix == 4 and len(equipe) > 1:
+                            membre = generateur.choice(equipe)
+                            autres = [m for m in equipe if m is not membre]
+                            projet.retirer_membre_equipe(membre, generateur.choice(autres + [None]))
+                        elif choix == 5:
+                            generateur.choice(taches).changer_responsable(generateur.choice(equipe + externes + [None]))
+                        elif choix == 6 and equipe:
+                            projet.modifier_membre_equipe(generateur.choice(equipe), role=f"Rôle {i}")
+                        elif choix == 7:
+                            projet.definir_budget(generateur.randrange(1000))
+                        elif choix == 8:
+                            projet.ajouter_risque(Risque(f"R{i}", 0.5, "Élevé", [generateur.choice(taches)]))
+                        else:
+                            etats[projet.version] = self.etat(projet)
+                            projet.enregistrer_changement(f"Changement {i}")
+                    etats[projet.version] = self.etat(projet)
+                    for version, etat in etats.items():
+                        self.assertEqual(self.etat(projet.a_la_version(version)), etat)
+
+    def test_dependances_remplacees(self):
+        """
+        Une liste de dépendances remplacée ou modifiée en place est rejouée
+        """
+        self.projet.journaliser(JournalChangements(intervalle_points=50))
+        a, b, c = (Tache(nom, "", datetime(2024, 1, 1), datetime(2024, 1, 5), self.modou, "Non démarrée")
+                   for nom in "ABC")
+        self.projet.ajouter_taches([a, b])
+        b.dependances = [a]
+        self.projet.enregistrer_changement("B après A")
+        b.dependances.remove(a)
+        b.dependances.append(c)
+        self.projet.ajouter_tache(c)
+        self.projet.enregistrer_changement("B après C")
+        self.assertEqual([d.nom for d in self.projet.a_la_version(1).taches[1].dependances], ["A"])
+        self.assertEqual([d.nom for d in self.projet.a_la_version(2).taches[1].dependances], ["C"])
+
+    def test_responsable_rejoint_l_equipe(self):
+        """
+        Un responsable hors équipe ajouté ensuite à l'équipe reste un seul membre au rejeu
+        """
+        self.projet.journaliser(JournalChangements(intervalle_points=50))
+        awa = Membre("Awa", "Consultante")
+        self.projet.ajouter_tache(Tache("T", "", datetime(2024, 1, 1), datetime(2024, 1, 5), awa, "Non démarrée"))
+        self.projet.ajouter_membre_equipe(awa)
+        self.projet.enregistrer_changement("Awa dans l'équipe")
+        relu = self.projet.a_la_version(2)
+        self.assertIs(relu.taches[0].responsable, relu.equipe.membres[1])
+        self.assertEqual(len(relu.equipe.membres), 2)
+
+    def test_retrait_membre_point_a_chaque_operation(self):
+        """
+        Un point de reprise n'est jamais pris au milieu du retrait d'un membre et de la réassignation de ses tâches
+        """
+        awa = Membre("Awa", "Développeuse")
+        self.projet.ajouter_membre_equipe(awa)
+        self.projet.ajouter_taches([(f"T{i}", "", datetime(2024, 1, 1), datetime(2024, 1, 5), awa, "Non démarrée")
+                                    for i in range(3)])
+        self.projet.journaliser(JournalChangements(intervalle_points=1))
+        self.projet.retirer_membre_equipe(awa, self.modou)
+        self.assertEqual(self.projet.equipe.membres, [self.modou])
+        self.projet.enregistrer_changement("Départ d'Awa")
+        relu = self.projet.a_la_version(2)
+        self.assertEqual([membre.nom for membre in relu.equipe.membres], ["Modou"])
+        self.assertTrue(all(tache.responsable is relu.equipe.membres[0] for tache in relu.taches))
+
+    def test_journal_relu_depuis_fichier(self):
+        """
+        Un journal rouvert depuis le disque restitue les mêmes versions
+        """
+        with tempfile.TemporaryDirectory() as dossier:
+            chemin = os.path.join(dossier, "journal.jsonl")
+            with JournalChangements(chemin, intervalle_points=8) as journal:
+                self.projet.journaliser(journal)
+                self.historique(20)
+            with JournalChangements(chemin) as journal:
+                self.assertEqual(journal.version_courante, self.projet.version)
+                for version, rapport in self.rapports.items():
+                    self.assertEqual(journal.a_la_version(version).generer_rapport_performance(), rapport)
+
+    def test_dependance_ajoutee_avant_sa_tache(self):
+        """
+        Une dépendance vers une tâche ajoutée plus tard est rétablie
+        """
+        self.projet.journaliser(JournalChangements())
+        a = Tache("A", "", datetime(2024, 1, 1), datetime(2024, 1, 5), self.modou, "Non démarrée")
+        b = Tache("B", "", datetime(2024, 1, 5), datetime(2024, 1, 9), self.modou, "Non démarrée")
+        b.ajouter_dependance(a)
+        self.projet.ajouter_tache(b)
+        self.projet.ajouter_tache(a)
+        copie = self.projet.a_la_version(1)
+        self.assertEqual([tache.nom for tache in copie.ordre_topologique()], ["A", "B"])
+
+
+class TestStockageSQLite(unittest.TestCase):
+    """
+    Persistance des projets dans SQLite.
+    """
+
+    def setUp(self):
+        self.dossier = tempfile.TemporaryDirectory()
+        self.chemin = os.path.join(self.dossier.name, "projets.db")
+        self.stockage = StockageSQLite(self.chemin)
+        modou = Membre("Modou", "Chef de projet")
+        self.projet = Projet("Stocké", "Projet en base", datetime(2024, 1, 1), datetime(2024, 12, 31), 1000)
+        self.projet.ajouter_membre_equipe(modou)
+        self.projet.ajouter_taches([
+            ("A", "", datetime(2024, 1, 1), datetime(2024, 1, 5), modou, "Terminée"),
+            ("B", "", datetime(2024, 1, 6), datetime(2024, 1, 10), modou, "En cours", ["A"]),
+        ])
+        self.projet.ajouter_risque(Risque("Retard", 0.3, 2.5, [self.projet.taches[1]]))
+        self.projet.ajouter_jalon(Jalon("Livraison", datetime(2024, 1, 10)))
+        self.projet.enregistrer_changement("Ajout des tâches")
+        self.projet.calculer_chemin_critique()
+
+    def tearDown(self):
+        self.stockage.fermer()
+        self.dossier.cleanup()
+
+    def test_aller_retour(self):
+        """
+        Le projet relu est identique et ses collections sont lues à la demande
+        """
+        identifiant = self.stockage.sauvegarder(self.projet)
+        relu = self.stockage.charger(identifiant)
+        self.assertFalse(relu.est_charge("taches"))
+        self.assertEqual(relu.generer_rapport_performance(), self.projet.generer_rapport_performance())
+        self.assertTrue(relu.est_charge("taches"))
+        self.assertEqual(relu.taches[1].dependances, [relu.taches[0]])
+        self.assertEqual(relu.risques[0].impact, 2.5)
+        self.assertEqual(relu.rechercher_taches(statut="En cours"), [relu.taches[1]])
+        with self.assertRaises(KeyError):
+            self.stockage.charger(identifiant + 1)
+
+    def test_partage_et_mise_a_jour(self):
+        """
+        Une seconde connexion à la base voit les projets sauvegardés et leurs mises à jour
+        """
+        identifiant = self.stockage.sauvegarder(self.projet)
+        relu = self.stockage.charger(identifiant)
+        relu.taches[1].mettre_a_jour_statut("Terminée")
+        relu.definir_budget(2000)
+        self.stockage.sauvegarder(relu)
+        with StockageSQLite(self.chemin, taille_pool=1) as autre:
+            self.assertEqual(autre.projets(), [(identifiant, "Stocké")])
+            copie = autre.charger(identifiant)
+            self.assertEqual(copie.budget, 2000)
+            self.assertEqual([tache.statut for tache in copie.taches], ["Terminée", "Terminée"])
+            self.assertEqual(len(copie.changements), 1)
+
+    def test_recherche_avant_chargement(self):
+        """
+        Une recherche par index charge les tâches si elles ne le sont pas encore
+        """
+        identifiant = self.stockage.sauvegarder(self.projet)
+        self.assertEqual([t.nom for t in self.stockage.charger(identifiant).rechercher_taches(statut="En cours")],
+                         ["B"])
+        relu = self.stockage.charger(identifiant)
+        self.assertEqual([t.nom for t in relu.taches_de(relu.equipe.trouver("Modou"))], ["A", "B"])
+
+    def test_fermeture_avec_connexion_sortie(self):
+        """
+        fermer() ne ferme une connexion en cours d'utilisation qu'à son retour dans le pool
+        """
+        pool = self.stockage.pool
+        with pool.connexion() as connexion:
+            self.stockage.fermer()
+            self.assertEqual(connexion.execute("SELECT COUNT(*) FROM projets").fetchone(), (0,))
+        with self.assertRaises(sqlite3.ProgrammingError):
+            connexion.execute("SELECT 1")
+        self.assertEqual(self.stockage.projets(), [])
+
+
+class TestPortefeuille(unittest.TestCase):
+    """
+    Nivellement des ressources partagées entre projets.
+    """
+
+    def setUp(self):
+        self.modou = Membre("Modou", "Chef de projet")
+        self.christian = Membre("Christian", "Développeur")
+        self.portefeuille = Portefeuille()
+        for p in range(2):
+            projet = Projet(f"Projet {p}", "", datetime(2024, 1, 1), datetime(2024, 12, 31), 1000)
+            projet.ajouter_membres_equipe([self.modou, self.christian])
+            projet.ajouter_taches([
+                ("Analyse", "", datetime(2024, 1, 1), datetime(2024, 1, 11), self.modou, "Non démarrée"),
+                ("Code", "", datetime(2024, 1, 11), datetime(2024, 1, 31), self.christian, "Non démarrée",
+                 ["Analyse"]),
+                ("Doc", "", datetime(2024, 1, 11), datetime(2024, 1, 13), self.modou, "Non démarrée", ["Analyse"]),
+            ])
+            self.portefeuille.ajouter_projet(projet)
+
+    def test_surallocations(self):
+        """
+        Les deux projets font travailler les mêmes membres en même temps
+        """
+        self.assertEqual(self.portefeuille.surallocations(), {self.modou: 2, self.christian: 2})
+
+    def test_nivellement(self):
+        """
+        Après nivellement, aucun membre ne mène deux tâches de front et les dépendances tiennent
+        """
+        planning = self.portefeuille.niveler()
+        for membre in (self.modou, self.christian):
+            chronologie = planning.chronologie(membre)
+            for (_, fin, _), (debut, _, _) in zip(chronologie, chronologie[1:]):
+                self.assertLessEqual(fin, debut)
+        for projet in self.portefeuille.projets:
+            for tache in projet.taches:
+                for dependance in tache.dependances:
+                    self.assertLessEqual(planning.fin(dependance), planning.debut(tache))
+        # Doc, qui a de la marge, passe après l'Analyse (critique) de l'autre projet
+        premier, second = self.portefeuille.projets
+        self.assertEqual(planning.debut(second.taches[0]), datetime(2024, 1, 11))
+        self.assertEqual(planning.debut(premier.taches[2]), datetime(2024, 1, 21))
+        self.assertEqual(planning.retard(premier.taches[1]), 0)
+        self.assertEqual(planning.fin_projet(second), datetime(2024, 2, 20))
+        self.assertAlmostEqual(planning.utilisation(self.christian), 1.0)
+
+
+class TestCalculParallele(unittest.TestCase):
+    """
+    Chemins critiques et rapports calculés dans un pool de processus.
+    """
+
+    def creer_projets(self):
+        generateur = random.Random(5)
+        membre = Membre("Modou", "Chef de projet")
+        projets = []
+        for p in range(6):
+            projet = Projet(f"Projet {p}", "", datetime(2024, 1, 1 + p), datetime(2024, 12, 31), 1000)
+            projet.ajouter_membre_equipe(membre)
+            projet.ajouter_taches((f"T{i}", "", datetime(2024, 1, 1), datetime(2024, 1, 1 + generateur.randrange(9)),
+                                   membre, "Non démarrée", [f"T{j}" for j in generateur.sample(range(i), min(i, 2))])
+                                  for i in range(40 * (p % 3)))
+            projet.ajouter_jalon(Jalon("Fin", datetime(2024, 6, 1)))
+            projets.append(projet)
+        return projets
+
+    def verifier(self, processus: int):
+        attendus = self.creer_projets()
+        for projet in attendus:
+            projet.calculer_chemin_critique()
+        projets = self.creer_projets()
+        avancement = []
+        rapports = calculer_en_parallele(projets, processus=processus, taille_lot=2,
+                                         progression=lambda faits, total: avancement.append((faits, total)))
+        self.assertEqual(rapports, [projet.generer_rapport_performance() for projet in attendus])
+        self.assertEqual(sorted(avancement), [(2, 6), (4, 6), (6, 6)])
+        for projet, attendu in zip(projets, attendus):
+            self.assertEqual([(t.ES, t.EF, t.LS, t.LF, t.marge_totale, t.marge_libre) for t in projet.taches],
+                             [(t.ES, t.EF, t.LS, t.LF, t.marge_totale, t.marge_libre) for t in attendu.taches])
+            self.assertEqual([t.nom for t in projet.chemin_critique], [t.nom for t in attendu.chemin_critique])
+
+    def test_meme_resultat_que_le_calcul_sequentiel(self):
+        """
+        Résultats identiques au calcul séquentiel, en ligne ou avec deux processus
+        """
+        self.verifier(1)
+        self.verifier(2)
+
+    def test_cycle_signale(self):
+        """
+        Un cycle dans un projet est signalé comme par le calcul séquentiel
+        """
+        for processus in (1, 2):
+            projets = self.creer_projets()
+            projet = projets[1]
+            projet.taches[0].ajouter_dependance(projet.taches[-1])
+            with self.assertRaises(CycleDependancesError) as contexte:
+                calculer_en_parallele(projets, processus=processus, taille_lot=2)
+            self.assertTrue(set(contexte.exception.cycle) <= set(projet.taches))
+            self.assertIn(projet.taches[0], contexte.exception.cycle)
+
+    def test_erreur_de_cycle_picklable(self):
+        """
+        L'erreur de cycle traverse pickle en gardant les noms des tâches
+        """
+        a = Tache("A", "", datetime(2024, 1, 1), datetime(2024, 1, 2), None, "Non démarrée")
+        b = Tache("B", "", datetime(2024, 1, 1), datetime(2024, 1, 2), None, "Non démarrée")
+        erreur = pickle.loads(pickle.dumps(CycleDependancesError([a, b])))
+        self.assertIsInstance(erreur, CycleDependancesError)
+        self.assertEqual(erreur.noms, ["A", "B"])
+        self.assertEqual(str(erreur), "Cycle de dépendances détecté: A -> B -> A")
+
+
+class TestSuiteBancs(unittest.TestCase):
+    """
+    Générateurs de projets et détection des régressions de la suite de bancs d'essai.
+    """
+
+    def test_generateurs(self):
+        """
+        Chaque générateur produit un graphe sans cycle de la taille demandée
+        """
+        for nom, generer in bench.GENERATEURS.items():
+            projet = Projet(nom, "", datetime(2024, 1, 1), datetime(2030, 12, 31), 0)
+            for tache in generer(500):
+                projet.ajouter_tache(tache)
+            self.assertEqual(len(projet.ordre_topologique()), 500)
+        self.assertEqual(len(bench.generer_eventail(50)[-1].dependances), 48)
+
+    def test_regression_detectee(self):
+        """
+        Seules les mesures ralenties au-delà du seuil sont signalées
+        """
+        reference = [{"mesure": "rapport", "graphe": "chaine", "taille": 100, "secondes": 1.0},
+                     {"mesure": "notifier", "graphe": "equipe", "taille": 100, "secondes": 1.0}]
+        resultats = [{"mesure": "rapport", "graphe": "chaine", "taille": 100, "secondes": 1.4},
+                     {"mesure": "notifier", "graphe": "equipe", "taille": 100, "secondes": 2.0}]
+        regressions = bench.comparer(resultats, reference, 1.5)
+        self.assertEqual([(r["mesure"], r["facteur"]) for r in regressions], [("notifier", 2.0)])
+
+
+class TestInstrumentation(unittest.TestCase):
+    """
+    Mesures de performance à la demande : quantiles, formats de sortie et crochets posés.
+    """
+
+    def setUp(self):
+        self.debut = datetime(2024, 1, 1)
+        self.projet = Projet("Mesuré", "", self.debut, datetime(2024, 12, 31), 0)
+        self.membre = Membre("Awa", "Développeuse")
+
+    def test_quantiles(self):
+        """
+        p50 et p99 d'un histogramme en mémoire, à la précision des seaux près
+        """
+        memoire = HistogrammeMemoire()
+        instrumentation = Instrumentation([memoire])
+        for i in range(1, 1001):
+            instrumentation.mesurer("essai", i / 1000)
+        resume = memoire.resume("essai")
+        self.assertEqual(resume["nombre"], 1000)
+        self.assertAlmostEqual(resume["p50"], 0.5, delta=0.05)
+        self.assertAlmostEqual(resume["p99"], 0.99, delta=0.09)
+
+    def test_formats_prometheus_et_json(self):
+        """
+        Résumés et compteurs au format texte Prometheus, une ligne JSON par mesure
+        """
+        memoire = HistogrammeMemoire()
+        flux = io.StringIO()
+        instrumentation = Instrumentation([memoire, JournalJSON(flux)])
+        instrumentation.mesurer("rapport", 0.25, format="csv")
+        instrumentation.compter("echecs", 2)
+        texte = memoire.texte_prometheus()
+        self.assertIn("# TYPE mpql_rapport_secondes summary\n", texte)
+        self.assertIn('mpql_rapport_secondes{format="csv",quantile="0.5"} 0.25\n', texte)
+        self.assertIn('mpql_rapport_secondes_count{format="csv"} 1\n', texte)
+        self.assertIn("mpql_echecs_total 2\n", texte)
+        lignes = [json.loads(ligne) for ligne in flux.getvalue().splitlines()]
+        self.assertEqual([(l["nom"], l["nature"]) for l in lignes], [("rapport", "duree"), ("echecs", "compteur")])
+        self.assertEqual(lignes[0]["format"], "csv")
+
+    def test_crochets(self):
+        """
+        Mutations, passes du chemin critique et rapport mesurés ; tout est retiré à la désactivation
+        """
+        ajouter_tache = Projet.ajouter_tache
+        with Instrumentation() as instrumentation:
+            memoire = instrumentation.puits[0]
+            tache = Tache("T", "", self.debut, self.debut + timedelta(days=3), self.membre, "Non démarrée")
+            self.projet.ajouter_tache(tache)
+            tache.mettre_a_jour_statut("En cours")
+            self.projet.calculer_chemin_critique()
+            self.projet.generer_rapport_performance()
+        self.assertIs(Projet.ajouter_tache, ajouter_tache)
+        self.assertIsNone(instrumentation_courante())
+        self.assertEqual(memoire.resume("projet_mutation", operation="ajouter_tache")["nombre"], 1)
+        self.assertEqual(memoire.resume("projet_mutation", operation="tache_modifiee")["nombre"], 1)
+        self.assertEqual(memoire.resume("cpm_passe_avant")["nombre"], 1)
+        self.assertEqual(memoire.resume("rapport", format="texte")["nombre"], 1)
+        self.projet.generer_rapport_performance()
+        self.assertEqual(memoire.resume("rapport", format="texte")["nombre"], 1)
+
+    def test_portee_limitee_au_contexte(self):
+        """
+        Une instrumentation activée dans un thread ne mesure pas les projets modifiés dans un autre
+        """
+        instrumentation = Instrumentation()
+        active, termine = threading.Event(), threading.Event()
+
+        def mesurer():
+            with instrumentation:
+                active.set()
+                termine.wait(5)
+
+        thread = threading.Thread(target=mesurer)
+        thread.start()
+        active.wait(5)
+        self.assertIsNone(instrumentation_courante())
+        self.projet.ajouter_tache(Tache("T", "", self.debut, self.debut + timedelta(days=3), self.membre,
+                                        "Non démarrée"))
+        termine.set()
+        thread.join()
+        memoire = instrumentation.puits[0]
+        self.assertEqual(memoire.resume("projet_mutation", operation="ajouter_tache")["nombre"], 0)
+
+    def test_latence_envoi_par_strategie(self):
+        """
+        Chaque envoi est chronométré avec le nom de la stratégie
+        """
+        with Instrumentation() as instrumentation:
+            NotificationContext(TransportFactice()).notifier("Bonjour", [self.membre, self.membre])
+            with DispatcheurNotifications(delai_initial=0) as dispatcheur:
+                dispatcheur.soumettre(TransportFactice(echecs=1), "Bonjour", self.membre)
+        memoire = instrumentation.puits[0]
+        self.assertEqual(memoire.resume("notification_envoi", strategie="TransportFactice")["nombre"], 2)
+        self.assertEqual(memoire.resume("notification_envoi", strategie="TransportFactice",
+                                        resultat="echec")["nombre"], 1)
+        self.assertEqual(memoire.resume("notification_envoi", strategie="TransportFactice",
+                                        resultat="reussi")["nombre"], 1)
+
+
+class TestPaquetMpql(unittest.TestCase):
+    """
+    Paquet unique à import paresseux et classes partagées entre paquets.
+    """
+
+    def test_import_paresseux(self):
+        """
+        Importer les notifications ne charge ni NumPy ni le chemin critique
+        """
+        _, _, numpy, moteur = bench.mesurer_import("from mpql import NotificationContext", 1)
+        self.assertFalse(numpy)
+        self.assertFalse(moteur)
+        _, _, numpy, moteur = bench.mesurer_import("from mpql import calculer_en_parallele", 1)
+        self.assertTrue(numpy and moteur)
+
+    def test_une_seule_classe(self):
+        """
+        mpql, les paquets et Projet désignent les mêmes classes ; es/ef sont des alias de ES/EF
+        """
+        import mpql
+        import Projet as module_projet
+        self.assertIs(mpql.Tache, Tache)
+        self.assertIs(module_projet.Tache, Tache)
+        self.assertIn("Portefeuille", dir(mpql))
+        with self.assertRaises(AttributeError):
+            mpql.Inconnu
+        tache = Tache("T", "", datetime(2024, 1, 1), datetime(2024, 1, 5), None, "Non démarrée")
+        projet = Projet("Alias", "", datetime(2024, 1, 1), datetime(2024, 12, 31), 0)
+        projet.ajouter_tache(tache)
+        projet.calculer_chemin_critique()
+        self.assertEqual((tache.es, tache.ef), (tache.ES, tache.EF))
+        tache.lf = datetime(2024, 2, 1)
+        self.assertEqual(tache.LF, datetime(2024, 2, 1))
+
+
+class TestValeurAcquise(unittest.TestCase):
+    """
+    Valeur acquise tenue à jour au fil des modifications, courbes en S par sommes préfixes.
+    """
+
+    def setUp(self):
+        self.debut = datetime(2024, 1, 1)
+        self.maintenant = datetime(2024, 1, 10)
+        self.projet = Projet("Acquis", "", self.debut, datetime(2024, 12, 31), 1000)
+        membre = Membre("Awa", "Développeuse")
+        # Deux tâches de 10 jours : 500 de budget chacune
+        self.t1 = Tache("T1", "", self.debut, self.debut + timedelta(days=10), membre, "Non démarrée")
+        self.t2 = Tache("T2", "", self.debut + timedelta(days=10), self.debut + timedelta(days=20), membre,
+                        "Non démarrée")
+        self.projet.ajouter_tache(self.t1)
+        self.valeur = self.projet.suivre_valeur_acquise(horloge=lambda: self.maintenant)
+        self.projet.ajouter_tache(self.t2)
+
+    def test_indicateurs(self):
+        """
+        PV, EV, AC, SPI et CPI suivent les statuts, les coûts et le budget
+        """
+        self.assertAlmostEqual(self.valeur.valeur_planifiee(self.debut + timedelta(days=4)), 250)
+        self.t1.mettre_a_jour_statut("Terminée")
+        self.t2.mettre_a_jour_statut("En cours")
+        self.valeur.enregistrer_cout(600)
+        indicateurs = self.valeur.indicateurs()
+        self.assertAlmostEqual(indicateurs["pv"], 500)
+        self.assertAlmostEqual(indicateurs["ev"], 750)
+        self.assertAlmostEqual(indicateurs["spi"], 1.5)
+        self.assertAlmostEqual(indicateurs["cpi"], 1.25)
+        self.projet.definir_budget(2000)
+        self.assertAlmostEqual(self.valeur.valeur_acquise(), 1500)
+        self.t2.modifier_dates(date_fin=self.debut + timedelta(days=40))
+        self.assertAlmostEqual(self.valeur.valeur_planifiee(datetime(2025, 1, 1)), 2000)
+        self.assertAlmostEqual(self.valeur.valeur_acquise(), 2000 * 25 / 40)
+        self.assertIn("Valeur acquise:\nPV: ", self.projet.generer_rapport_performance())
+
+    def test_courbes_s(self):
+        """
+        Les courbes cumulées jour par jour recoupent les indicateurs ponctuels
+        """
+        self.t1.mettre_a_jour_statut("Terminée")
+        self.valeur.enregistrer_cout(100, self.debut + timedelta(days=2))
+        dates, pv, ev, ac = self.valeur.courbes_s(self.debut - timedelta(days=1), self.debut + timedelta(days=25))
+        self.assertEqual(len(dates), 27)
+        self.assertEqual(str(dates[0]), "2023-12-31")
+        self.assertEqual(pv[0], 0)
+        self.assertAlmostEqual(pv[5], self.valeur.valeur_planifiee(self.debut + timedelta(days=4)))
+        self.assertAlmostEqual(pv[-1], 1000)
+        self.assertEqual(list(pv), sorted(pv))
+        self.assertEqual((ev[9], ev[10]), (0, 500))
+        self.assertEqual((ac[2], ac[3]), (0, 100))
+
+
+class TestCacheRapport(unittest.TestCase):
+    """
+    Sections du rapport mises en cache et invalidées seulement quand elles changent.
+    """
+
+    def setUp(self):
+        CACHE_SECTIONS.vider()
+        self.addCleanup(setattr, CACHE_SECTIONS, "capacite", CACHE_SECTIONS.capacite)
+        self.debut = datetime(2024, 1, 1)
+        self.membre = Membre("Awa", "Développeuse")
+
+    def projet(self, nom: str = "Cache") -> Projet:
+        projet = Projet(nom, "", self.debut, datetime(2024, 12, 31), 0)
+        projet.ajouter_membre_equipe(self.membre)
+        projet.ajouter_tache(Tache("T", "", self.debut, self.debut + timedelta(days=3), self.membre, "Non démarrée"))
+        return projet
+
+    def test_invalidation_par_section(self):
+        """
+        Seules les sections touchées sont recalculées et le rapport reste à jour
+        """
+        projet = self.projet()
+        projet.calculer_chemin_critique()
+        premier = projet.generer_rapport_performance()
+        self.assertEqual(projet.generer_rapport_performance(), premier)
+        self.assertEqual((CACHE_SECTIONS.echecs, CACHE_SECTIONS.succes), (5, 5))
+        projet.ajouter_risque(Risque("Retard", 0.3, "Élevé"))
+        self.assertIn("Retard (Probabilité: 0.3", projet.generer_rapport_performance())
+        self.assertEqual((CACHE_SECTIONS.echecs, CACHE_SECTIONS.succes), (6, 9))
+        projet.taches[0].mettre_a_jour_statut("Terminée")
+        self.assertIn("Statut: Terminée", projet.generer_rapport_performance())
+        projet.ajouter_tache(Tache("U", "", self.debut, self.debut + timedelta(days=9), self.membre, "En cours"))
+        projet.calculer_chemin_critique()
+        rapport = projet.generer_rapport_performance()
+        self.assertEqual(rapport.split("Chemin Critique:\n")[1].split(" (")[0], "U")
+        # Liste modifiée sans passer par le projet : la signature rattrape le changement
+        projet.equipe.ajouter_membre(Membre("Ali", "Testeur"))
+        self.assertIn("Ali (Testeur)", projet.generer_rapport_performance())
+
+    def test_eviction_lru(self):
+        """
+        Le cache est borné : les sections les moins récemment lues sont évincées
+        """
+        CACHE_SECTIONS.capacite = 7
+        premier, second = self.projet("A"), self.projet("B")
+        premier.generer_rapport_performance()
+        second.generer_rapport_performance()
+        self.assertEqual(CACHE_SECTIONS.statistiques(), {"entrees": 7, "succes": 0, "echecs": 10, "evictions": 3})
+        second.generer_rapport_performance()
+        self.assertEqual(CACHE_SECTIONS.succes, 5)
+
+    def test_projets_liberes(self):
+        """
+        Le cache ne garde pas les projets en vie ; leurs sections disparaissent avec eux
+        """
+        projet = self.projet()
+        projet.generer_rapport_performance()
+        reference = weakref.ref(projet)
+        del projet
+        gc.collect()
+        self.assertIsNone(reference())
+        self.assertEqual(CACHE_SECTIONS.statistiques()["entrees"], 0)
+        self.assertEqual(CACHE_SECTIONS.taille, 0)
+
+    def test_taille_bornee(self):
+        """
+        Le cache est aussi borné en caractères
+        """
+        self.addCleanup(setattr, CACHE_SECTIONS, "taille_max", CACHE_SECTIONS.taille_max)
+        CACHE_SECTIONS.taille_max = 100
+        projet = self.projet()
+        projet.generer_rapport_performance()
+        self.assertLessEqual(CACHE_SECTIONS.taille, 100)
+        self.assertGreater(CACHE_SECTIONS.evictions, 0)
+
+    def test_grande_section_transmise_ligne_a_ligne(self):
+        """
+        Une section plus grande que taille_entree est rendue ligne à ligne et n'est pas gardée
+        """
+        self.addCleanup(setattr, CACHE_SECTIONS, "taille_entree", CACHE_SECTIONS.taille_entree)
+        CACHE_SECTIONS.taille_entree = 200
+        projet = self.projet()
+        projet.ajouter_taches([(f"U{i}", "", self.debut, self.debut, self.membre, "En cours") for i in range(20)])
+        for _ in range(2):
+            lignes = list(RapportPerformance(projet).lignes())
+            self.assertIn("Tâches:\n", lignes)
+            self.assertEqual(sum(ligne.startswith("U") for ligne in lignes), 20)
+        self.assertNotIn((id(projet), "taches"), CACHE_SECTIONS._entrees)
+        self.assertIn((id(projet), "equipe"), CACHE_SECTIONS._entrees)
+        self.assertEqual("".join(lignes), projet.generer_rapport_performance())
+
+    def test_attribut_modifie_sur_place(self):
+        """
+        Un attribut modifié directement n'est pas vu tant que le projet n'est pas invalidé
+        """
+        projet = self.projet()
+        projet.generer_rapport_performance()
+        projet.taches[0].statut = "Terminée"
+        self.assertIn("Statut: Non démarrée", projet.generer_rapport_performance())
+        CACHE_SECTIONS.invalider(projet)
+        self.assertIn("Statut: Terminée", projet.generer_rapport_performance())
+
+
+class TestEquipeIndexee(unittest.TestCase):
+    """
+    Équipe indexée par identité, nom et rôle ; retrait et modification répercutés sur les tâches.
+    """
+
+    def setUp(self):
+        self.debut = datetime(2024, 1, 1)
+        self.projet = Projet("Équipe", "", self.debut, datetime(2024, 12, 31), 0)
+        self.modou = Membre("Modou", "Chef de projet")
+        self.awa = Membre("Awa", "Développeuse")
+        self.ali = Membre("Ali", "Développeur")
+        self.projet.ajouter_membres_equipe([self.modou, self.awa, self.ali, self.awa])
+        self.projet.ajouter_taches([("T1", "", self.debut, self.debut + timedelta(days=2), "Awa", "Non démarrée"),
+                                    ("T2", "", self.debut, self.debut + timedelta(days=4), "Awa", "En cours"),
+                                    ("T3", "", self.debut, self.debut + timedelta(days=3), "Modou", "En cours")])
+
+    def test_index(self):
+        """
+        Doublons ignorés, recherche par nom et regroupement par rôle
+        """
+        equipe = self.projet.equipe
+        self.projet.ajouter_membre_equipe(self.modou)
+        self.assertEqual(equipe.obtenir_membres(), [self.modou, self.awa, self.ali])
+        self.assertIn(self.ali, equipe)
+        self.assertIs(equipe.trouver("Awa"), self.awa)
+        self.assertIsNone(equipe.trouver("Inconnu"))
+        self.assertEqual(equipe.membres_par_role("Développeur"), [self.ali])
+        self.assertEqual(list(equipe.roles()), ["Chef de projet", "Développeuse", "Développeur"])
+
+    def test_membres_modifiables(self):
+        """
+        `membres` se modifie comme une liste, index compris ; la vue est gardée tant que l'équipe ne change pas
+        """
+        equipe = self.projet.equipe
+        self.assertEqual(equipe.membres, [self.modou, self.awa, self.ali])
+        self.assertIs(equipe.obtenir_membres(), equipe.membres)
+        fatou = Membre("Fatou", "Testeuse")
+        equipe.membres.append(fatou)
+        equipe.membres.append(fatou)
+        self.assertIs(equipe.trouver("Fatou"), fatou)
+        self.assertEqual(len(equipe), 4)
+        vue = equipe.membres
+        del equipe.membres[0]
+        self.assertNotIn(self.modou, equipe)
+        self.assertEqual(equipe.membres_par_role("Chef de projet"), [])
+        equipe.ajouter_membre(self.modou)
+        self.assertIsNot(equipe.membres, vue)
+        vue.insert(0, Membre("Ali", "Testeur"))
+        self.assertEqual([membre.nom for membre in equipe.membres], ["Ali", "Awa", "Ali", "Fatou", "Modou"])
+        self.assertEqual(len(equipe.homonymes("Ali")), 2)
+
+    def test_retrait(self):
+        """
+        Les tâches du membre retiré passent au remplaçant, index et rapport compris
+        """
+        self.projet.retirer_membre_equipe(self.awa, self.ali)
+        self.assertNotIn(self.awa, self.projet.equipe)
+        self.assertIsNone(self.projet.equipe.trouver("Awa"))
+        self.assertEqual([t.nom for t in self.projet.rechercher_taches(responsable=self.ali)], ["T1", "T2"])
+        self.assertEqual(self.projet.taches_de(self.awa), [])
+        self.projet.retirer_membre_equipe(self.modou)
+        self.assertIsNone(self.projet.taches[2].responsable)
+        rapport = self.projet.generer_rapport_performance()
+        self.assertIn("T3 (2024-01-01 00:00:00 à 2024-01-04 00:00:00), Responsable: Aucun", rapport)
+        self.assertNotIn("Awa (Développeuse)", rapport)
+        with self.assertRaises(KeyError):
+            self.projet.retirer_membre_equipe(self.awa)
+
+    def test_modification_et_journal(self):
+        """
+        Un membre renommé est réindexé ; retrait et modification sont rejoués depuis le journal
+        """
+        journal = JournalChangements()
+        self.projet.journaliser(journal)
+        self.projet.modifier_membre_equipe(self.ali, nom="Alioune", role="Testeur")
+        self.assertIs(self.projet.equipe.trouver("Alioune"), self.ali)
+        self.assertEqual(self.projet.equipe.membres_par_role("Testeur"), [self.ali])
+        self.projet.retirer_membre_equipe(self.awa, self.ali)
+        attendu = self.projet.generer_rapport_performance()
+        self.assertIn("Responsable: Alioune", attendu)
+        self.projet.enregistrer_changement("Réorganisation")
+        self.assertEqual(journal.a_la_version(1).generer_rapport_performance(), attendu)
+
+
+class TestAbonnementsNotifications(unittest.TestCase):
+    """
+    Routage des notifications par sujet et stratégies préférées de chaque membre.
+    """
+
+    def setUp(self):
+        self.email = TransportFactice()
+        self.sms = TransportFactice()
+        self.projet = Projet("Routage", "", datetime(2024, 1, 1), datetime(2024, 12, 31), 1000)
+        self.modou = Membre("Modou", "Chef de projet")
+        self.awa = Membre("Awa", "Développeuse")
+        self.ali = Membre("Ali", "Développeur")
+        self.projet.ajouter_membres_equipe([self.modou, self.awa, self.ali])
+        self.projet.set_notification_strategy(self.email)
+
+    def recus(self, transport: TransportFactice) -> list:
+        return [(message, membre.nom) for message, membre in transport.envoyes]
+
+    def test_routage_par_sujet(self):
+        """
+        Seuls les abonnés du sujet et les responsables qui suivent leurs tâches sont prévenus
+        """
+        self.projet.abonner(self.modou, "budget", "risques")
+        self.projet.abonner(self.awa, "mes_taches")
+        self.projet.definir_budget(2000)
+        tache = Tache("T1", "", datetime(2024, 1, 1), datetime(2024, 1, 5), self.awa, "Non démarrée")
+        self.projet.ajouter_tache(tache)
+        self.projet.ajouter_tache(Tache("T2", "", datetime(2024, 1, 1), datetime(2024, 1, 5), self.ali,
+                                        "Non démarrée"))
+        self.projet.ajouter_risque(Risque("Retard", 0.3, "Élevé", [tache]))
+        self.projet.ajouter_jalon(Jalon("Livraison", datetime(2024, 6, 1)))
+        self.assertEqual(self.recus(self.email), [
+            ("Le budget du projet a été défini: 2000 Unité Monetaire", "Modou"),
+            ("Nouvelle tâche ajoutée: T1", "Awa"),
+            ("Nouveau risque ajouté: Retard", "Modou"),
+            ("Nouveau risque ajouté: Retard", "Awa"),
+        ])
+        self.assertEqual(self.projet.abonnements.sujets(self.modou), ["risques", "budget"])
+        self.projet.retirer_membre_equipe(self.modou)
+        self.assertEqual(self.projet.abonnements.abonnes("budget"), [])
+        with self.assertRaises(ValueError):
+            self.projet.abonner(self.ali, "météo")
+
+    def test_mes_taches_statut_et_reassignation(self):
+        """
+        Le responsable suit le statut de sa tâche ; une réassignation prévient l'ancien et le nouveau
+        """
+        self.projet.abonner(self.awa, "mes_taches")
+        self.projet.abonner(self.ali, "mes_taches")
+        tache = Tache("T1", "", datetime(2024, 1, 1), datetime(2024, 1, 5), self.awa, "Non démarrée")
+        self.projet.ajouter_tache(tache)
+        tache.mettre_a_jour_statut("En cours")
+        tache.changer_responsable(self.ali)
+        tache.mettre_a_jour_statut("Terminée")
+        self.assertEqual(self.recus(self.email), [
+            ("Nouvelle tâche ajoutée: T1", "Awa"),
+            ("Statut de la tâche T1: En cours", "Awa"),
+            ("Tâche T1 réassignée à Ali", "Ali"),
+            ("Tâche T1 réassignée à Ali", "Awa"),
+            ("Statut de la tâche T1: Terminée", "Ali"),
+        ])
+
+    def test_premier_abonnement_passe_au_routage(self):
+        """
+        Sans abonnement, toute l'équipe est prévenue ; après le premier, un membre non abonné ne reçoit plus rien
+        """
+        self.projet.ajouter_jalon(Jalon("Cadrage", datetime(2024, 2, 1)))
+        self.assertEqual([nom for _, nom in self.recus(self.email)], ["Modou", "Awa", "Ali"])
+        self.email.envoyes.clear()
+        self.projet.abonner(self.awa, "jalons")
+        self.projet.ajouter_jalon(Jalon("Livraison", datetime(2024, 6, 1)))
+        self.projet.definir_budget(2000)
+        self.assertEqual(self.recus(self.email), [("Nouveau jalon ajouté: Livraison", "Awa")])
+
+    def test_strategies_preferees(self):
+        """
+        Un membre peut recevoir par plusieurs canaux, les autres gardent la stratégie par défaut
+        """
+        self.projet.notification_context.preferer(self.awa, self.sms, self.email)
+        self.projet.abonner(self.awa, "jalons")
+        self.projet.abonner(self.ali, "jalons")
+        self.projet.ajouter_jalon(Jalon("Livraison", datetime(2024, 6, 1)))
+        self.assertEqual(self.recus(self.sms), [("Nouveau jalon ajouté: Livraison", "Awa")])
+        self.assertEqual(self.recus(self.email), [("Nouveau jalon ajouté: Livraison", "Awa"),
+                                                  ("Nouveau jalon ajouté: Livraison", "Ali")])
+
+
+class TestTransportsNotifications(unittest.TestCase):
+    """
+    Transports réels des stratégies : lots, réutilisation des connexions et limitation du débit.
+    """
+
+    def setUp(self):
+        self.membres = [Membre(f"membre{i}", "Développeur") for i in range(250)]
+
+    def test_seau_jetons(self):
+        """
+        Une rafale consomme la capacité, la suite attend le débit
+        """
+        instant = [0.0]
+        attentes = []
+
+        def attendre(secondes):
+            attentes.append(secondes)
+            instant[0] += secondes
+
+        seau = SeauJetons(10, capacite=5, horloge=lambda: instant[0], attendre=attendre)
+        seau.prendre(5)
+        self.assertEqual(attentes, [])
+        seau.prendre(2)
+        self.assertAlmostEqual(sum(attentes), 0.2)
+        with self.assertRaises(ValueError):
+            seau.prendre(6)
+
+    def test_lot_smtp(self):
+        """
+        Un lot passe par une seule connexion SMTP, découpé en paquets de destinataires
+        """
+        with ServeurSMTPLocal() as serveur, \
+                TransportSMTP("127.0.0.1", serveur.port, taille_lot=100) as transport:
+            strategie = EmailNotificationStrategy(transport, adresse=lambda membre: f"{membre.nom}@exemple.sn")
+            NotificationContext(strategie).notifier("Réunion à 10h", self.membres)
+            strategie.envoyer("Rappel", self.membres[0])
+            self.assertEqual(transport.messages_envoyes, 251)
+        self.assertEqual(serveur.connexions, 1)
+        self.assertEqual([len(destinataires) for _, destinataires, _ in serveur.messages], [100, 100, 50, 1])
+        self.assertEqual(serveur.messages[0][1][0], "membre0@exemple.sn")
+        self.assertIn("Réunion à 10h", serveur.messages[0][2].decode("utf-8"))
+
+    def test_lot_http(self):
+        """
+        Le point d'accès HTTP reçoit un POST JSON par paquet, sur une connexion persistante
+        """
+        with ServeurHTTPLocal() as serveur, TransportHTTP(serveur.url, taille_lot=200) as transport:
+            PushNotificationStrategy(transport).envoyer_lot("Jalon atteint", self.membres)
+        self.assertEqual(serveur.connexions, 1)
+        self.assertEqual([len(requete["destinataires"]) for requete in serveur.requetes], [200, 50])
+        self.assertEqual(serveur.requetes[1]["message"], "Jalon atteint")
+        with ServeurHTTPLocal(statut=503) as serveur, TransportHTTP(serveur.url) as transport:
+            with self.assertRaises(RuntimeError):
+                transport.envoyer_lot([("membre0", "Bonjour")])
+
+    def test_mesures_par_envoi_et_par_lot(self):
+        """
+        Un envoi par lot est chronométré une fois, un envoi message par message à chaque message
+        """
+        with ServeurHTTPLocal() as serveur, TransportHTTP(serveur.url) as transport:
+            contexte = NotificationContext(PushNotificationStrategy(transport))
+            contexte.preferer(self.membres[0], TransportFactice())
+            with Instrumentation() as instrumentation:
+                contexte.notifier("Bonjour", self.membres[:3])
+        memoire = instrumentation.puits[0]
+        for strategie, envois in (("PushNotificationStrategy", 1), ("TransportFactice", 1)):
+            self.assertEqual(memoire.resume("notification_envoi", strategie=strategie)["nombre"], envois)
+            self.assertEqual(memoire.resume("notification_lot", strategie=strategie)["nombre"], 1)
+        self.assertEqual(memoire.compteur("notification_messages", strategie="PushNotificationStrategy"), 2)
+        self.assertEqual(memoire.compteur("notification_messages", strategie="TransportFactice"), 1)
+
+    def test_envoyer_lot_redefini_sous_instrumentation(self):
+        """
+        Instrumentée ou non, la notification passe par l'envoyer_lot de la stratégie
+        """
+        class StrategieRegroupee(TransportFactice):
+            def envoyer_lot(self, message, destinataires):
+                self.envoyes.append((message, tuple(destinataires)))
+
+        for instrumentee in (False, True):
+            strategie = StrategieRegroupee()
+            with Instrumentation() if instrumentee else contextlib.nullcontext():
+                NotificationContext(strategie).notifier("Bonjour", self.membres[:3])
+            self.assertEqual(strategie.envoyes, [("Bonjour", tuple(self.membres[:3]))])
+
+    def test_echec_du_transport_sans_effet_sur_le_projet(self):
+        """
+        Un transport en échec est consigné, les autres stratégies reçoivent et le projet est modifié
+        """
+        secours = TransportFactice()
+        projet = Projet("Échecs", "", datetime(2024, 1, 1), datetime(2024, 12, 31), 1000)
+        projet.ajouter_membres_equipe(self.membres[:2])
+        with ServeurHTTPLocal(statut=500) as serveur, TransportHTTP(serveur.url) as transport:
+            projet.set_notification_strategy(PushNotificationStrategy(transport))
+            projet.notification_context.preferer(self.membres[1], PushNotificationStrategy(transport), secours)
+            projet.ajouter_tache(Tache("T1", "", datetime(2024, 1, 1), datetime(2024, 1, 5), self.membres[0],
+                                       "Non démarrée"))
+            with Instrumentation() as instrumentation:
+                projet.definir_budget(2000)
+        self.assertEqual(len(projet.taches), 1)
+        self.assertEqual(projet.budget, 2000)
+        self.assertEqual(len(projet.notification_context.echecs), 4)
+        self.assertIsInstance(projet.notification_context.echecs[0][2], RuntimeError)
+        self.assertEqual([membre for _, membre in secours.envoyes], [self.membres[1], self.membres[1]])
+        self.assertEqual(instrumentation.puits[0].compteur("notification_echecs",
+                                                           strategie="PushNotificationStrategy"), 2)
+
+    def test_lot_interrompu(self):
+        """
+        Un lot interrompu en cours de route ne consigne que les destinataires non servis
+        """
+        class TransportInterrompu(Transport):
+            def __init__(self, paquets):
+                super().__init__(taille_lot=100)
+                self.paquets = paquets
+                self.recus = []
+
+            def _connecter(self):
+                return None
+
+            def _deconnecter(self, connexion):
+                pass
+
+            def _envoyer_paquet(self, connexion, texte, adresses):
+                if not self.paquets:
+                    raise OSError("Serveur injoignable")
+                self.paquets -= 1
+                self.recus.extend(adresses)
+
+        transport = TransportInterrompu(2)
+        contexte = NotificationContext(PushNotificationStrategy(transport))
+        contexte.notifier("Bonjour", self.membres)
+        self.assertEqual(len(transport.recus), 200)
+        self.assertEqual(transport.messages_envoyes, 200)
+        (message, non_envoyes, erreur), = contexte.echecs
+        self.assertEqual(non_envoyes, self.membres[200:])
+        self.assertIsInstance(erreur, ErreurTransport)
+
+    def test_echecs_bornes_et_erreurs_de_programmation(self):
+        """
+        Seuls les derniers échecs du canal sont gardés ; une erreur de programmation remonte
+        """
+        class StrategieEnPanne(EmailNotificationStrategy):
+            def afficher(self, message, destinataire):
+                raise ConnectionError("Serveur injoignable")
+
+        class StrategieBoguee(EmailNotificationStrategy):
+            def afficher(self, message, destinataire):
+                raise TypeError("Bogue")
+
+        contexte = NotificationContext(StrategieEnPanne(), echecs_max=3)
+        for i in range(5):
+            contexte.notifier(f"Message {i}", self.membres[:2])
+        self.assertEqual([message for message, _, _ in contexte.echecs], ["Message 2", "Message 3", "Message 4"])
+        self.assertEqual(contexte.echecs[0][1], self.membres[:2])
+        contexte.set_strategy(StrategieBoguee())
+        with self.assertRaises(TypeError):
+            contexte.notifier("Bonjour", self.membres[:2])
+        self.assertEqual(len(contexte.echecs), 3)
+
+    def test_reconnexion_et_console(self):
+        """
+        Une connexion fermée par le serveur est rouverte ; sans transport, le message est affiché
+        """
+        with ServeurSMTPLocal() as serveur, TransportSMTP("127.0.0.1", serveur.port) as transport:
+            transport.envoyer_lot([("a@exemple.sn", "Un")])
+            transport._connexion.sock.shutdown(socket.SHUT_RDWR)
+            transport.envoyer_lot([("b@exemple.sn", "Deux")])
+            self.assertEqual(transport.connexions, 2)
+        self.assertEqual(len(serveur.messages), 2)
+        sortie = io.StringIO()
+        with contextlib.redirect_stdout(sortie):
+            EmailNotificationStrategy().envoyer_lot("Bonjour", self.membres[:2])
+        self.assertEqual(sortie.getvalue().splitlines(), ["Notification envoyée à membre0 par email: Bonjour",
+                                                          "Notification envoyée à membre1 par email: Bonjour"])
+
 
 if __name__ == "__main__":
     unittest.main()